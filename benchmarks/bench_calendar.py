@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark do espelho local do calendário contra a Calendar API falsa (benchmarks/fake_calendar_api.py).
+
+Mede a latência das leituras por janela ("o que tenho amanhã", verificação de conflitos) direto na API
+e no espelho (sem sincronizar e com uma sincronização incremental por leitura) e o tempo da
+sincronização completa. A coluna "confere" compara os eventos do espelho com os da API; os testes de
+consistência ficam em tests/test_calendar_mirror.py. Exemplo:
+
+    python benchmarks/bench_calendar.py --events 5000 --latency 0.08
+"""
+import argparse
+import datetime as dt
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from benchmarks.fake_calendar_api import TIMEZONE, FakeCalendar, build_service, serve
+from src.db.pool import SQLitePool
+from src.tools.calendar_mirror import CalendarMirror
+from src.tools.calendar_tools import list_events
+
+OWNER = "bench@example.com"
+
+
+def windows(count: int, days: int, rng):
+    """
+    Janelas de um dia ou de algumas horas dentro do período com eventos.
+    """
+    today = dt.datetime.now(TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+    result = []
+    for _ in range(count):
+        start = today + dt.timedelta(days=rng.randrange(days), hours=rng.choice([0, 9, 14]))
+        end = start + (dt.timedelta(days=1) if start.hour == 0 else dt.timedelta(hours=rng.choice([1, 2, 3])))
+        result.append((start.isoformat(), end.isoformat()))
+    return result
+
+
+def measure(read, queries):
+    results, latencies = [], []
+    for time_min, time_max in queries:
+        started = time.perf_counter()
+        results.append(read(time_min, time_max))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return results, np.asarray(latencies)
+
+
+def same_events(expected, found) -> bool:
+    # A ordem entre eventos que começam no mesmo horário não é definida pela API
+    def key(events):
+        return sorted((event["id"], event.get("summary"), event["start"].get("dateTime")) for event in events)
+
+    return len(expected) == len(found) and all(key(a) == key(b) for a, b in zip(expected, found))
+
+
+def report(label: str, latencies: np.ndarray, requests: int, consistent) -> None:
+    check = "-" if consistent is None else ("ok" if consistent else "DIVERGE")
+    print(
+        f"  {label:<28} {np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} "
+        f"{requests / len(latencies):>11.2f} {check:>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leituras por janela: Calendar API x espelho local")
+    parser.add_argument("--events", type=int, default=2000, help="Eventos sintéticos no calendário")
+    parser.add_argument("--days", type=int, default=120, help="Período (dias a partir de hoje) dos eventos")
+    parser.add_argument("--latency", type=float, default=0.05, help="Atraso artificial por requisição à API (segundos)")
+    parser.add_argument("--queries", type=int, default=100, help="Leituras por medição")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    calendar = FakeCalendar()
+    calendar.seed(args.events, days=args.days, seed=args.seed)
+    server, api_endpoint = serve(calendar, latency=args.latency)
+    service = build_service(api_endpoint)
+    queries = windows(args.queries, args.days, rng)
+
+    with tempfile.TemporaryDirectory() as directory:
+        mirror = CalendarMirror(SQLitePool(os.path.join(directory, "mirror.sqlite")), max_staleness=3600)
+        print(f"{args.events} eventos, latência da API {args.latency * 1000:.0f} ms, {args.queries} leituras")
+
+        started = time.perf_counter()
+        mirror.sync(OWNER, service)
+        print(f"  sincronização completa: {time.perf_counter() - started:.2f}s ({calendar.requests} requisições)\n")
+
+        print(f"  {'leitura':<28} {'p50 ms':>8} {'p95 ms':>8} {'req/leitura':>11} {'confere':>8}")
+        requests = calendar.requests
+        expected, latencies = measure(lambda a, b: list_events(service, a, b), queries)
+        report("API (events.list)", latencies, calendar.requests - requests, None)
+
+        requests = calendar.requests
+        after_full_sync, latencies = measure(lambda a, b: mirror.events(OWNER, lambda: service, a, b), queries)
+        report("espelho", latencies, calendar.requests - requests, same_events(expected, after_full_sync))
+
+        # Uma sincronização incremental (sem mudanças) antes de cada leitura
+        mirror.max_staleness = 0
+        requests = calendar.requests
+        found, latencies = measure(lambda a, b: mirror.events(OWNER, lambda: service, a, b), queries)
+        report("espelho + sync incremental", latencies, calendar.requests - requests, same_events(expected, found))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compara backends/modelos de embedding em CPU: vazão (embeddings/s) na indexação dos chunks de um PDF
+e recall@k da busca em relação ao modelo atual (torch, EMBEDDING_MODEL_ID).
+
+A busca é exata e feita em memória, sem depender do pgvector. Exemplos:
+
+    python benchmarks/bench_embeddings.py --candidate onnx --candidate onnx-int8 --candidate torch-int8
+    python benchmarks/bench_embeddings.py --candidate torch:sentence-transformers/all-MiniLM-L6-v2
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from config.settings import EMBEDDING_MODEL_ID
+from src.agents.prompts.intents import intent_examples
+from src.knowledge.embedders import SharedSentenceTransformerEmbedder
+from src.knowledge.ingestion import read_chunks
+from src.knowledge.knowledge_base import build_reader
+
+
+def parse_candidate(value: str):
+    """
+    "backend" ou "backend:modelo" (modelo padrão = EMBEDDING_MODEL_ID).
+    """
+    backend, _, model_id = value.partition(":")
+    return backend, model_id or EMBEDDING_MODEL_ID
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.clip(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12, None)
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def run(backend: str, model_id: str, chunks, queries, batch_size: int, k: int):
+    embedder = SharedSentenceTransformerEmbedder(id=model_id, backend=backend, batch_size=batch_size)
+
+    started = time.perf_counter()
+    embedder.get_model()
+    load_seconds = time.perf_counter() - started
+
+    # Aquecimento (primeiro forward inclui alocações e, no ONNX, a otimização do grafo)
+    embedder.get_embeddings(chunks[:batch_size])
+
+    started = time.perf_counter()
+    corpus = normalize(np.asarray(embedder.get_embeddings(chunks), dtype=np.float32))
+    corpus_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for query in queries:
+        embedder.get_embedding(query)
+    query_seconds = time.perf_counter() - started
+
+    query_matrix = normalize(np.asarray(embedder.get_embeddings(queries), dtype=np.float32))
+    return {
+        "load_seconds": load_seconds,
+        "embeddings_per_second": len(chunks) / corpus_seconds,
+        "query_ms": query_seconds / len(queries) * 1000,
+        "dimensions": corpus.shape[1],
+        "top_k": top_k(query_matrix, corpus, k),
+    }
+
+
+def recall(baseline: np.ndarray, candidate: np.ndarray) -> float:
+    hits = sum(len(set(expected) & set(found)) for expected, found in zip(baseline, candidate))
+    return hits / baseline.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de backends de embedding (vazão e recall@k)")
+    parser.add_argument("--pdf", default="data/Base.pdf", help="PDF usado como corpus")
+    parser.add_argument(
+        "--candidate",
+        action="append",
+        default=[],
+        help="backend[:modelo] a comparar com o modelo atual (torch, torch-int8, onnx, onnx-int8); pode repetir",
+    )
+    parser.add_argument("--queries", default=None, help="Arquivo com uma consulta por linha (padrão: exemplos de Help do roteador)")
+    parser.add_argument("--k", type=int, default=5, help="Tamanho do top-k usado no recall")
+    parser.add_argument("--batch-size", type=int, default=32, help="Textos por forward do modelo")
+    parser.add_argument("--threads", type=int, default=None, help="Threads do torch (padrão: todas)")
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+
+        torch.set_num_threads(args.threads)
+
+    chunks = [doc.content for doc in read_chunks(Path(args.pdf), build_reader())]
+    if args.queries:
+        queries = [line.strip() for line in Path(args.queries).read_text(encoding="utf-8").splitlines() if line.strip()]
+    else:
+        queries = intent_examples["Help"]
+    k = min(args.k, len(chunks))
+    print(f"Corpus: {len(chunks)} chunks de {args.pdf} | Consultas: {len(queries)} | k={k}")
+
+    baseline = run("torch", EMBEDDING_MODEL_ID, chunks, queries, args.batch_size, k)
+    rows = [("torch", EMBEDDING_MODEL_ID, baseline, 1.0)]
+    for value in args.candidate or ["onnx", "onnx-int8", "torch-int8"]:
+        backend, model_id = parse_candidate(value)
+        try:
+            result = run(backend, model_id, chunks, queries, args.batch_size, k)
+        except Exception as e:
+            print(f"{backend}:{model_id} falhou: {e}")
+            continue
+        rows.append((backend, model_id, result, recall(baseline["top_k"], result["top_k"])))
+
+    print()
+    print(f"{'backend':<11} {'modelo':<45} {'dim':>4} {'carga s':>8} {'emb/s':>8} {'consulta ms':>12} {'recall@' + str(k):>9}")
+    for backend, model_id, result, value in rows:
+        print(
+            f"{backend:<11} {model_id:<45} {result['dimensions']:>4} {result['load_seconds']:>8.1f} "
+            f"{result['embeddings_per_second']:>8.1f} {result['query_ms']:>12.1f} {value:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
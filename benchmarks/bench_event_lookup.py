@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca do evento alvo de edit_calendar_event / delete_calendar_event em calendários grandes,
+contra a Calendar API falsa (benchmarks/fake_calendar_api.py).
+
+Compara a busca antiga (uma página de 10 eventos da janela, filtrada em Python), a busca paginada com
+filtro q no servidor e a consulta indexada no espelho local. Para cada uma reporta a latência, as
+requisições à API por busca e a fração de buscas que devolvem exatamente os eventos esperados.
+Exemplo:
+
+    python benchmarks/bench_event_lookup.py --sizes 1000,5000,10000 --latency 0.08
+"""
+import argparse
+import datetime as dt
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from benchmarks.fake_calendar_api import TIMEZONE, FakeCalendar, build_service, serve
+from src.db.pool import SQLitePool
+from src.tools.calendar_mirror import CalendarMirror, event_bounds, event_emails, to_timestamp
+from src.tools.calendar_tools import search_events
+
+OWNER = "bench@example.com"
+# Sem corte nas medições: a exatidão compara com todos os eventos esperados
+LIMIT = 100_000
+
+
+def int_list(value: str):
+    return [int(item) for item in value.split(",") if item]
+
+
+def legacy_lookup(service, time_min, time_max, summary=None, attendee=None):
+    """
+    Busca anterior: só os 10 primeiros eventos da janela, filtrados localmente.
+    """
+    events = (
+        service.events()
+        .list(calendarId="primary", timeMin=time_min, timeMax=time_max, maxResults=10, singleEvents=True, orderBy="startTime")
+        .execute()
+        .get("items", [])
+    )
+    if summary:
+        events = [event for event in events if summary.lower() in event.get("summary", "").lower()]
+    if attendee:
+        events = [event for event in events if attendee in event_emails(event)]
+    return events
+
+
+def expected(calendar: FakeCalendar, time_min, time_max, summary=None, attendee=None):
+    min_ts, max_ts = to_timestamp(time_min), to_timestamp(time_max)
+    ids = set()
+    for event in calendar.events.values():
+        if event["status"] == "cancelled":
+            continue
+        start, end = event_bounds(event)
+        if not (start < max_ts and end > min_ts):
+            continue
+        if summary and summary.lower() not in event.get("summary", "").lower():
+            continue
+        if attendee and attendee not in event_emails(event):
+            continue
+        ids.add(event["id"])
+    return ids
+
+
+def lookups(calendar: FakeCalendar, count: int, rng):
+    """
+    Metade das buscas pelo título dentro da janela padrão do edit_calendar_event (30 dias a partir de hoje,
+    ou do dia do evento), metade por participante dentro do dia do evento.
+    """
+    today = dt.datetime.now(TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+    events = [event for event in calendar.events.values() if event["status"] != "cancelled"]
+    result = []
+    for i in range(count):
+        event = rng.choice(events)
+        start = dt.datetime.fromisoformat(event["start"]["dateTime"])
+        day = start.replace(hour=0, minute=0)
+        if i % 2 == 0:
+            window_start = today if start < today + dt.timedelta(days=30) else day
+            result.append(
+                {
+                    "summary": event["summary"],
+                    "time_min": window_start.isoformat(),
+                    "time_max": (window_start + dt.timedelta(days=30)).isoformat(),
+                }
+            )
+        else:
+            result.append(
+                {
+                    "attendee": rng.choice(event["attendees"])["email"],
+                    "time_min": day.isoformat(),
+                    "time_max": (day + dt.timedelta(days=1)).isoformat(),
+                }
+            )
+    return result
+
+
+def measure(calendar: FakeCalendar, lookup, queries):
+    latencies, correct = [], 0
+    requests = calendar.requests
+    for query in queries:
+        started = time.perf_counter()
+        found = lookup(**query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        correct += {event["id"] for event in found} == expected(calendar, **query)
+    return np.asarray(latencies), (calendar.requests - requests) / len(queries), correct / len(queries)
+
+
+def report(label: str, latencies: np.ndarray, requests: float, accuracy: float) -> None:
+    print(
+        f"  {label:<20} {np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} "
+        f"{requests:>8.2f} {accuracy:>8.1%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca do evento alvo de edição/exclusão: API x espelho indexado")
+    parser.add_argument("--sizes", type=int_list, default=[1000, 5000, 10000], help="Eventos no calendário")
+    parser.add_argument("--days", type=int, default=180, help="Período (dias a partir de hoje) dos eventos")
+    parser.add_argument("--latency", type=float, default=0.05, help="Atraso artificial por requisição à API (segundos)")
+    parser.add_argument("--queries", type=int, default=100, help="Buscas por medição")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        calendar = FakeCalendar()
+        calendar.seed(size, days=args.days, seed=args.seed)
+        server, api_endpoint = serve(calendar, latency=args.latency)
+        service = build_service(api_endpoint)
+        queries = lookups(calendar, args.queries, rng)
+
+        with tempfile.TemporaryDirectory() as directory:
+            mirror = CalendarMirror(SQLitePool(os.path.join(directory, "mirror.sqlite")), max_staleness=3600)
+            started = time.perf_counter()
+            mirror.sync(OWNER, service)
+            sync_seconds = time.perf_counter() - started
+
+            print(f"\n{size} eventos (sincronização completa do espelho: {sync_seconds:.2f}s)")
+            print(f"  {'busca':<20} {'p50 ms':>8} {'p95 ms':>8} {'req':>8} {'exatas':>8}")
+            report("10 primeiros", *measure(calendar, lambda **query: legacy_lookup(service, **query), queries))
+            report(
+                "paginada + q",
+                *measure(calendar, lambda **query: search_events(service, limit=LIMIT, **query), queries),
+            )
+            report(
+                "espelho indexado",
+                *measure(calendar, lambda **query: mirror.find(OWNER, lambda: service, limit=LIMIT, **query), queries),
+            )
+
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark do índice ANN do pgvector: latência das consultas e recall@k em relação à busca exata
+conforme o corpus cresce.
+
+Os vetores partem dos embeddings reais dos chunks de um PDF e são ampliados com variações
+sintéticas (ruído gaussiano) até cada tamanho pedido. Tudo é gravado numa tabela descartável,
+sem tocar na tabela da base de conhecimento. Exemplo:
+
+    python benchmarks/bench_retrieval.py --sizes 1000,10000,50000 --index hnsw --ef-search 10,40,100
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from agno.vectordb.pgvector import HNSW, Ivfflat
+from sqlalchemy import create_engine, text
+
+from config.settings import HNSW_EF_CONSTRUCTION, HNSW_M, PGVECTOR_DB_URL
+from src.agents.prompts.intents import intent_examples
+from src.knowledge.index import ensure_index, search_settings_sql
+from src.knowledge.ingestion import read_chunks
+from src.knowledge.knowledge_base import build_reader, embedder_factory
+
+
+def int_list(value: str):
+    return [int(item) for item in value.split(",") if item]
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.clip(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12, None)
+
+
+def synthetic(base: np.ndarray, count: int, noise: float, rng) -> np.ndarray:
+    """
+    Variações dos vetores base: cada vetor novo é um vetor base sorteado mais ruído gaussiano.
+    """
+    picks = base[rng.integers(0, len(base), size=count)]
+    jitter = rng.standard_normal(picks.shape).astype(np.float32) * noise / np.sqrt(base.shape[1])
+    return normalize(picks + jitter)
+
+
+def literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{value:.6f}" for value in vector) + "]"
+
+
+def create_table(engine, schema: str, table: str, dimensions: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+        conn.execute(text(f'DROP TABLE IF EXISTS "{schema}"."{table}"'))
+        conn.execute(text(f'CREATE TABLE "{schema}"."{table}" (id BIGINT PRIMARY KEY, embedding vector({dimensions}))'))
+
+
+def insert(engine, schema: str, table: str, vectors: np.ndarray, start_id: int, batch_size: int = 1000) -> None:
+    statement = text(f'INSERT INTO "{schema}"."{table}" (id, embedding) VALUES (:id, CAST(:embedding AS vector))')
+    for i in range(0, len(vectors), batch_size):
+        rows = [
+            {"id": start_id + i + offset, "embedding": literal(vector)}
+            for offset, vector in enumerate(vectors[i : i + batch_size])
+        ]
+        with engine.begin() as conn:
+            conn.execute(statement, rows)
+
+
+def search(engine, schema: str, table: str, queries: np.ndarray, k: int, index):
+    """
+    Executa as consultas (uma transação cada, com os parâmetros de busca do índice); retorna ids e latências em ms.
+    """
+    statement = text(
+        f'SELECT id FROM "{schema}"."{table}" ORDER BY embedding <=> CAST(:query AS vector) LIMIT :k'
+    )
+    results, latencies = [], []
+    for query in queries:
+        value = literal(query)
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            for setting in search_settings_sql(index):
+                conn.execute(text(setting))
+            ids = [row[0] for row in conn.execute(statement, {"query": value, "k": k})]
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(ids)
+    return results, np.asarray(latencies)
+
+
+def recall(exact, approximate, k: int) -> float:
+    hits = sum(len(set(expected) & set(found)) for expected, found in zip(exact, approximate))
+    return hits / (len(exact) * k)
+
+
+def report(label: str, param: str, build_seconds, latencies: np.ndarray, value: float) -> None:
+    build = f"{build_seconds:.1f}" if build_seconds is not None else "-"
+    print(
+        f"  {label:<8} {param:<14} {build:>8} {np.percentile(latencies, 50):>8.2f} "
+        f"{np.percentile(latencies, 95):>8.2f} {value:>9.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência e recall@k do índice ANN do pgvector por tamanho de corpus")
+    parser.add_argument("--pdf", default="data/Base.pdf", help="PDF cujos chunks geram os vetores base")
+    parser.add_argument("--sizes", type=int_list, default=[1000, 5000, 10000, 25000, 50000], help="Tamanhos do corpus")
+    parser.add_argument("--index", choices=["hnsw", "ivfflat", "both"], default="both")
+    parser.add_argument("--ef-search", type=int_list, default=[10, 20, 40, 80, 160], help="Valores de hnsw.ef_search")
+    parser.add_argument("--probes", type=int_list, default=[1, 5, 10, 20], help="Valores de ivfflat.probes")
+    parser.add_argument("--m", type=int, default=HNSW_M)
+    parser.add_argument("--ef-construction", type=int, default=HNSW_EF_CONSTRUCTION)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=100, help="Número de consultas por medição")
+    parser.add_argument("--noise", type=float, default=0.5, help="Intensidade do ruído das variações sintéticas")
+    parser.add_argument("--schema", default="ai")
+    parser.add_argument("--table", default="bench_retrieval")
+    parser.add_argument("--keep", action="store_true", help="Mantém a tabela descartável ao final")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    embedder = embedder_factory()
+    chunks = [doc.content for doc in read_chunks(Path(args.pdf), build_reader())]
+    base = normalize(np.asarray(embedder.get_embeddings(chunks), dtype=np.float32))
+
+    # Consultas reais (exemplos de Help do roteador) completadas com variações dos chunks
+    real_queries = normalize(np.asarray(embedder.get_embeddings(intent_examples["Help"]), dtype=np.float32))
+    queries = np.concatenate([real_queries, synthetic(base, max(0, args.queries - len(real_queries)), args.noise, rng)])
+    queries = queries[: args.queries]
+
+    engine = create_engine(PGVECTOR_DB_URL)
+    create_table(engine, args.schema, args.table, base.shape[1])
+    kinds = ["hnsw", "ivfflat"] if args.index == "both" else [args.index]
+    print(f"Vetores base: {len(base)} chunks de {args.pdf} | Dimensões: {base.shape[1]} | Consultas: {len(queries)} | k={args.k}")
+
+    rows = 0
+    try:
+        for size in sorted(args.sizes):
+            # O corpus cresce até o próximo tamanho: primeiro os chunks reais, depois as variações
+            if rows < size:
+                real = base[rows : min(size, len(base))]
+                extra = synthetic(base, size - rows - len(real), args.noise, rng)
+                insert(engine, args.schema, args.table, np.concatenate([real, extra]), start_id=rows)
+                rows = size
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    conn.execute(text(f'VACUUM ANALYZE "{args.schema}"."{args.table}"'))
+
+            print()
+            print(f"Corpus: {rows} vetores")
+            print(f"  {'índice':<8} {'parâmetro':<14} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'recall@' + str(args.k):>9}")
+
+            ensure_index(engine, args.schema, args.table, None)
+            exact, latencies = search(engine, args.schema, args.table, queries, args.k, None)
+            report("exata", "-", None, latencies, 1.0)
+
+            for kind in kinds:
+                if kind == "hnsw":
+                    build = ensure_index(engine, args.schema, args.table, HNSW(m=args.m, ef_construction=args.ef_construction))
+                    settings = [(f"ef_search={value}", HNSW(ef_search=value)) for value in args.ef_search]
+                else:
+                    build = ensure_index(engine, args.schema, args.table, Ivfflat(dynamic_lists=True))
+                    settings = [(f"probes={value}", Ivfflat(probes=value)) for value in args.probes]
+
+                for index, (param, search_index) in enumerate(settings):
+                    found, latencies = search(engine, args.schema, args.table, queries, args.k, search_index)
+                    report(kind, param, build["seconds"] if index == 0 else None, latencies, recall(exact, found, args.k))
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f'DROP TABLE IF EXISTS "{args.schema}"."{args.table}"'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita o subconjunto da Google Calendar API v3 usado pelas ferramentas de calendário,
+para medir e verificar o espelho local sem rede nem credenciais.
+
+Implementa events.list (timeMin/timeMax, q, paginação, orderBy, showDeleted e syncToken, com 410 para
+tokens invalidados), events.get/insert/update/patch/delete, events.watch e freebusy.query (o calendário
+"primary" tem todos os eventos; o de um email, os eventos em que ele participa). Cada mudança recebe
+um número de sequência; o syncToken é a última sequência vista pelo cliente. Um serviço do
+googleapiclient aponta para ele com client_options={"api_endpoint": base_url}. Exemplo:
+
+    python benchmarks/fake_calendar_api.py --events 5000 --port 8765 --latency 0.08
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+TIMEZONE = dt.timezone(dt.timedelta(hours=-3))
+
+_EVENTS_PATH = re.compile(r"^/calendar/v3/calendars/([^/]+)/events(?:/([^/]+))?$")
+
+
+def _timestamp(value: str) -> float:
+    parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=TIMEZONE)
+    return parsed.timestamp()
+
+
+def _bounds(event: Dict) -> Tuple[float, float]:
+    start, end = event["start"], event["end"]
+    return _timestamp(start.get("dateTime") or start["date"]), _timestamp(end.get("dateTime") or end["date"])
+
+
+class FakeCalendar:
+    def __init__(self):
+        self.events: Dict[str, Dict] = {}
+        self.sequence = 0
+        # Tokens com sequência menor que esta recebem 410 Gone
+        self.min_sync_sequence = 0
+        self.channels: List[Dict] = []
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _touch(self, event: Dict) -> Dict:
+        self.sequence += 1
+        event["_sequence"] = self.sequence
+        event["updated"] = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        self.events[event["id"]] = event
+        return event
+
+    @staticmethod
+    def _public(event: Dict) -> Dict:
+        return {key: value for key, value in event.items() if not key.startswith("_")}
+
+    def insert(self, body: Dict) -> Dict:
+        with self._lock:
+            event = dict(body, id=body.get("id") or uuid.uuid4().hex, status="confirmed")
+            event.setdefault("organizer", {"email": "owner@example.com", "self": True})
+            return self._public(self._touch(event))
+
+    def get(self, event_id: str) -> Optional[Dict]:
+        event = self.events.get(event_id)
+        return self._public(event) if event and event["status"] != "cancelled" else None
+
+    def update(self, event_id: str, body: Dict) -> Optional[Dict]:
+        with self._lock:
+            if event_id not in self.events or self.events[event_id]["status"] == "cancelled":
+                return None
+            event = dict(body, id=event_id, status="confirmed")
+            return self._public(self._touch(event))
+
+    def patch(self, event_id: str, body: Dict) -> Optional[Dict]:
+        with self._lock:
+            if event_id not in self.events or self.events[event_id]["status"] == "cancelled":
+                return None
+            event = dict(self.events[event_id], **body, id=event_id, status="confirmed")
+            return self._public(self._touch(event))
+
+    def delete(self, event_id: str) -> bool:
+        with self._lock:
+            event = self.events.get(event_id)
+            if event is None or event["status"] == "cancelled":
+                return False
+            self._touch({"id": event_id, "status": "cancelled", "start": event["start"], "end": event["end"]})
+            return True
+
+    def expire_sync_tokens(self) -> None:
+        with self._lock:
+            self.min_sync_sequence = self.sequence + 1
+
+    @staticmethod
+    def _matches(event: Dict, query: str) -> bool:
+        fields = [event.get(key, "") for key in ("summary", "description", "location")]
+        fields += [attendee.get("email", "") for attendee in event.get("attendees", [])]
+        fields.append(event.get("organizer", {}).get("email", ""))
+        text = " ".join(fields).lower()
+        return all(term in text for term in query.lower().split())
+
+    def list(self, params: Dict[str, str]) -> Tuple[int, Dict]:
+        with self._lock:
+            events = list(self.events.values())
+            sequence = self.sequence
+
+            if "syncToken" in params:
+                if int(params["syncToken"]) < self.min_sync_sequence:
+                    return 410, {"error": {"code": 410, "message": "Sync token is no longer valid, a full sync is required."}}
+                since = int(params["syncToken"])
+                events = [event for event in events if event["_sequence"] > since]
+                events.sort(key=lambda event: event["_sequence"])
+            else:
+                if params.get("showDeleted") != "true":
+                    events = [event for event in events if event["status"] != "cancelled"]
+                if "timeMin" in params:
+                    time_min = _timestamp(params["timeMin"])
+                    events = [event for event in events if _bounds(event)[1] > time_min]
+                if "timeMax" in params:
+                    time_max = _timestamp(params["timeMax"])
+                    events = [event for event in events if _bounds(event)[0] < time_max]
+                if params.get("q"):
+                    events = [event for event in events if event["status"] != "cancelled" and self._matches(event, params["q"])]
+                if params.get("orderBy") == "startTime":
+                    events.sort(key=lambda event: _bounds(event)[0])
+                else:
+                    events.sort(key=lambda event: event["_sequence"])
+
+        offset = int(params.get("pageToken") or 0)
+        page_size = min(int(params.get("maxResults") or 250), 2500)
+        page = events[offset : offset + page_size]
+        result = {"kind": "calendar#events", "items": [self._public(event) for event in page]}
+        if offset + page_size < len(events):
+            result["nextPageToken"] = str(offset + page_size)
+        elif not params.get("q") and "timeMax" not in params:
+            result["nextSyncToken"] = str(sequence)
+        return 200, result
+
+    def watch(self, body: Dict) -> Dict:
+        ttl = int(body.get("params", {}).get("ttl", 604800))
+        channel = {
+            "kind": "api#channel",
+            "id": body["id"],
+            "resourceId": uuid.uuid4().hex,
+            "token": body.get("token"),
+            "expiration": str(int((time.time() + ttl) * 1000)),
+        }
+        self.channels.append(channel)
+        return channel
+
+    def freebusy(self, body: Dict) -> Dict:
+        time_min, time_max = _timestamp(body["timeMin"]), _timestamp(body["timeMax"])
+        utc = lambda value: dt.datetime.fromtimestamp(value, tz=dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock:
+            events = [event for event in self.events.values() if event["status"] != "cancelled"]
+
+        calendars = {}
+        for item in body.get("items", []):
+            calendar_id = item["id"]
+            busy = []
+            for event in events:
+                emails = {attendee.get("email") for attendee in event.get("attendees", [])}
+                if calendar_id != "primary" and calendar_id not in emails:
+                    continue
+                start, end = _bounds(event)
+                if start < time_max and end > time_min:
+                    busy.append((max(start, time_min), min(end, time_max)))
+            calendars[calendar_id] = {"busy": [{"start": utc(start), "end": utc(end)} for start, end in sorted(busy)]}
+        return {"kind": "calendar#freeBusy", "timeMin": body["timeMin"], "timeMax": body["timeMax"], "calendars": calendars}
+
+    def seed(self, count: int, days: int = 120, attendees: int = 50, seed: int = 42) -> None:
+        """
+        count eventos sintéticos de 30 a 120 minutos, em horário comercial, espalhados por days dias a partir de hoje.
+        """
+        rng = random.Random(seed)
+        people = [f"user{i}@example.com" for i in range(attendees)]
+        topics = ["Sync", "Review", "Planning", "1:1", "Retro", "Demo", "Interview", "Budget", "Roadmap", "Standup"]
+        today = dt.datetime.now(TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+        for i in range(count):
+            start = today + dt.timedelta(days=rng.randrange(days), hours=rng.randrange(8, 18), minutes=rng.choice([0, 15, 30, 45]))
+            end = start + dt.timedelta(minutes=rng.choice([30, 45, 60, 90, 120]))
+            self.insert(
+                {
+                    "summary": f"{rng.choice(topics)} {i}",
+                    "description": f"Synthetic event {i}",
+                    "start": {"dateTime": start.isoformat(), "timeZone": "America/Sao_Paulo"},
+                    "end": {"dateTime": end.isoformat(), "timeZone": "America/Sao_Paulo"},
+                    "attendees": [{"email": email} for email in rng.sample(people, rng.randint(1, 4))],
+                }
+            )
+
+
+def make_handler(calendar: FakeCalendar, latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: Optional[Dict] = None) -> None:
+            payload = json.dumps(body).encode("utf-8") if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _body(self) -> Dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _route(self, method: str) -> None:
+            calendar.requests += 1
+            if latency:
+                time.sleep(latency)
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            match = _EVENTS_PATH.match(url.path)
+            not_found = {"error": {"code": 404, "message": "Not Found"}}
+
+            if method == "POST" and url.path == "/calendar/v3/freeBusy":
+                return self._send(200, calendar.freebusy(self._body()))
+
+            if match is None:
+                return self._send(404, not_found)
+            event_id = match.group(2)
+
+            if method == "GET" and event_id is None:
+                return self._send(*calendar.list(params))
+            if method == "POST" and event_id is None:
+                return self._send(200, calendar.insert(self._body()))
+            if method == "POST" and event_id == "watch":
+                return self._send(200, calendar.watch(self._body()))
+            if method == "GET":
+                event = calendar.get(event_id)
+                return self._send(200, event) if event else self._send(404, not_found)
+            if method in ("PUT", "PATCH"):
+                update = calendar.update if method == "PUT" else calendar.patch
+                event = update(event_id, self._body())
+                return self._send(200, event) if event else self._send(404, not_found)
+            if method == "DELETE":
+                return self._send(204) if calendar.delete(event_id) else self._send(410, {"error": {"code": 410, "message": "Resource has been deleted"}})
+            return self._send(404, not_found)
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_POST(self):
+            self._route("POST")
+
+        def do_PUT(self):
+            self._route("PUT")
+
+        def do_PATCH(self):
+            self._route("PATCH")
+
+        def do_DELETE(self):
+            self._route("DELETE")
+
+    return Handler
+
+
+def serve(calendar: FakeCalendar, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+    """
+    Inicia o servidor numa thread; retorna (servidor, api_endpoint para o client_options do googleapiclient).
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(calendar, latency))
+    threading.Thread(target=server.serve_forever, name="fake-calendar-api", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/calendar/v3/"
+
+
+def build_service(api_endpoint: str):
+    """
+    Serviço do googleapiclient (mesmo documento de descoberta do CalendarServicePool) apontando para o servidor local.
+    """
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+
+    return build_from_document(
+        get_static_doc("calendar", "v3"),
+        http=httplib2.Http(),
+        client_options={"api_endpoint": api_endpoint},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Google Calendar API falsa para testes e benchmarks locais")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--events", type=int, default=1000, help="Eventos sintéticos criados ao iniciar")
+    parser.add_argument("--latency", type=float, default=0.0, help="Atraso artificial por requisição (segundos)")
+    args = parser.parse_args()
+
+    calendar = FakeCalendar()
+    calendar.seed(args.events)
+    server, api_endpoint = serve(calendar, args.host, args.port, args.latency)
+    print(f"Calendar API falsa com {args.events} eventos em {api_endpoint} (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
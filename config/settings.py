@@ -0,0 +1,185 @@
+"""
+Configurações centralizadas da aplicação, lidas de config/.env
+"""
+import os
+import re
+
+import dotenv
+
+dotenv.load_dotenv("config/.env")
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# Banco de usuários (SQLite)
+USER_DB_PATH = os.getenv("USER_DB_PATH", "database/usuarios.sqlite")
+USER_DB_POOL_SIZE = env_int("USER_DB_POOL_SIZE", 8)
+USER_EMAIL_CACHE_SIZE = env_int("USER_EMAIL_CACHE_SIZE", 1024)
+
+# Sessões da API: "sqlite" (compartilhado entre workers da máquina), "postgres" (entre máquinas)
+# ou "memory" (apenas este processo)
+TOKEN_STORE_BACKEND = os.getenv("TOKEN_STORE_BACKEND", "sqlite").lower()
+TOKEN_DB_PATH = os.getenv("TOKEN_DB_PATH", "database/sessions.sqlite")
+TOKEN_DB_URL = os.getenv("TOKEN_DB_URL", "")
+TOKEN_TTL = env_int("TOKEN_TTL", 43200)
+TOKEN_CACHE_TTL = env_int("TOKEN_CACHE_TTL", 30)
+TOKEN_CACHE_SIZE = env_int("TOKEN_CACHE_SIZE", 4096)
+TOKEN_SWEEP_INTERVAL = env_int("TOKEN_SWEEP_INTERVAL", 300)
+
+# Banco vetorial (pgvector)
+PGVECTOR_HOST = os.getenv("PGVECTOR_HOST", "localhost")
+PGVECTOR_PORT = os.getenv("PGVECTOR_PORT", "5532")
+PGVECTOR_DB = os.getenv("PGVECTOR_DB", "ai")
+PGVECTOR_USER = os.getenv("PGVECTOR_USER", "ai")
+PGVECTOR_PASSWORD = os.getenv("PGVECTOR_PASSWORD", "ai")
+PGVECTOR_DB_URL = (
+    f"postgresql+psycopg://{PGVECTOR_USER}:{PGVECTOR_PASSWORD}"
+    f"@{PGVECTOR_HOST}:{PGVECTOR_PORT}/{PGVECTOR_DB}"
+)
+
+# Modelo de embeddings
+DEFAULT_EMBEDDING_MODEL_ID = "sentence-transformers/all-mpnet-base-v2"
+EMBEDDING_MODEL_ID = os.getenv("EMBEDDING_MODEL_ID", DEFAULT_EMBEDDING_MODEL_ID)
+EMBEDDING_DIMENSIONS = env_int("EMBEDDING_DIMENSIONS", 768)
+# Backend de inferência: torch, torch-int8 (pesos quantizados dinamicamente), onnx ou onnx-int8 (ONNX Runtime)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+# Arquivo ONNX dentro do repositório do modelo (vazio = padrão do backend)
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "")
+# Micro-lotes para embeddings de consultas (tamanho máximo, espera máxima em ms) e cache LRU de consultas
+EMBEDDING_MICROBATCH = env_bool("EMBEDDING_MICROBATCH", True)
+EMBEDDING_MAX_BATCH = env_int("EMBEDDING_MAX_BATCH", 32)
+EMBEDDING_MAX_WAIT_MS = env_float("EMBEDDING_MAX_WAIT_MS", 5.0)
+EMBEDDING_QUERY_CACHE_SIZE = env_int("EMBEDDING_QUERY_CACHE_SIZE", 2048)
+# Serviço de embeddings compartilhado pelos workers (vazio = modelo carregado em cada processo)
+EMBEDDING_SERVICE_URL = os.getenv("EMBEDDING_SERVICE_URL", "")
+EMBEDDING_SERVICE_PORT = env_int("EMBEDDING_SERVICE_PORT", 8001)
+
+
+def default_knowledge_table(model_id: str) -> str:
+    """
+    Tabela padrão de cada modelo: vetores de modelos diferentes não podem dividir a mesma tabela.
+    """
+    if model_id == DEFAULT_EMBEDDING_MODEL_ID:
+        return "sentence_transformer_embeddings"
+    return "embeddings_" + re.sub(r"[^a-z0-9]+", "_", model_id.split("/")[-1].lower()).strip("_")
+
+
+# Base de conhecimento (RAG)
+KNOWLEDGE_PATH = os.getenv("KNOWLEDGE_PATH", "data")
+# Raiz do corpus: as origens ficam no manifesto relativas a ela, independente do diretório de trabalho
+KNOWLEDGE_ROOT = os.getenv("KNOWLEDGE_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+KNOWLEDGE_TABLE = os.getenv("KNOWLEDGE_TABLE", default_knowledge_table(EMBEDDING_MODEL_ID))
+KNOWLEDGE_MANIFEST_TABLE = os.getenv("KNOWLEDGE_MANIFEST_TABLE", "knowledge_manifest")
+# Divisão dos PDFs: "section" (por seções), "recursive" ou "fixed"; tamanho e sobreposição em caracteres
+CHUNK_STRATEGY = os.getenv("CHUNK_STRATEGY", "section").lower()
+CHUNK_SIZE = env_int("CHUNK_SIZE", 1500)
+CHUNK_OVERLAP = env_int("CHUNK_OVERLAP", 150)
+
+# Índice ANN da tabela do pgvector: "hnsw", "ivfflat" ou "none" (busca exata)
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "hnsw").lower()
+HNSW_M = env_int("HNSW_M", 16)
+HNSW_EF_CONSTRUCTION = env_int("HNSW_EF_CONSTRUCTION", 64)
+HNSW_EF_SEARCH = env_int("HNSW_EF_SEARCH", 40)
+# 0 = automático (linhas/1000 até 1M de linhas, raiz quadrada das linhas acima disso)
+IVFFLAT_LISTS = env_int("IVFFLAT_LISTS", 0)
+IVFFLAT_PROBES = env_int("IVFFLAT_PROBES", 10)
+# Memória usada na construção do índice (construções que não cabem nela ficam bem mais lentas)
+VECTOR_INDEX_BUILD_MEMORY = os.getenv("VECTOR_INDEX_BUILD_MEMORY", "512MB")
+
+# Recuperação do helper_agent: "hybrid" (busca textual + vetorial, fundidas por RRF) ou "vector"
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+RETRIEVAL_NUM_DOCUMENTS = env_int("RETRIEVAL_NUM_DOCUMENTS", 5)
+# Candidatos buscados em cada lista antes da fusão / do re-ranking
+RETRIEVAL_CANDIDATES = env_int("RETRIEVAL_CANDIDATES", 20)
+RETRIEVAL_RRF_K = env_int("RETRIEVAL_RRF_K", 60)
+# Configuração de texto do Postgres: a do idioma da base (data/Base.pdf está em português), para que
+# stopwords como "de" e "para" não casem com quase todo chunk; "simple" para documentos em mais de um idioma
+RETRIEVAL_TEXT_LANGUAGE = os.getenv("RETRIEVAL_TEXT_LANGUAGE", "portuguese")
+# Re-ranking dos candidatos com um cross-encoder em CPU
+RERANKER_ENABLED = env_bool("RERANKER_ENABLED", False)
+RERANKER_MODEL_ID = os.getenv("RERANKER_MODEL_ID", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+# Orçamento de tokens do contexto recuperado por busca (0 = sem limite nem deduplicação)
+RETRIEVAL_CONTEXT_TOKENS = env_int("RETRIEVAL_CONTEXT_TOKENS", 1500)
+# Execuções anteriores da conversa incluídas no prompt do helper_agent
+HELPER_HISTORY_RUNS = env_int("HELPER_HISTORY_RUNS", 5)
+
+# Busca na web do helper_agent: "tavily" ou "stub" (backend local para testes offline), com cache TTL/LRU
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "tavily").lower()
+SEARCH_CACHE_TTL = env_int("SEARCH_CACHE_TTL", 600)
+SEARCH_CACHE_MAX_ENTRIES = env_int("SEARCH_CACHE_MAX_ENTRIES", 1000)
+SEARCH_MAX_RESULTS = env_int("SEARCH_MAX_RESULTS", 5)
+
+# Resolução local dos convidados do calendário (o auxiliar_calendar_agent só é chamado em caso de ambiguidade)
+ATTENDEE_RESOLVER_ENABLED = env_bool("ATTENDEE_RESOLVER_ENABLED", True)
+ATTENDEE_FUZZY_CUTOFF = env_float("ATTENDEE_FUZZY_CUTOFF", 0.85)
+ATTENDEE_DIRECTORY_REFRESH = env_int("ATTENDEE_DIRECTORY_REFRESH", 60)
+
+# Espelho local do Google Calendar (SQLite) mantido com sincronização incremental (syncToken)
+CALENDAR_MIRROR_ENABLED = env_bool("CALENDAR_MIRROR_ENABLED", True)
+CALENDAR_MIRROR_DB_PATH = os.getenv("CALENDAR_MIRROR_DB_PATH", "database/calendar_mirror.sqlite")
+CALENDAR_MIRROR_MAX_STALENESS = env_float("CALENDAR_MIRROR_MAX_STALENESS", 30)
+CALENDAR_MIRROR_PAST_DAYS = env_int("CALENDAR_MIRROR_PAST_DAYS", 30)
+# URL pública (HTTPS) de /calendar/notifications para os canais de notificação; vazia = sem canais
+CALENDAR_WEBHOOK_URL = os.getenv("CALENDAR_WEBHOOK_URL", "")
+CALENDAR_WEBHOOK_STALENESS = env_float("CALENDAR_WEBHOOK_STALENESS", 600)
+CALENDAR_WEBHOOK_TTL = env_int("CALENDAR_WEBHOOK_TTL", 604800)
+
+# Busca de horários livres (find_free_slots): expediente, dias úteis (ISO, 1 = segunda) e granularidade em minutos
+CALENDAR_WORKING_HOURS = os.getenv("CALENDAR_WORKING_HOURS", "09:00-18:00")
+CALENDAR_WORKING_DAYS = os.getenv("CALENDAR_WORKING_DAYS", "1-5")
+CALENDAR_SLOT_STEP = env_int("CALENDAR_SLOT_STEP", 15)
+
+# Handles de eventos por conversa ("E1", "last") usados em pedidos de acompanhamento
+EVENT_HANDLE_TTL = env_int("EVENT_HANDLE_TTL", 1800)
+EVENT_HANDLE_MAX_SESSIONS = env_int("EVENT_HANDLE_MAX_SESSIONS", 10000)
+
+# Histórico dos agentes: SQLite local por padrão; URL do Postgres para compartilhar entre máquinas
+AGENT_STORAGE_DB_URL = os.getenv("AGENT_STORAGE_DB_URL", "")
+
+# Modo de produção da API (run_api.py --prod)
+API_WORKERS = env_int("API_WORKERS", 1)
+
+# Aquecimento dos agentes em segundo plano na inicialização da API
+AGENT_WARMUP = env_bool("AGENT_WARMUP", True)
+
+# Classificador local de intenção (antes do agente identificador)
+INTENT_ROUTER_ENABLED = env_bool("INTENT_ROUTER_ENABLED", True)
+INTENT_ROUTER_THRESHOLD = env_float("INTENT_ROUTER_THRESHOLD", 0.6)
+INTENT_ROUTER_MARGIN = env_float("INTENT_ROUTER_MARGIN", 0.05)
+
+# Execução especulativa: quando o classificador local não decide, o ramo mais provável roda em paralelo ao identificador
+SPECULATIVE_EXECUTION = env_bool("SPECULATIVE_EXECUTION", False)
+SPECULATIVE_MIN_SCORE = env_float("SPECULATIVE_MIN_SCORE", 0.35)
+
+# Verificação das respostas: "local" aprova localmente as respostas limpas e só chama o revisor (LLM)
+# quando algo é sinalizado; "llm" envia todas as respostas ao revisor
+MODERATION_MODE = os.getenv("MODERATION_MODE", "local").lower()
+MODERATION_DENYLIST_FILE = os.getenv("MODERATION_DENYLIST_FILE", "")
+
+# Cache semântico de respostas verificadas do helper_agent
+SEMANTIC_CACHE_ENABLED = env_bool("SEMANTIC_CACHE_ENABLED", True)
+SEMANTIC_CACHE_THRESHOLD = env_float("SEMANTIC_CACHE_THRESHOLD", 0.92)
+SEMANTIC_CACHE_TTL = env_int("SEMANTIC_CACHE_TTL", 3600)
+SEMANTIC_CACHE_MAX_ENTRIES = env_int("SEMANTIC_CACHE_MAX_ENTRIES", 1000)
+SEMANTIC_CACHE_VERSION_CHECK = env_int("SEMANTIC_CACHE_VERSION_CHECK", 60)
+
+# Limite de conversas simultâneas por processo e contrapressão (429 + Retry-After)
+CHAT_MAX_CONCURRENCY = env_int("CHAT_MAX_CONCURRENCY", 200)
+CHAT_MAX_QUEUE = env_int("CHAT_MAX_QUEUE", 100)
+CHAT_QUEUE_TIMEOUT = env_float("CHAT_QUEUE_TIMEOUT", 5.0)
+CHAT_RETRY_AFTER = env_int("CHAT_RETRY_AFTER", 5)
@@ -1,13 +1,74 @@
 #!/usr/bin/env python3
 """
 Script para executar o servidor FastAPI
+
+Desenvolvimento (padrão): um processo com reload.
+Produção (--prod): N workers sem reload; com --embedding-service o modelo de embeddings é
+carregado uma única vez num processo compartilhado em vez de uma vez por worker.
 """
-import uvicorn
-import sys
+import argparse
 import os
+import subprocess
+import sys
+import time
+
+import httpx
+import uvicorn
 
 # Adicionar o diretório src ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+from config.settings import API_WORKERS, EMBEDDING_SERVICE_PORT
+
+
+def start_embedding_service(port: int, timeout: float = 300) -> subprocess.Popen:
+    """
+    Inicia o serviço de embeddings e espera o modelo carregar.
+    """
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_embedding_service.py"), "--port", str(port)]
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("O serviço de embeddings encerrou durante a inicialização")
+        try:
+            if httpx.get(f"{url}/health", timeout=2).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(1)
+
+    process.terminate()
+    raise RuntimeError("Tempo esgotado aguardando o serviço de embeddings")
+
+
 if __name__ == "__main__":
-    uvicorn.run("api.api:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Servidor da API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--prod", action="store_true", help="Modo de produção: vários workers, sem reload")
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Workers no modo de produção")
+    parser.add_argument(
+        "--embedding-service",
+        action="store_true",
+        help="Inicia o serviço de embeddings compartilhado e aponta os workers para ele",
+    )
+    args = parser.parse_args()
+
+    if not args.prod:
+        uvicorn.run("api.api:app", host=args.host, port=args.port, reload=True)
+        sys.exit(0)
+
+    embedding_service = None
+    if args.embedding_service:
+        embedding_service = start_embedding_service(EMBEDDING_SERVICE_PORT)
+        # Herdado pelos workers (lido em config/settings.py)
+        os.environ["EMBEDDING_SERVICE_URL"] = f"http://127.0.0.1:{EMBEDDING_SERVICE_PORT}"
+
+    try:
+        uvicorn.run("api.api:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        if embedding_service is not None:
+            embedding_service.terminate()
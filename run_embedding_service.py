@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Script para executar o serviço de embeddings compartilhado pelos workers da API
+"""
+import argparse
+import os
+import sys
+
+import uvicorn
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config.settings import EMBEDDING_SERVICE_PORT
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço de embeddings (um por máquina)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=EMBEDDING_SERVICE_PORT)
+    args = parser.parse_args()
+
+    uvicorn.run("src.knowledge.embedding_service:app", host=args.host, port=args.port)
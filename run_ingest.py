@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Script para indexar os documentos da base de conhecimento no pgvector
+"""
+import argparse
+import os
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config.settings import KNOWLEDGE_PATH, RETRIEVAL_MODE, RETRIEVAL_TEXT_LANGUAGE
+from src.knowledge.index import build_vector_index, ensure_text_index, ensure_vector_db_index
+from src.knowledge.knowledge_base import build_reader, build_vector_db, chunking_config, embedder_factory
+from src.knowledge.pipeline import ingest_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão offline da base de conhecimento")
+    parser.add_argument("--path", default=KNOWLEDGE_PATH, help="PDF ou diretório de PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="Processos do pool (padrão: núcleos da máquina)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Linhas por escrita no pgvector")
+    parser.add_argument("--embed-batch-size", type=int, default=64, help="Chunks por tarefa de embedding")
+    parser.add_argument("--full", action="store_true", help="Descarta o índice atual e reingere tudo")
+    parser.add_argument("--reindex", action="store_true", help="Reconstrói o índice ANN mesmo sem mudança de parâmetros")
+    args = parser.parse_args()
+
+    vector_db = build_vector_db()
+    stats = ingest_corpus(
+        vector_db=vector_db,
+        reader=build_reader(),
+        embedder_factory=embedder_factory,
+        path=args.path,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        embed_batch_size=args.embed_batch_size,
+        full=args.full,
+        config_hash=chunking_config(),
+    )
+
+    print(f"Documentos: {stats['documents']} ({stats['changed_documents']} alterados)")
+    print(f"Páginas: {stats['pages']} | Chunks: {stats['chunks']} | Embeddings: {stats['embeddings']} | Removidos: {stats['deleted']}")
+    print(f"Tempo total: {stats['seconds']:.2f}s")
+    print(
+        f"Vazão: {stats['pages_per_second']:.1f} páginas/s, "
+        f"{stats['chunks_per_second']:.1f} chunks/s, "
+        f"{stats['embeddings_per_second']:.1f} embeddings/s"
+    )
+
+    # Índice ANN criado depois da carga (construir sobre a tabela pronta é bem mais rápido)
+    index = ensure_vector_db_index(vector_db, build_vector_index(), force=args.reindex)
+    print(f"Índice ANN: {index['index'] or 'nenhum (busca exata)'} ({index['action']}, {index['seconds']:.2f}s)")
+
+    if RETRIEVAL_MODE == "hybrid":
+        print(f"Índice textual: {ensure_text_index(vector_db, RETRIEVAL_TEXT_LANGUAGE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,115 +1,546 @@
 import os
 import dotenv
 import datetime
+import time
+import asyncio
+import hashlib
+import json
+import re
 
 # Prompts
 from src.agents.prompts.calendar import prompt_calendar, prompt_calendar_auxiliar
 from src.agents.prompts.revisor import prompt_revisor
 from src.agents.prompts.helper import prompt_helper
 from src.agents.prompts.identifier import prompt_identifier
+from src.agents.prompts.intents import intent_examples
 
-# Agno
-from agno.storage.sqlite import SqliteStorage
-from agno.tools.tavily import TavilyTools
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
-from agno.embedder.sentence_transformer import SentenceTransformerEmbedder
-from agno.knowledge.pdf import PDFKnowledgeBase, PDFReader
-from agno.vectordb.pgvector import PgVector
-
-# Tools
-from src.tools.calendar_tools import (
-    get_calendar_events,
-    create_calendar_event,
-    current_time_tool,
-    time_delta_tool,
-    specific_time_tool,
-    get_user_email,
-    edit_calendar_event,
-    delete_calendar_event,
+from config.settings import (
+    AGENT_STORAGE_DB_URL,
+    ATTENDEE_DIRECTORY_REFRESH,
+    ATTENDEE_FUZZY_CUTOFF,
+    ATTENDEE_RESOLVER_ENABLED,
+    EMBEDDING_MICROBATCH,
+    HELPER_HISTORY_RUNS,
+    INTENT_ROUTER_ENABLED,
+    INTENT_ROUTER_MARGIN,
+    INTENT_ROUTER_THRESHOLD,
+    MODERATION_DENYLIST_FILE,
+    MODERATION_MODE,
+    RERANKER_ENABLED,
+    RERANKER_MODEL_ID,
+    RETRIEVAL_CANDIDATES,
+    RETRIEVAL_CONTEXT_TOKENS,
+    RETRIEVAL_MODE,
+    RETRIEVAL_NUM_DOCUMENTS,
+    RETRIEVAL_RRF_K,
+    RETRIEVAL_TEXT_LANGUAGE,
+    SEARCH_BACKEND,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_TTL,
+    SEARCH_MAX_RESULTS,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_VERSION_CHECK,
+    SPECULATIVE_EXECUTION,
+    SPECULATIVE_MIN_SCORE,
 )
+from src.agents.moderation import ModerationResult, StreamModerator
+from src.agents.registry import registry
+from src.agents.speculation import BufferedStorage, SpeculativeRun
+from src.metrics import metrics
 
 dotenv.load_dotenv("config/.env")
 
-calendar_tools = [
-    get_calendar_events,
-    create_calendar_event,
-    current_time_tool,
-    time_delta_tool,
-    specific_time_tool,
-    edit_calendar_event,
-    delete_calendar_event,
-]
-
-auxiliar_calendar_tools = [
-    get_user_email,
-]
- 
-tools_search = [TavilyTools()]
-
-pdf_knowledge_base = PDFKnowledgeBase(
-    path="data/Base.pdf",
-    vector_db=PgVector(
-        table_name="sentence_transformer_embeddings",
-        db_url="postgresql+psycopg://ai:ai@localhost:5532/ai",
-        embedder=SentenceTransformerEmbedder(id="sentence-transformers/all-mpnet-base-v2", dimensions=768)
-    ), 
-    reader=PDFReader(chunk=True), 
-)
+# Os componentes abaixo são construídos sob demanda pelo registry (ver registry.warm_up).
+# Os agentes em si são baratos e criados a cada requisição: o Agent do agno guarda o estado da
+# execução na própria instância, então não pode ser compartilhado entre requisições concorrentes.
+AGENT_STORAGE_FILE = "database/tmp/data.db"
 
-helper_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    instructions=prompt_helper,
-    tools=tools_search,
-    storage=SqliteStorage(table_name="agent_sessions", db_file="database/tmp/data.db"),
-    add_history_to_messages=True,
-    num_history_runs=5,
-    show_tool_calls=True,
-    markdown=True,
-    knowledge=pdf_knowledge_base,
-    search_knowledge=True,
-)
- 
-helper_agent.knowledge.load(recreate=True) 
-
-verifier_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    instructions=prompt_revisor,
-    tools=[],
-    markdown=True,
+# Respostas do auxiliar_calendar_agent quando algum convidado não é encontrado
+ATTENDEE_NOT_FOUND = (
+    "Could not find the email of one of the invitees.",
+    "Não foi possível encontrar o email de um dos convidados.",
 )
 
-request_identifier_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    instructions=prompt_identifier,
-    tools=[],
-    markdown=True,
-)
 
-calendar_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    instructions=prompt_calendar,
-    tools=calendar_tools,
-    storage=SqliteStorage(table_name="agent_sessions", db_file="database/tmp/data.db"),
-    add_history_to_messages=True,
-    num_history_runs=5,
-    show_tool_calls=True,
-    markdown=True,
-)
+def _build_embedder():
+    from src.knowledge.knowledge_base import build_query_embedder, micro_batched
 
-auxiliar_calendar_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    instructions=prompt_calendar_auxiliar,
-    tools=auxiliar_calendar_tools,
-    storage=SqliteStorage(table_name="agent_sessions", db_file="database/tmp/data.db"),
-    add_history_to_messages=True,
-    num_history_runs=5,
-    show_tool_calls=True,
-    markdown=True,
-)
+    embedder = build_query_embedder()
+    # Carrega o modelo local ou confirma que o serviço de embeddings compartilhado responde
+    if hasattr(embedder, "get_model"):
+        embedder.get_model()
+    else:
+        embedder.health()
+
+    if EMBEDDING_MICROBATCH:
+        return micro_batched(embedder)
+    return embedder
+
+
+def _build_knowledge_base():
+    from src.knowledge.knowledge_base import build_knowledge_base
+
+    pdf_knowledge_base = build_knowledge_base(registry.get("embedder"))
+
+    # A API apenas se conecta ao índice já construído (a ingestão é feita por run_ingest.py)
+    if not pdf_knowledge_base.vector_db.exists() or pdf_knowledge_base.vector_db.get_count() == 0:
+        print("⚠️ Base de conhecimento vazia. Execute 'python run_ingest.py' para indexar os documentos.")
+
+    return pdf_knowledge_base
+
+
+def _build_retriever():
+    from src.knowledge.context import ContextAssembler
+    from src.knowledge.retrieval import CrossEncoderReranker, HybridRetriever
+
+    reranker = None
+    if RERANKER_ENABLED:
+        reranker = CrossEncoderReranker(RERANKER_MODEL_ID)
+        reranker.get_model()
+
+    return HybridRetriever(
+        registry.get("knowledge_base").vector_db,
+        mode=RETRIEVAL_MODE,
+        num_documents=RETRIEVAL_NUM_DOCUMENTS,
+        candidates=RETRIEVAL_CANDIDATES,
+        rrf_k=RETRIEVAL_RRF_K,
+        language=RETRIEVAL_TEXT_LANGUAGE,
+        reranker=reranker,
+        assembler=ContextAssembler(max_tokens=RETRIEVAL_CONTEXT_TOKENS) if RETRIEVAL_CONTEXT_TOKENS > 0 else None,
+    )
+
+
+def _build_web_search():
+    from src.tools.web_search import build_web_search
+
+    return build_web_search(SEARCH_BACKEND, ttl=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_MAX_ENTRIES)
+
+
+def _build_storage():
+    # Postgres quando os workers rodam em mais de uma máquina
+    if AGENT_STORAGE_DB_URL:
+        from agno.storage.postgres import PostgresStorage
+
+        return PostgresStorage(table_name="agent_sessions", db_url=AGENT_STORAGE_DB_URL)
+
+    from agno.storage.sqlite import SqliteStorage
+
+    return SqliteStorage(table_name="agent_sessions", db_file=AGENT_STORAGE_FILE)
+
+
+def _build_openai_http_client():
+    import httpx
+
+    # Pool de conexões compartilhado por todos os agentes (o agno cria um cliente novo a cada chamada)
+    return httpx.AsyncClient(limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100))
+
+
+def _model():
+    from agno.models.openai import OpenAIChat
+
+    return OpenAIChat(id="gpt-4o", http_client=registry.get("openai_http_client"))
+
+
+def _speculative_storage(gate: asyncio.Event = None):
+    # Execuções especulativas leem o histórico, mas só gravam depois que o palpite é confirmado
+    if gate is None:
+        return registry.get("storage")
+    return BufferedStorage(registry.get("storage"), gate)
+
+
+def _build_helper_agent(gate: asyncio.Event = None):
+    from agno.agent import Agent
+    from src.tools.web_search import CachedSearchTools, GatedSearchTools
+
+    if gate is None:
+        tools_search = [CachedSearchTools(registry.get("web_search"), max_results=SEARCH_MAX_RESULTS)]
+    else:
+        tools_search = [GatedSearchTools(registry.get("web_search"), gate, max_results=SEARCH_MAX_RESULTS)]
+
+    return Agent(
+        model=_model(),
+        instructions=prompt_helper,
+        tools=tools_search,
+        storage=_speculative_storage(gate),
+        add_history_to_messages=HELPER_HISTORY_RUNS > 0,
+        num_history_runs=HELPER_HISTORY_RUNS,
+        show_tool_calls=True,
+        markdown=True,
+        knowledge=registry.get("knowledge_base"),
+        retriever=registry.get("retriever"),
+        search_knowledge=True,
+    )
+
+
+def _build_verifier_agent():
+    from agno.agent import Agent
+
+    return Agent(
+        model=_model(),
+        instructions=prompt_revisor,
+        tools=[],
+        markdown=True,
+    )
+
+
+def _build_request_identifier_agent():
+    from agno.agent import Agent
+
+    return Agent(
+        model=_model(),
+        instructions=prompt_identifier,
+        tools=[],
+        markdown=True,
+    )
+
+
+def _build_calendar_agent():
+    from agno.agent import Agent
+    from src.tools.calendar_tools import (
+        get_calendar_events,
+        create_calendar_event,
+        current_time_tool,
+        time_delta_tool,
+        specific_time_tool,
+        edit_calendar_event,
+        delete_calendar_event,
+        find_free_slots,
+    )
+
+    calendar_tools = [
+        get_calendar_events,
+        create_calendar_event,
+        find_free_slots,
+        current_time_tool,
+        time_delta_tool,
+        specific_time_tool,
+        edit_calendar_event,
+        delete_calendar_event,
+    ]
+
+    return Agent(
+        model=_model(),
+        instructions=prompt_calendar,
+        tools=calendar_tools,
+        storage=registry.get("storage"),
+        add_history_to_messages=True,
+        num_history_runs=5,
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+def _build_auxiliar_calendar_agent(gate: asyncio.Event = None):
+    from agno.agent import Agent
+    from src.tools.calendar_tools import get_user_email
+
+    # get_user_email apenas consulta o banco de usuários
+    auxiliar_calendar_tools = [
+        get_user_email,
+    ]
+
+    return Agent(
+        model=_model(),
+        instructions=prompt_calendar_auxiliar,
+        tools=auxiliar_calendar_tools,
+        storage=_speculative_storage(gate),
+        add_history_to_messages=True,
+        num_history_runs=5,
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+def _build_attendee_resolver():
+    from src.agents.attendees import AttendeeResolver, UserDirectory
+    from src.db.users import email_cache, list_users
+
+    directory = UserDirectory(list_users, generation=lambda: email_cache.generation, refresh_interval=ATTENDEE_DIRECTORY_REFRESH)
+    directory.refresh()
+    return AttendeeResolver(directory, fuzzy_cutoff=ATTENDEE_FUZZY_CUTOFF)
+
+
+def _build_intent_router():
+    from src.agents.router import IntentRouter
+
+    return IntentRouter(
+        registry.get("embedder"),
+        intent_examples,
+        threshold=INTENT_ROUTER_THRESHOLD,
+        margin=INTENT_ROUTER_MARGIN,
+    )
+
+
+def _build_semantic_cache():
+    from src.agents.semantic_cache import SemanticCache
+    from src.knowledge.ingestion import corpus_version
+
+    vector_db = registry.get("knowledge_base").vector_db
+
+    return SemanticCache(
+        registry.get("embedder"),
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        ttl=SEMANTIC_CACHE_TTL,
+        max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+        version=lambda: corpus_version(vector_db),
+        version_check_interval=SEMANTIC_CACHE_VERSION_CHECK,
+    )
+
+
+def _build_moderator():
+    from src.agents.moderation import Moderator, load_denylist
+
+    return Moderator(load_denylist(MODERATION_DENYLIST_FILE))
+
+
+# Componentes compartilhados; a ordem de registro é a ordem de aquecimento
+registry.register("openai_http_client", _build_openai_http_client)
+registry.register("moderator", _build_moderator)
+registry.register("storage", _build_storage)
+registry.register("attendee_resolver", _build_attendee_resolver)
+registry.register("embedder", _build_embedder)
+registry.register("intent_router", _build_intent_router)
+registry.register("knowledge_base", _build_knowledge_base)
+registry.register("retriever", _build_retriever)
+registry.register("web_search", _build_web_search)
+registry.register("semantic_cache", _build_semantic_cache)
+
+# Agentes: (construtor, componentes de que dependem)
+AGENT_BUILDERS = {
+    "request_identifier_agent": (_build_request_identifier_agent, ("openai_http_client",)),
+    "verifier_agent": (_build_verifier_agent, ("openai_http_client",)),
+    "auxiliar_calendar_agent": (_build_auxiliar_calendar_agent, ("openai_http_client", "storage")),
+    "calendar_agent": (_build_calendar_agent, ("openai_http_client", "storage")),
+    "helper_agent": (_build_helper_agent, ("openai_http_client", "storage", "knowledge_base", "retriever", "web_search")),
+}
+
+
+async def new_agent(name: str, gate: asyncio.Event = None):
+    """
+    Cria uma instância nova do agente; componentes ainda frios são construídos fora do event loop.
+    Com gate, a instância é especulativa: gravações no histórico e buscas na web esperam o gate ser liberado.
+    """
+    builder, dependencies = AGENT_BUILDERS[name]
+    for dependency in dependencies:
+        await registry.aget(dependency)
+    return builder(gate) if gate is not None else builder()
+
+
+def _session_id(agent_name: str, username: str) -> str:
+    # Histórico separado por usuário e por agente
+    return f"{agent_name}:{username}"
+
+
+async def _agent_result(agent, name: str, message: str, username: str = None) -> str:
+    if username is not None and agent.storage is not None:
+        response = await agent.arun(message, session_id=_session_id(name, username), user_id=username)
+    else:
+        response = await agent.arun(message)
+    return response.content
+
+
+async def _agent_output(agent, name: str, message: str, username: str = None):
+    from agno.run.response import RunEvent
+
+    if username is not None and agent.storage is not None:
+        stream = await agent.arun(message, stream=True, session_id=_session_id(name, username), user_id=username)
+    else:
+        stream = await agent.arun(message, stream=True)
+
+    async for chunk in stream:
+        if chunk.event == RunEvent.run_response and isinstance(chunk.content, str) and chunk.content:
+            yield chunk.content
+
+
+async def run_agent(name: str, message: str, username: str = None) -> str:
+    agent = await new_agent(name)
+    return await _agent_result(agent, name, message, username)
+
+
+def _semantic_cache():
+    # Enquanto o cache ainda está frio as requisições seguem sem ele
+    if SEMANTIC_CACHE_ENABLED and registry.is_warm("semantic_cache"):
+        return registry.get("semantic_cache")
+    return None
+
+
+def _helper_context(username: str) -> str:
+    """
+    Escopo do cache semântico: resumo das execuções anteriores que o helper_agent adicionaria ao prompt.
+    Vazio quando a pergunta não tem contexto (sem histórico); só perguntas assim são compartilhadas entre usuários.
+    """
+    if HELPER_HISTORY_RUNS <= 0:
+        return ""
+    session = registry.get("storage").read(session_id=_session_id("helper_agent", username))
+    runs = ((getattr(session, "memory", None) or {}).get("runs") or [])[-HELPER_HISTORY_RUNS:]
+    if not runs:
+        return ""
+    return hashlib.sha256(json.dumps(runs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _cacheable(text: str, username: str, user_email: str = None) -> bool:
+    # Perguntas e respostas que citam o usuário são pessoais e não podem ser servidas a outras pessoas
+    return not any(
+        value and re.search(rf"(?<!\w){re.escape(value)}(?!\w)", text, re.IGNORECASE) for value in (username, user_email)
+    )
+
+
+async def review_response(text: str, moderation: ModerationResult = None):
+    """
+    Verificação em camadas: checagens locais aprovam as respostas limpas e só as sinalizadas vão ao revisor.
+
+    Returns:
+        tuple: (status, texto final). status: "pass" (aprovada localmente), "valid" (aprovada pelo revisor),
+        "revised" (revisada pelo revisor) ou "rejected" (o revisor não aprovou nem revisou; o texto é a resposta dele)
+    """
+    if MODERATION_MODE == "local":
+        if moderation is None:
+            moderation = registry.get("moderator").check(text)
+        if moderation.clean:
+            metrics.increment("moderation.pass")
+            return "pass", text
+
+        metrics.increment("moderation.escalate")
+        for flag in moderation.flags:
+            metrics.increment(f"moderation.flag.{flag}")
+
+    verification_result = await run_agent("verifier_agent", text)
+
+    if "Valid response" in verification_result:
+        return "valid", text
+    if "Revised text:" in verification_result:
+        metrics.increment("moderation.revise")
+        res = verification_result.split("Revised text:", 1)
+        return "revised", str(res[1].strip())
+    return "rejected", verification_result
+
+
+def is_help_request(request: str) -> bool:
+    return request == "Help" or ("Help" in request and len(request) > 15)
+
+
+def is_calendar_request(request: str) -> bool:
+    return request == "Calendar" or ("Calendar" in request and len(request) > 20)
+
+
+async def _speculate(intent: str, user_input: str, username: str):
+    """
+    Inicia o ramo provável enquanto o identificador roda: a resposta do helper_agent ou a busca de
+    convidados do auxiliar_calendar_agent (nunca o calendar_agent, que altera a agenda). Até o palpite
+    ser confirmado a execução não grava o histórico da sessão nem faz buscas na web.
+    """
+    name = "helper_agent" if intent == "Help" else "auxiliar_calendar_agent"
+
+    # Resposta já disponível no cache semântico: nada a especular
+    cache = _semantic_cache()
+    if intent == "Help" and cache is not None:
+        scope = await asyncio.to_thread(_helper_context, username)
+        if await asyncio.to_thread(cache.contains, user_input, scope):
+            return None
+
+    # A especulação não pode atrasar o identificador esperando componentes frios
+    if not all(registry.is_warm(dependency) for dependency in AGENT_BUILDERS[name][1]):
+        return None
+
+    # Convidados resolvidos localmente: o agente auxiliar não será chamado
+    if intent == "Calendar" and ATTENDEE_RESOLVER_ENABLED and registry.is_warm("attendee_resolver"):
+        resolution = await asyncio.to_thread(registry.get("attendee_resolver").resolve, user_input, username)
+        if resolution.confident:
+            return None
+
+    message = user_input + "\nUsuário: " + username
+    gate = asyncio.Event()
+    agent = await new_agent(name, gate)
+
+    if intent == "Help":
+        return SpeculativeRun(intent, agent, _agent_output(agent, name, message, username), gate)
+
+    async def lookup():
+        yield await _agent_result(agent, name, message, username)
+
+    return SpeculativeRun(intent, agent, lookup(), gate)
+
+
+async def identify_request(user_input: str, username: str, permission_context: str):
+    """
+    Classifica a requisição: 'Help', 'Calendar' ou a resposta direta do agente identificador.
+    O classificador local é usado primeiro; o LLM só é chamado quando ele não tem confiança suficiente.
+    Com SPECULATIVE_EXECUTION, o ramo mais provável começa a rodar junto com o LLM.
+
+    Returns:
+        tuple: (requisição classificada, "local" ou "llm", SpeculativeRun ou None)
+    """
+    speculation = None
+
+    # Com o roteador ainda frio a requisição não espera o carregamento do modelo
+    if INTENT_ROUTER_ENABLED and registry.is_warm("intent_router"):
+        router = registry.get("intent_router")
+        with metrics.timer("routing_seconds.local"):
+            ranked = await asyncio.to_thread(router.scores, user_input)
+        intent = router.decide(ranked)
+        if intent is not None:
+            metrics.increment("routing.local")
+            return intent, "local", None
 
-# Função principal do chatbot
-def bot_main(user_input: str, username: str, user_permissions: dict = None, permission_level: str = "full_access"):
+        guess = router.likely(ranked, SPECULATIVE_MIN_SCORE) if SPECULATIVE_EXECUTION else None
+        if guess is not None:
+            speculation = await _speculate(guess, user_input, username)
+
+    metrics.increment("routing.llm")
+    try:
+        with metrics.timer("routing_seconds.llm"):
+            request = await run_agent("request_identifier_agent", user_input + "\nUsuário: " + username + permission_context)
+    except BaseException:
+        if speculation is not None:
+            await speculation.cancel()
+        raise
+
+    # Palpite errado: o ramo especulativo é cancelado; certo: as buscas e gravações retidas são liberadas
+    if speculation is not None:
+        if _matches(speculation.intent, request):
+            speculation.confirm()
+        else:
+            await speculation.cancel()
+            speculation = None
+
+    return request, "llm", speculation
+
+
+async def resolve_attendees(user_input: str, username: str, user_email: str = None) -> str:
+    """
+    Emails dos envolvidos na requisição de calendário. A resolução local é usada quando todos os nomes
+    citados são encontrados sem ambiguidade; nos demais casos o auxiliar_calendar_agent decide.
+    """
+    if ATTENDEE_RESOLVER_ENABLED:
+        resolver = await registry.aget("attendee_resolver")
+        resolution = await asyncio.to_thread(resolver.resolve, user_input, username, user_email)
+        if resolution.confident:
+            metrics.increment("attendees.local")
+            return resolution.as_text()
+
+    metrics.increment("attendees.llm")
+    return await run_agent("auxiliar_calendar_agent", user_input + "\nUsuário: " + username, username)
+
+
+def _matches(intent: str, request: str) -> bool:
+    if intent == "Help":
+        return is_help_request(request)
+    return is_calendar_request(request) and not is_help_request(request)
+
+
+async def stream_agent(name: str, message: str, username: str = None):
+    """
+    Executa o agente em modo streaming, produzindo os trechos de texto à medida que são gerados.
+    """
+    agent = await new_agent(name)
+    async for token in _agent_output(agent, name, message, username):
+        yield token
+
+
+def build_permission_context(user_permissions: dict = None, permission_level: str = "full_access") -> str:
 
     # Default permissions se não fornecidas
     if user_permissions is None:
@@ -146,31 +577,118 @@ def bot_main(user_input: str, username: str, user_permissions: dict = None, perm
     
     permission_context += "\nIMPORTANTE: Você DEVE verificar as permissões antes de tentar executar qualquer operação. Se o usuário solicitar uma operação não autorizada, explique educadamente que essa funcionalidade não está disponível com o nível de permissão atual e sugira como alterar as permissões.\n"
 
+    return permission_context
+
+
+# Função principal do chatbot (streaming).
+# Produz eventos:
+#   {"type": "token", "content": ...}    trecho da resposta gerado pelo agente
+#   {"type": "replace", "content": ...}  o revisor alterou a resposta já enviada
+#   {"type": "done", "content": ...}     resposta final completa
+async def bot_stream(user_input: str, username: str, user_permissions: dict = None, permission_level: str = "full_access", user_email: str = None, conversation_id: str = None):
+    from src.tools.calendar_service import set_calendar_user
+    from src.tools.event_handles import set_calendar_session
+
+    permission_context = build_permission_context(user_permissions, permission_level)
+
+    # As ferramentas de calendário usam as credenciais deste usuário e os handles de eventos desta conversa
+    set_calendar_user(user_email, permission_level)
+    set_calendar_session(f"{username}:{conversation_id}" if conversation_id else username)
+
+    started = time.perf_counter()
+
     # Identifica a requisição do usuário
-    request = request_identifier_agent.run(user_input + "\nUsuário: " + username + permission_context).content
+    request, routed_by, speculation = await identify_request(user_input, username, permission_context)
+
+    if is_help_request(request):
+        route = "help"
+    elif is_calendar_request(request):
+        route = "calendar"
+    else:
+        route = "direct"
+
+    first_output = True
+    try:
+        async for event in _answer_request(request, user_input, username, permission_context, speculation, user_email):
+            if first_output:
+                first_output = False
+                metrics.observe(f"chat_ttft_seconds.{route}", time.perf_counter() - started)
+            yield event
+    finally:
+        if speculation is not None:
+            await speculation.close()
+        elapsed = time.perf_counter() - started
+        metrics.observe(f"chat_seconds.{route}", elapsed)
+        metrics.observe(f"chat_seconds.{route}.{routed_by}", elapsed)
+
 
+# Função principal do chatbot (sem streaming): retorna apenas a resposta final
+async def bot_main(user_input: str, username: str, user_permissions: dict = None, permission_level: str = "full_access", user_email: str = None, conversation_id: str = None):
+    response = None
+    async for event in bot_stream(user_input, username, user_permissions, permission_level, user_email, conversation_id):
+        if event["type"] == "done":
+            response = event["content"]
+    return response
+
+
+async def _answer_request(request: str, user_input: str, username: str, permission_context: str, speculation: SpeculativeRun = None, user_email: str = None):
     # Se for uma requisição de ajuda, chama o agente de ajuda
-    if request == "Help" or ("Help" in request and len(request) > 15):
-        response = helper_agent.run(user_input + "\nUsuário: " + username).content
+    # Só as respostas de ajuda usam o cache semântico: as de calendário dependem dos dados do usuário
+    if is_help_request(request):
+        # Pergunta semelhante já respondida e verificada, no mesmo contexto de conversa
+        cache = _semantic_cache()
+        if cache is not None:
+            scope = await asyncio.to_thread(_helper_context, username)
+            cached = await asyncio.to_thread(cache.get, user_input, scope)
+            if cached is not None:
+                yield {"type": "done", "content": cached}
+                return
 
-        # Verifica se a resposta gerada atende aos critérios
-        verification_result = verifier_agent.run(response).content
-
-        if "Valid response" in verification_result:
-            return response
-        elif "Revised text:" in verification_result:
-            res = verification_result.split("Revised text: ", 1)
-            splitRes = str(res[1].strip())
-            return splitRes
+        # Com execução especulativa confirmada, reaproveita a resposta que já está sendo gerada
+        if speculation is not None:
+            tokens = speculation.tokens()
         else:
-            return verification_result
+            tokens = stream_agent("helper_agent", user_input + "\nUsuário: " + username, username)
+
+        # Checagem incremental: cada trecho é verificado antes de ser enviado; a partir de um trecho sinalizado,
+        # o restante fica retido até a revisão
+        stream_check = StreamModerator(registry.get("moderator")) if MODERATION_MODE == "local" else None
+
+        response = ""
+        streamed = ""
+        async for token in tokens:
+            response += token
+            chunk = token if stream_check is None else stream_check.feed(token)
+            if chunk:
+                streamed += chunk
+                yield {"type": "token", "content": chunk}
+        if stream_check is not None:
+            chunk = stream_check.flush()
+            if chunk:
+                streamed += chunk
+                yield {"type": "token", "content": chunk}
+
+        # Verifica se a resposta gerada atende aos critérios
+        status, final = await review_response(response, stream_check.result() if stream_check else None)
+
+        # Apenas respostas aprovadas ou revisadas, e não pessoais, entram no cache
+        if status != "rejected" and cache is not None and _cacheable(user_input + "\n" + final, username, user_email):
+            await asyncio.to_thread(cache.put, user_input, final, scope)
+
+        if final != streamed:
+            yield {"type": "replace", "content": final}
+        yield {"type": "done", "content": final}
 
     # Se for uma requisição de calendário, chama o agente de calendário.
-    elif request == "Calendar" or ("Calendar" in request and len(request) > 20):
-        envolvidos = auxiliar_calendar_agent.run(user_input + "\nUsuário: " + username).content
+    elif is_calendar_request(request):
+        if speculation is not None:
+            envolvidos = await speculation.result()
+        else:
+            envolvidos = await resolve_attendees(user_input, username, user_email)
 
-        if envolvidos == "Não foi possível encontrar o email de um dos convidados.":
-            return envolvidos
+        if envolvidos.strip() in ATTENDEE_NOT_FOUND:
+            yield {"type": "done", "content": envolvidos}
+            return
         
         current_datetime = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
         current_weekday = datetime.datetime.now().strftime("%A")
@@ -185,19 +703,18 @@ def bot_main(user_input: str, username: str, user_permissions: dict = None, perm
             permission_context
         )
         
-        response = calendar_agent.run(calendar_input).content
+        response = ""
+        async for token in stream_agent("calendar_agent", calendar_input, username):
+            response += token
+            yield {"type": "token", "content": token}
 
-        return response
+        yield {"type": "done", "content": response}
 
     # Se não for uma requisição de ajuda ou calendário, verifica se a resposta gerada é válida
     else:
-        response = verifier_agent.run(request).content
-
-        if "Valid response" in response:
-            return request
-        elif "Revised text" in response:
-            res = response.split("Revised text: ", 1)
-            splitRes = str(res[1].strip())
-            return splitRes
-        else:
-            return "Não foi possível responder a esta requisição. Por favor, tente novamente."
+        status, final = await review_response(request)
+
+        if status == "rejected":
+            final = "Não foi possível responder a esta requisição. Por favor, tente novamente."
+
+        yield {"type": "done", "content": final}
@@ -0,0 +1,233 @@
+"""
+Resolução local dos convidados das requisições de calendário.
+
+Antes cada requisição de calendário passava pelo auxiliar_calendar_agent (uma chamada ao LLM mais
+chamadas de get_user_email) só para transformar "João e Maria" em emails. O AttendeeResolver extrai
+os emails e os nomes citados na mensagem e os procura num índice em memória da tabela usuarios
+(sem diferenciar maiúsculas e acentos, com correspondência aproximada para erros de digitação).
+A palavra depois de um conector ("com maria", "with Ana") é sempre um convidado; uma palavra com
+inicial maiúscula em outro lugar só conta se for o nome completo de um usuário. O agente só é
+chamado quando algum nome é ambíguo ou não é encontrado.
+"""
+import difflib
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_TOKEN = re.compile(r"[^\W\d_]+(?:[.'-][^\W\d_]+)*|[,&.!?@]", re.UNICODE)
+
+# Palavras depois das quais a palavra seguinte é tratada como convidado, com qualquer capitalização
+CONNECTORS = {"with", "and", "invite", "add", "com", "e", "convide", "adicione", "chame", ",", "&"}
+# Artigos entre o conector e o nome ("com a Maria")
+ARTICLES = {"a", "o", "as", "os", "um", "uma", "the", "an"}
+SENTENCE_END = {".", "!", "?"}
+
+# Palavras que não são nomes de pessoas (com inicial maiúscula ou logo após um conector)
+NOT_NAMES = {
+    "i", "me", "my", "we", "you", "us", "them", "everyone", "the", "a", "an", "to", "for", "on", "at", "in", "of",
+    "eu", "meu", "minha", "nos", "voce", "mim", "todos", "para", "de", "do", "da", "no", "na", "em",
+    "am", "pm", "google", "meet", "zoom", "teams", "calendar", "agenda", "room", "sala",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", "today", "tomorrow",
+    "segunda", "terca", "quarta", "quinta", "sexta", "sabado", "domingo", "hoje", "amanha",
+    "january", "february", "march", "april", "may", "june", "july", "august", "september", "october",
+    "november", "december", "janeiro", "fevereiro", "marco", "abril", "maio", "junho", "julho", "agosto",
+    "setembro", "outubro", "novembro", "dezembro",
+}
+
+
+def normalize_name(text: str) -> str:
+    """
+    Minúsculas, sem acentos e com separadores (., _, -) trocados por espaço.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.split(r"[\s._-]+", stripped.lower())).strip()
+
+
+class UserDirectory:
+    """
+    Índice nome -> emails da tabela usuarios. É recarregado quando um usuário é cadastrado neste
+    processo (contador de geração) ou, para cadastros feitos por outros workers, a cada refresh_interval segundos.
+    """
+
+    def __init__(self, load: Callable[[], Iterable[Tuple[str, str]]], generation: Callable[[], int] = lambda: 0, refresh_interval: float = 60):
+        self._load = load
+        self._generation = generation
+        self.refresh_interval = refresh_interval
+        self._index: Dict[str, Set[str]] = {}
+        # Só o nome de usuário e a parte local do email inteiros (sem primeiros nomes nem sobrenomes soltos)
+        self._full_index: Dict[str, Set[str]] = {}
+        self._by_username: Dict[str, str] = {}
+        self._loaded_generation: Optional[int] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        generation = self._generation()
+        index: Dict[str, Set[str]] = {}
+        full_index: Dict[str, Set[str]] = {}
+        by_username: Dict[str, str] = {}
+        for username, email in self._load():
+            email = email.lower()
+            by_username[username.lower()] = email
+            full_name = normalize_name(username)
+            local_part = normalize_name(email.split("@", 1)[0])
+            keys = {full_name, local_part, *full_name.split(), *local_part.split()}
+            for key in keys:
+                if key:
+                    index.setdefault(key, set()).add(email)
+            for key in {full_name, local_part}:
+                if key:
+                    full_index.setdefault(key, set()).add(email)
+
+        with self._lock:
+            self._index, self._full_index, self._by_username = index, full_index, by_username
+            self._loaded_generation = generation
+            self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self) -> None:
+        if self._loaded_generation != self._generation() or time.monotonic() - self._loaded_at > self.refresh_interval:
+            self.refresh()
+
+    def email_for(self, username: str) -> Optional[str]:
+        self._ensure_fresh()
+        return self._by_username.get(username.lower())
+
+    def lookup_exact(self, name: str) -> Set[str]:
+        """
+        Emails cujo nome de usuário ou parte local do email é exatamente o nome (sem correspondência aproximada).
+        """
+        self._ensure_fresh()
+        return set(self._full_index.get(normalize_name(name), ()))
+
+    def lookup(self, name: str, cutoff: float) -> Set[str]:
+        """
+        Emails correspondentes ao nome: correspondência exata ou, na falta dela, as chaves mais parecidas.
+        """
+        self._ensure_fresh()
+        key = normalize_name(name)
+        if key in self._index:
+            return set(self._index[key])
+        if len(key) < 4:
+            return set()
+
+        matches = difflib.get_close_matches(key, self._index.keys(), n=5, cutoff=cutoff)
+        if not matches:
+            return set()
+        # Só as chaves empatadas com a melhor pontuação contam (evita juntar nomes apenas parecidos)
+        best = difflib.SequenceMatcher(None, key, matches[0]).ratio()
+        emails: Set[str] = set()
+        for match in matches:
+            if difflib.SequenceMatcher(None, key, match).ratio() >= best - 1e-9:
+                emails |= self._index[match]
+        return emails
+
+
+@dataclass
+class AttendeeResolution:
+    emails: List[str] = field(default_factory=list)
+    unresolved: List[str] = field(default_factory=list)
+    ambiguous: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def confident(self) -> bool:
+        return bool(self.emails) and not self.unresolved and not self.ambiguous
+
+    def as_text(self) -> str:
+        return ", ".join(self.emails)
+
+
+class AttendeeResolver:
+    def __init__(self, directory: UserDirectory, fuzzy_cutoff: float = 0.85):
+        self.directory = directory
+        self.fuzzy_cutoff = fuzzy_cutoff
+
+    @staticmethod
+    def _candidates(message: str) -> List[Tuple[str, str]]:
+        """
+        Nomes citados: (nome, origem). A origem é "connector" para a palavra logo após um conector
+        ("com maria", "with Ana"), com qualquer capitalização; "start" para uma palavra com inicial
+        maiúscula no começo de uma frase; "capitalized" para as demais com inicial maiúscula.
+        Nomes compostos ("João Silva") ficam juntos.
+        """
+        # O email vira um marcador: a palavra seguinte não fica "logo após o conector"
+        tokens = _TOKEN.findall(EMAIL_PATTERN.sub(" @ ", message))
+        keys = [normalize_name(token) for token in tokens]
+
+        def is_word(index: int) -> bool:
+            # "Add João": o conector com inicial maiúscula não faz parte do nome
+            return tokens[index][0].isalpha() and keys[index] not in NOT_NAMES | CONNECTORS | ARTICLES
+
+        def is_name(index: int) -> bool:
+            return is_word(index) and tokens[index][0].isupper()
+
+        def after_connector(index: int) -> bool:
+            previous = index - 1
+            if previous > 0 and keys[previous] in ARTICLES:
+                previous -= 1
+            return previous >= 0 and keys[previous] in CONNECTORS
+
+        candidates: List[Tuple[str, str]] = []
+        index = 0
+        while index < len(tokens):
+            connector = after_connector(index)
+            if is_word(index) and (connector or is_name(index)):
+                sentence_start = index == 0 or tokens[index - 1] in SENTENCE_END
+                parts = [tokens[index]]
+                while index + 1 < len(tokens) and is_name(index + 1):
+                    index += 1
+                    parts.append(tokens[index])
+                origin = "connector" if connector else ("start" if sentence_start else "capitalized")
+                candidates.append((" ".join(parts), origin))
+            index += 1
+        return candidates
+
+    def _resolve_name(self, name: str) -> Set[str]:
+        emails = self.directory.lookup(name, self.fuzzy_cutoff)
+        if emails or " " not in name:
+            return emails
+        # Nome composto sem correspondência: tenta o primeiro nome
+        return self.directory.lookup(name.split()[0], self.fuzzy_cutoff)
+
+    def resolve(self, message: str, username: str, user_email: Optional[str] = None) -> AttendeeResolution:
+        """
+        Emails dos envolvidos: o próprio usuário, os emails citados e os nomes encontrados no diretório.
+        """
+        resolution = AttendeeResolution()
+        own_email = (user_email or self.directory.email_for(username) or "").lower()
+
+        def add(email: str) -> None:
+            if email and email not in resolution.emails:
+                resolution.emails.append(email)
+
+        add(own_email)
+        for email in EMAIL_PATTERN.findall(message):
+            add(email.lower())
+
+        for name, origin in self._candidates(message):
+            if origin == "connector":
+                emails = self._resolve_name(name)
+            else:
+                # Fora de uma lista de convidados a inicial maiúscula não basta: só o nome completo exato conta
+                emails = self.directory.lookup_exact(name)
+            if own_email and emails == {own_email}:
+                continue
+            emails.discard(own_email)
+
+            if not emails:
+                if origin == "connector":
+                    # "com Pedro" sem Pedro cadastrado: o agente decide (e informa que não encontrou)
+                    resolution.unresolved.append(name)
+            elif origin == "start":
+                # "Mark a meeting...": a maiúscula pode ser só o começo da frase; o agente decide se é convidado
+                resolution.ambiguous[name] = sorted(emails)
+            elif len(emails) == 1:
+                add(emails.pop())
+            else:
+                resolution.ambiguous[name] = sorted(emails)
+
+        return resolution
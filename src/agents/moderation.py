@@ -0,0 +1,190 @@
+"""
+Verificação local das respostas antes do verifier_agent.
+
+Checagens baratas (idioma, dados pessoais/segredos e lista de termos proibidos) aprovam de imediato
+as respostas limpas; apenas as respostas sinalizadas seguem para o revisor (LLM). O StreamModerator
+aplica as mesmas checagens de conteúdo incrementalmente enquanto a resposta é transmitida, para que
+um trecho sinalizado não chegue ao usuário antes da revisão.
+"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+# Palavras funcionais usadas na detecção de idioma (o revisor exige respostas em inglês)
+ENGLISH_STOPWORDS = {
+    "the", "and", "is", "are", "to", "of", "you", "your", "in", "for", "with", "this", "that",
+    "it", "on", "can", "be", "or", "as", "at", "by", "from", "have", "will", "an", "if", "not",
+}
+OTHER_STOPWORDS = {
+    # Português
+    "de", "que", "não", "para", "com", "uma", "os", "as", "é", "você", "do", "da", "em", "um",
+    "por", "mais", "como", "mas", "ao", "dos", "das", "seu", "sua", "está", "são", "também",
+    # Espanhol
+    "el", "la", "los", "las", "es", "y", "en", "con", "por", "para", "usted", "pero", "está",
+}
+NON_ENGLISH_CHARACTERS = re.compile(r"[ãõçâêôàáéíóúñ¿¡]", re.IGNORECASE)
+
+# Padrões de dados pessoais e segredos
+PII_PATTERNS = {
+    "cpf": re.compile(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b"),
+    "cnpj": re.compile(r"\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b"),
+    "ssn": re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),
+    "credit_card": re.compile(r"\b(?:\d[ -]?){13,19}\b"),
+}
+SECRET_PATTERNS = {
+    "openai_key": re.compile(r"\bsk-[A-Za-z0-9_-]{20,}"),
+    "tavily_key": re.compile(r"\btvly-[A-Za-z0-9_-]{16,}"),
+    "aws_key": re.compile(r"\bAKIA[0-9A-Z]{16}\b"),
+    "github_token": re.compile(r"\bgh[pousr]_[A-Za-z0-9]{30,}"),
+    "google_key": re.compile(r"\bAIza[0-9A-Za-z_-]{35}\b"),
+    "private_key": re.compile(r"-----BEGIN [A-Z ]*PRIVATE KEY-----"),
+    "jwt": re.compile(r"\beyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}"),
+    "password": re.compile(r"\b(?:password|passwd|senha|secret)\s*[:=]\s*\S+", re.IGNORECASE),
+    "connection_string": re.compile(r"\b[a-z+]+://[^\s:/]+:[^\s@/]+@", re.IGNORECASE),
+}
+
+DEFAULT_DENYLIST = {
+    "fuck", "fucking", "shit", "bitch", "asshole", "bastard", "retard", "cunt",
+    "porra", "caralho", "merda", "puta", "viado", "arrombado", "desgraçado",
+}
+
+# Trechos de código e URLs não contam na detecção de idioma
+_CODE_OR_URL = re.compile(r"```.*?```|`[^`]*`|https?://\S+", re.DOTALL)
+_WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+def _luhn_valid(number: str) -> bool:
+    digits = [int(char) for char in number if char.isdigit()]
+    if not 13 <= len(digits) <= 19:
+        return False
+    checksum = 0
+    for index, digit in enumerate(reversed(digits)):
+        if index % 2 == 1:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        checksum += digit
+    return checksum % 10 == 0
+
+
+def load_denylist(path: Optional[str] = None) -> set:
+    """
+    Lista padrão de termos proibidos mais os termos do arquivo informado (um por linha).
+    """
+    terms = set(DEFAULT_DENYLIST)
+    if path and Path(path).exists():
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            line = line.strip().lower()
+            if line and not line.startswith("#"):
+                terms.add(line)
+    return terms
+
+
+@dataclass
+class ModerationResult:
+    flags: List[str] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not self.flags
+
+
+class Moderator:
+    def __init__(self, denylist: Optional[Iterable[str]] = None, min_words_for_language: int = 4):
+        self.denylist = {term.lower() for term in (denylist if denylist is not None else DEFAULT_DENYLIST)}
+        self.min_words_for_language = min_words_for_language
+        self._denylist_pattern = (
+            re.compile(r"\b(?:" + "|".join(re.escape(term) for term in sorted(self.denylist)) + r")\b", re.IGNORECASE)
+            if self.denylist
+            else None
+        )
+
+    def check_content(self, text: str) -> List[str]:
+        """
+        Dados pessoais, segredos e termos proibidos (checagens que podem ser feitas em trechos parciais).
+        """
+        flags = []
+        for name, pattern in PII_PATTERNS.items():
+            for match in pattern.finditer(text):
+                if name != "credit_card" or _luhn_valid(match.group()):
+                    flags.append(f"pii:{name}")
+                    break
+        for name, pattern in SECRET_PATTERNS.items():
+            if pattern.search(text):
+                flags.append(f"secret:{name}")
+        if self._denylist_pattern is not None and self._denylist_pattern.search(text):
+            flags.append("denylist")
+        return flags
+
+    def is_english(self, text: str) -> bool:
+        prose = _CODE_OR_URL.sub(" ", text)
+        words = [word.lower() for word in _WORD.findall(prose)]
+        if len(words) < self.min_words_for_language:
+            return not NON_ENGLISH_CHARACTERS.search(prose)
+
+        english = sum(word in ENGLISH_STOPWORDS for word in words)
+        other = sum(word in OTHER_STOPWORDS for word in words)
+        return english >= other
+
+    def check(self, text: str) -> ModerationResult:
+        flags = self.check_content(text)
+        if not self.is_english(text):
+            flags.append("language")
+        return ModerationResult(flags)
+
+
+class StreamModerator:
+    """
+    Checagem incremental durante o streaming: a cada trecho verifica o final do texto acumulado
+    (com sobreposição suficiente para pegar padrões divididos entre trechos). Os últimos holdback
+    caracteres ficam retidos até o texto seguinte chegar, para que o começo de um segredo ou termo
+    proibido ainda incompleto não seja enviado antes de o padrão inteiro ser detectado.
+    """
+
+    def __init__(self, moderator: Moderator, overlap: int = 256, holdback: int = 64):
+        self.moderator = moderator
+        self.overlap = overlap
+        self.holdback = holdback
+        self.text = ""
+        self.released = 0
+        self.flags: List[str] = []
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.flags)
+
+    def _release(self, end: int) -> str:
+        chunk = self.text[self.released : end]
+        self.released = max(self.released, end)
+        return chunk
+
+    def feed(self, token: str) -> str:
+        """
+        Acrescenta o trecho; retorna o texto que já pode ser enviado (vazio a partir do primeiro trecho sinalizado).
+        """
+        start = max(0, len(self.text) - self.overlap)
+        self.text += token
+        if not self.flags:
+            self.flags = self.moderator.check_content(self.text[start:])
+        if self.flags:
+            return ""
+
+        # Libera até o último espaço antes da parte retida (padrões não são cortados no meio de uma palavra)
+        end = len(self.text) - self.holdback
+        while end > self.released and not self.text[end - 1].isspace():
+            end -= 1
+        return self._release(end) if end > self.released else ""
+
+    def flush(self) -> str:
+        """
+        Fim do streaming: o restante retido, se o texto continua limpo.
+        """
+        if self.flags:
+            return ""
+        return self._release(len(self.text))
+
+    def result(self) -> ModerationResult:
+        if self.flags:
+            return ModerationResult(list(self.flags))
+        return self.moderator.check(self.text)
@@ -0,0 +1,58 @@
+intent_examples = {
+    "Calendar": [
+        "Schedule a meeting with João and Maria tomorrow at 3 PM.",
+        "Book a call with the client next Thursday at 2pm",
+        "Set up a team meeting for Friday morning",
+        "What meetings do I have for tomorrow?",
+        "What's on my calendar next week?",
+        "Do I have any events this afternoon?",
+        "Provide details of the meeting with the client next Tuesday.",
+        "Cancel my meeting with Pedro tomorrow",
+        "Delete tomorrow's event at 3 PM.",
+        "Move the project review to 4pm",
+        "Reschedule the standup to Monday at 10am",
+        "Add João to tomorrow's event at 7 AM.",
+        "Change the location of the planning meeting to room 2",
+        "Is Maria available on Wednesday at 11?",
+        "Create an event for tomorrow at 2pm",
+        "Agende uma reunião com a Ana amanhã às 15h",
+        "Quais reuniões eu tenho amanhã?",
+        "Cancele a reunião de sexta-feira",
+        "Marque um evento com o time na segunda às 10h",
+        "Remarque a reunião com o cliente para quinta",
+    ],
+    "Help": [
+        "What is the remote work policy?",
+        "How many vacation days do new employees get?",
+        "What does our policy say about remote work?",
+        "How do I set up my GitHub account?",
+        "How do I create a branch in VSCode?",
+        "How do I open a ticket in Jira?",
+        "Which Discord channels should I join?",
+        "What are the company's core values?",
+        "How does the onboarding program work?",
+        "Who should I talk to about equipment allowance?",
+        "What's the latest news about AI?",
+        "How do I configure calendar notifications?",
+        "How does the calendar integration work?",
+        "My VSCode extension is not working, how do I fix it?",
+        "What are the working hours at the company?",
+        "Qual é a política de trabalho remoto?",
+        "Como eu configuro o Jira?",
+        "Como funciona o programa de onboarding?",
+        "Como faço um pull request no GitHub?",
+        "Quais são os benefícios da empresa?",
+    ],
+    "Other": [
+        "Hello, how are you?",
+        "Hi!",
+        "Good morning",
+        "Thanks a lot",
+        "Who are you?",
+        "Tell me a joke",
+        "Bye",
+        "Olá, tudo bem?",
+        "Bom dia",
+        "Obrigado",
+    ],
+}
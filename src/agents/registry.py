@@ -0,0 +1,105 @@
+"""
+Registro de componentes construídos sob demanda (embedder, base de conhecimento, storage...).
+
+Nada é construído no import: cada componente é criado no primeiro uso ou por um aquecimento
+em segundo plano, depois que o servidor já está aceitando requisições.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class LazyRegistry:
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._build_times: Dict[str, float] = {}
+        self._building: set = set()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        """
+        Retorna o componente, construindo-o na primeira chamada (uma única vez, mesmo com chamadas concorrentes).
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._locks[name]:
+            if name in self._instances:
+                return self._instances[name]
+
+            self._building.add(name)
+            started = time.perf_counter()
+            try:
+                instance = self._factories[name]()
+            except Exception as e:
+                self._errors[name] = str(e)
+                raise
+            finally:
+                self._building.discard(name)
+
+            self._build_times[name] = time.perf_counter() - started
+            self._errors.pop(name, None)
+            self._instances[name] = instance
+            print(f"Componente '{name}' pronto em {self._build_times[name]:.2f}s")
+            return instance
+
+    async def aget(self, name: str) -> Any:
+        """
+        Versão assíncrona de get: a construção de componentes frios roda numa thread para não bloquear o event loop.
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        return await asyncio.to_thread(self.get, name)
+
+    def is_warm(self, name: str) -> bool:
+        return name in self._instances
+
+    def status(self) -> Dict[str, Dict]:
+        """
+        Estado de cada componente: warm, building, cold ou error.
+        """
+        result = {}
+        for name in self._factories:
+            if name in self._instances:
+                result[name] = {"state": "warm", "build_seconds": round(self._build_times[name], 3)}
+            elif name in self._building:
+                result[name] = {"state": "building"}
+            elif name in self._errors:
+                result[name] = {"state": "error", "error": self._errors[name]}
+            else:
+                result[name] = {"state": "cold"}
+        return result
+
+    def ready(self) -> bool:
+        return all(name in self._instances for name in self._factories)
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """
+        Constrói os componentes numa thread em segundo plano.
+        """
+        names = list(names) if names is not None else list(self._factories)
+
+        def _warm():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Erro ao aquecer o componente '{name}': {e}")
+
+        thread = threading.Thread(target=_warm, name="registry-warmup", daemon=True)
+        thread.start()
+        return thread
+
+
+registry = LazyRegistry()
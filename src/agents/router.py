@@ -0,0 +1,79 @@
+"""
+Classificador local de intenção usado antes do request_identifier_agent.
+
+Compara o embedding da mensagem com exemplos rotulados (mesmo modelo sentence-transformers
+da base de conhecimento). Só decide localmente quando a confiança é alta; nos demais casos
+a classificação fica com o agente identificador (LLM).
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Rótulos que podem ser resolvidos sem o LLM (respostas diretas continuam com o identificador)
+ROUTABLE_INTENTS = ("Help", "Calendar")
+
+
+class IntentRouter:
+    def __init__(self, embedder, examples: Dict[str, List[str]], threshold: float = 0.6, margin: float = 0.05, top_k: int = 3):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.margin = margin
+        self.top_k = top_k
+
+        self.labels: List[str] = []
+        texts: List[str] = []
+        for label, label_examples in examples.items():
+            self.labels.extend([label] * len(label_examples))
+            texts.extend(label_examples)
+
+        self._label_names = list(examples)
+        self._example_matrix = self._normalize(np.asarray(self._embed(texts), dtype=np.float32))
+        self._label_masks = {label: np.array([item == label for item in self.labels]) for label in self._label_names}
+
+    def _embed(self, texts: List[str]):
+        if hasattr(self.embedder, "get_embeddings"):
+            return self.embedder.get_embeddings(texts)
+        return [self.embedder.get_embedding(text) for text in texts]
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def scores(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Similaridade média dos top_k exemplos mais próximos de cada rótulo, em ordem decrescente.
+        """
+        query = self._normalize(np.asarray(self.embedder.get_embedding(text), dtype=np.float32))
+        similarities = self._example_matrix @ query
+
+        result = []
+        for label in self._label_names:
+            label_similarities = np.sort(similarities[self._label_masks[label]])[::-1][: self.top_k]
+            result.append((label, float(label_similarities.mean())))
+        return sorted(result, key=lambda item: item[1], reverse=True)
+
+    def classify(self, text: str) -> Optional[str]:
+        """
+        Retorna 'Help' ou 'Calendar' quando a classificação local é confiável, ou None para usar o LLM.
+        """
+        return self.decide(self.scores(text))
+
+    def decide(self, ranked: List[Tuple[str, float]]) -> Optional[str]:
+        (best_label, best_score), (_, second_score) = ranked[0], ranked[1]
+
+        if best_label not in ROUTABLE_INTENTS:
+            return None
+        if best_score < self.threshold or best_score - second_score < self.margin:
+            return None
+        return best_label
+
+    @staticmethod
+    def likely(ranked: List[Tuple[str, float]], min_score: float) -> Optional[str]:
+        """
+        Palpite sem a confiança exigida por decide: o rótulo mais provável, se for roteável e tiver ao menos min_score.
+        """
+        best_label, best_score = ranked[0]
+        if best_label in ROUTABLE_INTENTS and best_score >= min_score:
+            return best_label
+        return None
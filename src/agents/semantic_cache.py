@@ -0,0 +1,163 @@
+"""
+Cache semântico de respostas verificadas do helper_agent.
+
+Perguntas quase idênticas ("qual é a política de trabalho remoto?") reaproveitam a resposta já
+verificada quando a similaridade de cosseno entre os embeddings supera o limiar, evitando a busca
+na web, a consulta ao pgvector e as chamadas ao helper e ao revisor. Cada entrada tem um escopo
+(o contexto da conversa em que a resposta foi gerada): uma pergunta só reaproveita respostas do
+mesmo escopo, então perguntas de acompanhamento ("e amanhã?") não recebem respostas dadas em
+outra conversa. As entradas expiram por TTL, são descartadas por LRU quando o cache enche e o
+cache inteiro é invalidado quando a base de conhecimento é reindexada.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.metrics import metrics
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        embedder,
+        threshold: float = 0.92,
+        ttl: float = 3600,
+        max_entries: int = 1000,
+        version: Optional[Callable[[], str]] = None,
+        version_check_interval: float = 60,
+        query_cache_size: int = 256,
+    ):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = version
+        self.version_check_interval = version_check_interval
+        self.query_cache_size = query_cache_size
+
+        # chave -> (embedding normalizado, resposta, criado em, escopo)
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_key = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._keys = []
+        self._scopes: Optional[np.ndarray] = None
+        # Embeddings das últimas consultas (a mesma mensagem é consultada mais de uma vez por requisição)
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._corpus_version = None
+        self._corpus_version = self._read_version()
+        self._version_checked_at = time.monotonic()
+
+    @staticmethod
+    def _normalize_text(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def _embed(self, text: str) -> np.ndarray:
+        key = self._normalize_text(text)
+        with self._lock:
+            embedding = self._query_embeddings.get(key)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(key)
+                return embedding
+
+        embedding = np.asarray(self.embedder.get_embedding(key), dtype=np.float32)
+        embedding = embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+
+        with self._lock:
+            self._query_embeddings[key] = embedding
+            while len(self._query_embeddings) > self.query_cache_size:
+                self._query_embeddings.popitem(last=False)
+        return embedding
+
+    def _read_version(self) -> Optional[str]:
+        if self.version is None:
+            return None
+        try:
+            return self.version()
+        except Exception as e:
+            print(f"Erro ao verificar a versão da base de conhecimento: {e}")
+            return self._corpus_version
+
+    def _check_version(self) -> None:
+        """
+        Invalida o cache se a base de conhecimento mudou (verificado no máximo a cada version_check_interval segundos).
+        """
+        if self.version is None or time.monotonic() - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = time.monotonic()
+
+        current = self._read_version()
+        if current != self._corpus_version:
+            self._corpus_version = current
+            self.clear()
+            metrics.increment("semantic_cache.invalidations")
+
+    def _rebuild_matrix(self) -> None:
+        self._keys = list(self._entries)
+        self._matrix = np.stack([self._entries[key][0] for key in self._keys]) if self._keys else None
+        self._scopes = np.array([self._entries[key][3] for key in self._keys], dtype=object)
+
+    def _expire(self, now: float) -> None:
+        expired = [key for key, (_, _, created_at, _) in self._entries.items() if now - created_at > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _lookup(self, query: str, scope: str) -> Optional[int]:
+        self._check_version()
+        embedding = self._embed(query)
+
+        with self._lock:
+            self._expire(time.time())
+            if self._matrix is None:
+                self._rebuild_matrix()
+            if self._matrix is None:
+                return None
+
+            similarities = np.where(self._scopes == scope, self._matrix @ embedding, -np.inf)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            return self._keys[best]
+
+    def get(self, query: str, scope: str = "") -> Optional[str]:
+        """
+        Resposta em cache para uma pergunta semelhante feita no mesmo escopo, ou None.
+        """
+        key = self._lookup(query, scope)
+        with self._lock:
+            if key is None or key not in self._entries:
+                metrics.increment("semantic_cache.miss")
+                return None
+            self._entries.move_to_end(key)
+            metrics.increment("semantic_cache.hit")
+            return self._entries[key][1]
+
+    def contains(self, query: str, scope: str = "") -> bool:
+        """
+        Indica se há resposta em cache, sem contar nas métricas nem alterar a ordem do LRU.
+        """
+        return self._lookup(query, scope) is not None
+
+    def put(self, query: str, answer: str, scope: str = "") -> None:
+        embedding = self._embed(query)
+
+        with self._lock:
+            self._entries[self._next_key] = (embedding, answer, time.time(), scope)
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
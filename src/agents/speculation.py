@@ -0,0 +1,132 @@
+"""
+Execução especulativa de um agente em paralelo ao agente identificador.
+
+Quando o classificador local não tem confiança para decidir sozinho, o ramo mais provável
+(helper_agent ou a busca de convidados do auxiliar_calendar_agent) começa a rodar junto com o
+identificador. A saída fica em buffer: se a classificação confirmar o palpite ela é reaproveitada,
+senão a execução é cancelada e os tokens gastos são contabilizados como desperdício.
+
+Até a confirmação a execução não tem efeitos colaterais: o histórico da sessão é lido normalmente,
+mas as gravações no storage ficam retidas (BufferedStorage) e as buscas na web esperam o palpite ser
+confirmado (GatedSearchTools). Um palpite descartado não deixa rastro no histórico nem gasta buscas pagas.
+"""
+import asyncio
+from typing import Any, AsyncIterator
+
+from src.metrics import metrics
+
+_END = object()
+
+
+class BufferedStorage:
+    """
+    Storage do agno para execuções especulativas: as leituras vão ao storage real e as gravações ficam
+    retidas (só a última, que contém a sessão inteira) até flush(), chamado quando o palpite é confirmado.
+    """
+
+    def __init__(self, storage: Any, gate: asyncio.Event):
+        self._storage = storage
+        self._gate = gate
+        self._pending = None
+
+    def __getattr__(self, name: str):
+        return getattr(self._storage, name)
+
+    def upsert(self, session, *args, **kwargs):
+        if self._gate.is_set():
+            return self._storage.upsert(session, *args, **kwargs)
+        self._pending = (session, args, kwargs)
+        return session
+
+    def flush(self) -> None:
+        if self._pending is not None:
+            session, args, kwargs = self._pending
+            self._pending = None
+            self._storage.upsert(session, *args, **kwargs)
+
+
+class SpeculativeRun:
+    def __init__(self, intent: str, agent: Any, output: AsyncIterator[str], gate: asyncio.Event):
+        self.intent = intent
+        self.agent = agent
+        self.used = False
+        self._gate = gate
+        self._chars = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._consume(output))
+        metrics.increment(f"speculation.started.{intent.lower()}")
+
+    async def _consume(self, output: AsyncIterator[str]) -> None:
+        try:
+            async for token in output:
+                self._chars += len(token)
+                self._queue.put_nowait(token)
+        finally:
+            self._queue.put_nowait(_END)
+
+    def confirm(self) -> None:
+        """
+        Palpite confirmado: libera as buscas retidas e grava o histórico da sessão.
+        """
+        if self._gate.is_set():
+            return
+        self._gate.set()
+        storage = getattr(self.agent, "storage", None)
+        if isinstance(storage, BufferedStorage):
+            storage.flush()
+
+    async def tokens(self):
+        """
+        Reaproveita a execução: produz o que já está no buffer e depois o restante, à medida que chega.
+        """
+        self.confirm()
+        self.used = True
+        metrics.increment("speculation.hit")
+        while True:
+            token = await self._queue.get()
+            if token is _END:
+                break
+            yield token
+        # Propaga eventuais erros da execução
+        await self._task
+
+    async def result(self) -> str:
+        return "".join([token async for token in self.tokens()])
+
+    def tokens_spent(self) -> int:
+        """
+        Tokens consumidos pela execução (métricas do agno; estimativa pelo texto gerado se a execução foi interrompida).
+        """
+        run_metrics = getattr(getattr(self.agent, "run_response", None), "metrics", None) or {}
+        total = sum(run_metrics.get("total_tokens", None) or [])
+        return total or self._chars // 4
+
+    async def _stop(self) -> None:
+        if self._task.done():
+            # Consome a exceção, se houver, para não gerar aviso de exceção não tratada
+            if not self._task.cancelled():
+                self._task.exception()
+        else:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def cancel(self) -> None:
+        """
+        Descarta a execução (palpite errado) e registra os tokens desperdiçados.
+        """
+        await self._stop()
+        metrics.increment("speculation.miss")
+        metrics.increment("speculation.wasted_tokens", self.tokens_spent())
+
+    async def close(self) -> None:
+        """
+        Encerra a execução ao fim da requisição: se nunca foi aproveitada conta como desperdício,
+        se foi aproveitada apenas interrompe o que ainda estiver rodando (ex.: cliente desconectou).
+        """
+        if not self.used:
+            await self.cancel()
+        elif not self._task.done():
+            await self._stop()
@@ -1,46 +1,75 @@
-from typing import Dict
-from fastapi import Depends, FastAPI, HTTPException, Header
+from typing import Dict, Optional
+import hashlib
+import json
+from fastapi import Depends, FastAPI, HTTPException, Header, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-import sqlite3
+from config.settings import (
+    AGENT_WARMUP,
+    CHAT_MAX_CONCURRENCY,
+    CHAT_MAX_QUEUE,
+    CHAT_QUEUE_TIMEOUT,
+    CHAT_RETRY_AFTER,
+    PGVECTOR_DB_URL,
+    TOKEN_CACHE_SIZE,
+    TOKEN_CACHE_TTL,
+    TOKEN_DB_PATH,
+    TOKEN_DB_URL,
+    TOKEN_STORE_BACKEND,
+    TOKEN_SWEEP_INTERVAL,
+    TOKEN_TTL,
+)
 from src.api.db_functions import cadastrar_usuario, login_usuario
-from src.agents.agents_main import bot_main
-import secrets
+from src.db.users import find_email, init_db
+from src.api.limiter import ConcurrencyLimiter, Overloaded
+from src.api.token_store import build_token_store
+from src.agents.agents_main import bot_main, bot_stream
+from src.agents.registry import registry
+from src.metrics import metrics
+from src.tools.calendar_mirror import calendar_mirror
+from src.tools.calendar_service import CALENDAR_SCOPES, calendar_services, user_token_path
+from src.tools.event_handles import event_handles
 import os.path
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 
-# Google Calendar API scopes para diferentes permissões
-CALENDAR_SCOPES = {
-    "readonly": ["https://www.googleapis.com/auth/calendar.readonly"],
-    "read_update": ["https://www.googleapis.com/auth/calendar.events"],
-    "full_access": ["https://www.googleapis.com/auth/calendar"]
-}
-
 app = FastAPI()
 
 # Inicialização do Banco de Dados
-def init_db():
-    conn = sqlite3.connect("database/usuarios.sqlite")
-    c = conn.cursor()
-    c.execute(
-        """
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password TEXT NOT NULL,
-            email TEXT NOT NULL UNIQUE
-        )
-        """
-    )
-    conn.commit()
-    conn.close()
+init_db()
 
 
-init_db()
+# Aquece agentes e modelos em segundo plano depois que o servidor já aceita requisições
+@app.on_event("startup")
+def warm_up_components():
+    if AGENT_WARMUP:
+        registry.warm_up()
 
-# Armazenamento temporário de tokens (em produção, usar um banco de dados)
-tokens: Dict[str, Dict] = {}
+
+# Remove periodicamente as sessões expiradas
+@app.on_event("startup")
+def start_token_sweeper():
+    token_store.start_sweeper(TOKEN_SWEEP_INTERVAL)
+
+# Limite de conversas simultâneas neste processo
+chat_limiter = ConcurrencyLimiter(
+    max_concurrency=CHAT_MAX_CONCURRENCY,
+    max_queue=CHAT_MAX_QUEUE,
+    queue_timeout=CHAT_QUEUE_TIMEOUT,
+    retry_after=CHAT_RETRY_AFTER,
+)
+
+# Sessões (tokens de autenticação) com expiração, compartilhadas entre workers
+token_store = build_token_store(
+    TOKEN_STORE_BACKEND,
+    ttl=TOKEN_TTL,
+    db_path=TOKEN_DB_PATH,
+    cache_ttl=TOKEN_CACHE_TTL,
+    cache_size=TOKEN_CACHE_SIZE,
+    db_url=TOKEN_DB_URL or PGVECTOR_DB_URL,
+)
 
 
 # Definição dos modelos Pydantic
@@ -58,14 +87,31 @@ class UserLogin(BaseModel):
 
 class Message(BaseModel):
     message: str
-    username: str
+    # Mantido por compatibilidade com clientes antigos: o usuário vem sempre do token da sessão
+    username: Optional[str] = None
+    # Conversa do cliente (ex.: aba do navegador); sem ela, cada token de sessão é uma conversa
+    conversation_id: Optional[str] = None
+
+
+def message_user(message: Message, current_user: dict) -> str:
+    username = current_user["username"]
+    if message.username and message.username.lower() != username:
+        raise HTTPException(status_code=403, detail="Usuário não corresponde à sessão")
+    return username
+
+
+def conversation_key(message: Message, token: str) -> str:
+    if message.conversation_id:
+        return message.conversation_id
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
 
 
 # Função para verificar o token de autenticação
 def get_current_user(token: str = Header(...)):
-    if token not in tokens:
+    user = token_store.get(token)
+    if user is None:
         raise HTTPException(status_code=401, detail="Token inválido")
-    return tokens[token]
+    return user
 
 
 def get_permission_capabilities(permission_level: str) -> Dict[str, bool]:
@@ -107,7 +153,7 @@ def check_calendar_credentials(user_email: str, permission_level: str = "full_ac
     scopes = CALENDAR_SCOPES.get(permission_level, CALENDAR_SCOPES["full_access"])
     
     # Caminho personalizado para o token do usuário com base na permissão
-    token_path = f"auth/tokens/{user_email}_{permission_level}_token.json"
+    token_path = user_token_path(user_email, permission_level)
     os.makedirs("auth/tokens", exist_ok=True)
     
     # Verificar se as credenciais existem e são válidas
@@ -136,6 +182,21 @@ def check_calendar_credentials(user_email: str, permission_level: str = "full_ac
     return creds.valid
 
 
+# Rota de prontidão: informa quais componentes já estão carregados
+@app.get("/ready")
+def ready(response: Response):
+    is_ready = registry.ready()
+    if not is_ready:
+        response.status_code = 503
+    return {"ready": is_ready, "components": registry.status()}
+
+
+# Rota de métricas do processo (latências p50/p95 por rota, contadores)
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
+
 # Rota para cadastro de usuário
 @app.post("/register")
 def register(user: UserCadastro):
@@ -154,17 +215,11 @@ def login(user: UserLogin):
     logged_user = login_usuario(user.username, user.password)
     if logged_user:
         # Obter o email do usuário
-        conn = sqlite3.connect("database/usuarios.sqlite")
-        c = conn.cursor()
-        c.execute("SELECT email FROM usuarios WHERE username = ?", (user.username,))
-        result = c.fetchone()
-        conn.close()
+        user_email = find_email(user.username)
         
-        if not result:
+        if not user_email:
             raise HTTPException(status_code=404, detail="Usuário não encontrado na base de dados")
         
-        user_email = result[0]
-        
         # Verificar se o nível de permissão é válido
         if user.calendar_permissions not in CALENDAR_SCOPES:
             raise HTTPException(status_code=400, detail="Nível de permissão inválido")
@@ -176,13 +231,12 @@ def login(user: UserLogin):
         capabilities = get_permission_capabilities(user.calendar_permissions)
         
         # Gerar token de autenticação
-        token = secrets.token_hex(16)
-        tokens[token] = {
+        token = token_store.issue({
             "username": user.username, 
             "email": user_email,
             "calendar_permissions": user.calendar_permissions,
             "capabilities": capabilities
-        }
+        })
         
         return {
             "message": f"Bem-vindo {user.username}", 
@@ -195,6 +249,13 @@ def login(user: UserLogin):
         raise HTTPException(status_code=400, detail="Usuário ou senha incorretos")
 
 
+# Rota de logout: invalida o token da sessão
+@app.post("/logout")
+def logout(token: str = Header(...)):
+    token_store.revoke(token)
+    return {"message": "Sessão encerrada"}
+
+
 # Rota para resetar autenticação do calendário
 @app.post("/reset_calendar_auth")
 def reset_calendar_auth(current_user: dict = Depends(get_current_user)):
@@ -211,18 +272,92 @@ def reset_calendar_auth(current_user: dict = Depends(get_current_user)):
             os.remove(token_file)
         except OSError:
             pass
+    calendar_services.invalidate(user_email)
+    if calendar_mirror is not None:
+        calendar_mirror.forget(user_email)
+    event_handles.forget_owner(user_email)
     
     return {"message": "Autenticação do calendário resetada"}
 
 
+# Notificações de mudança do Google Calendar (canais criados pelo espelho local quando CALENDAR_WEBHOOK_URL está definida)
+@app.post("/calendar/notifications")
+def calendar_notifications(
+    x_goog_channel_id: str = Header(...),
+    x_goog_channel_token: str = Header(""),
+    x_goog_resource_state: str = Header("exists"),
+):
+    if calendar_mirror is None or not calendar_mirror.notify(x_goog_channel_id, x_goog_channel_token, x_goog_resource_state):
+        raise HTTPException(status_code=404, detail="Canal desconhecido")
+    return Response(status_code=200)
+
+
 # Rota para interação com o chatbot
 @app.post("/chat")
-def chat(message: Message, current_user: dict = Depends(get_current_user)):
-    # Passar informações de permissão para o bot
-    response = bot_main(
-        message.message, 
-        message.username,
-        user_permissions=current_user.get("capabilities", {}),
-        permission_level=current_user.get("calendar_permissions", "full_access")
-    )
+async def chat(message: Message, token: str = Header(...), current_user: dict = Depends(get_current_user)):
+    username = message_user(message, current_user)
+    try:
+        async with chat_limiter.slot():
+            # Passar informações de permissão para o bot
+            response = await bot_main(
+                message.message, 
+                username,
+                user_permissions=current_user.get("capabilities", {}),
+                permission_level=current_user.get("calendar_permissions", "full_access"),
+                user_email=current_user.get("email"),
+                conversation_id=conversation_key(message, token),
+            )
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Servidor ocupado. Tente novamente em instantes.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     return {"response": response}
+
+
+# Rota de chat com streaming: cada linha da resposta é um evento JSON (token, replace, done ou error)
+@app.post("/chat/stream")
+async def chat_stream(message: Message, token: str = Header(...), current_user: dict = Depends(get_current_user)):
+    username = message_user(message, current_user)
+
+    # A vaga é reservada antes de iniciar a resposta para que a sobrecarga ainda retorne 429
+    try:
+        await chat_limiter.acquire()
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Servidor ocupado. Tente novamente em instantes.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    released = False
+
+    def release_slot():
+        nonlocal released
+        if not released:
+            released = True
+            chat_limiter.release()
+
+    async def events():
+        try:
+            async for event in bot_stream(
+                message.message,
+                username,
+                user_permissions=current_user.get("capabilities", {}),
+                permission_level=current_user.get("calendar_permissions", "full_access"),
+                user_email=current_user.get("email"),
+                conversation_id=conversation_key(message, token),
+            ):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            print(f"Erro no streaming do chat: {e}")
+            yield json.dumps({"type": "error", "content": "Erro ao gerar a resposta."}, ensure_ascii=False) + "\n"
+        finally:
+            release_slot()
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(release_slot),
+    )
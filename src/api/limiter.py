@@ -0,0 +1,60 @@
+"""
+Limitador de concorrência com contrapressão para as rotas de chat
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from src.metrics import metrics
+
+
+class Overloaded(Exception):
+    """
+    Levantada quando não há vaga disponível: a fila está cheia ou a espera excedeu o limite.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__("Servidor sobrecarregado")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+
+    async def acquire(self) -> None:
+        """
+        Reserva uma vaga; sem vaga em até queue_timeout segundos (ou com a fila cheia) levanta Overloaded.
+        """
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            metrics.increment("chat.rejected")
+            raise Overloaded(self.retry_after)
+
+        self.waiting += 1
+        try:
+            with metrics.timer("chat.queue_wait_seconds"):
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            metrics.increment("chat.rejected")
+            raise Overloaded(self.retry_after)
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
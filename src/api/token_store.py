@@ -0,0 +1,295 @@
+"""
+Armazenamento dos tokens de sessão da API.
+
+O backend padrão grava as sessões em SQLite (compartilhado entre os workers da máquina e
+preservado entre reinícios; Postgres para várias máquinas), com um cache LRU em memória na
+frente para que get_current_user não acesse o banco a cada requisição. Os tokens expiram
+após TOKEN_TTL segundos e uma thread em segundo plano remove as sessões expiradas.
+"""
+import hashlib
+import json
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.db.pool import SQLitePool
+
+
+def _hash(token: str) -> str:
+    # Apenas o hash do token é armazenado
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenStore(ABC):
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._sweeper: Optional[threading.Thread] = None
+
+    def issue(self, data: Dict) -> str:
+        """
+        Cria uma sessão para os dados do usuário e retorna o token.
+        """
+        token = secrets.token_hex(16)
+        self._save(_hash(token), data, time.time() + self.ttl)
+        return token
+
+    @abstractmethod
+    def get(self, token: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def revoke(self, token: str) -> None:
+        ...
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """
+        Remove as sessões expiradas; retorna quantas foram removidas.
+        """
+
+    @abstractmethod
+    def _save(self, token_hash: str, data: Dict, expires_at: float) -> None:
+        ...
+
+    def start_sweeper(self, interval: float) -> threading.Thread:
+        if self._sweeper is not None:
+            return self._sweeper
+
+        def _loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"Erro ao remover sessões expiradas: {e}")
+
+        self._sweeper = threading.Thread(target=_loop, name="token-sweeper", daemon=True)
+        self._sweeper.start()
+        return self._sweeper
+
+
+class MemoryTokenStore(TokenStore):
+    """
+    Sessões apenas em memória (um único processo), limitadas a max_entries com descarte LRU.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 100_000):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _save(self, token_hash: str, data: Dict, expires_at: float) -> None:
+        with self._lock:
+            self._sessions[token_hash] = (data, expires_at)
+            self._sessions.move_to_end(token_hash)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+    def get(self, token: str) -> Optional[Dict]:
+        token_hash = _hash(token)
+        with self._lock:
+            session = self._sessions.get(token_hash)
+            if session is None:
+                return None
+            if session[1] <= time.time():
+                del self._sessions[token_hash]
+                return None
+            # Sessões em uso são as últimas a serem descartadas
+            self._sessions.move_to_end(token_hash)
+            return session[0]
+
+    def revoke(self, token: str) -> None:
+        with self._lock:
+            self._sessions.pop(_hash(token), None)
+
+    def sweep(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._sessions.items() if expires_at <= now]
+            for key in expired:
+                del self._sessions[key]
+        return len(expired)
+
+
+class CachedTokenStore(TokenStore):
+    """
+    Base dos backends em banco: cache LRU em memória na frente das consultas.
+    O cache vale por cache_ttl segundos, limitando o atraso com que uma revogação feita por outro worker é vista.
+    """
+
+    def __init__(self, ttl: float, cache_ttl: float = 30, cache_size: int = 4096):
+        super().__init__(ttl)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        # hash -> (dados, expira em, válido no cache até)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _db_save(self, token_hash: str, data: str, expires_at: float) -> None:
+        ...
+
+    @abstractmethod
+    def _db_get(self, token_hash: str, now: float) -> Optional[tuple]:
+        ...
+
+    @abstractmethod
+    def _db_delete(self, token_hash: str) -> None:
+        ...
+
+    @abstractmethod
+    def _db_sweep(self, now: float) -> int:
+        ...
+
+    def _cache_put(self, token_hash: str, data: Dict, expires_at: float) -> None:
+        with self._lock:
+            self._cache[token_hash] = (data, expires_at, time.time() + self.cache_ttl)
+            self._cache.move_to_end(token_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _save(self, token_hash: str, data: Dict, expires_at: float) -> None:
+        self._db_save(token_hash, json.dumps(data), expires_at)
+        self._cache_put(token_hash, data, expires_at)
+
+    def get(self, token: str) -> Optional[Dict]:
+        token_hash = _hash(token)
+        now = time.time()
+
+        with self._lock:
+            cached = self._cache.get(token_hash)
+            if cached is not None:
+                data, expires_at, cached_until = cached
+                if expires_at > now and cached_until > now:
+                    self._cache.move_to_end(token_hash)
+                    return data
+                del self._cache[token_hash]
+
+        row = self._db_get(token_hash, now)
+        if row is None:
+            return None
+
+        data = json.loads(row[0])
+        self._cache_put(token_hash, data, row[1])
+        return data
+
+    def revoke(self, token: str) -> None:
+        token_hash = _hash(token)
+        with self._lock:
+            self._cache.pop(token_hash, None)
+        self._db_delete(token_hash)
+
+    def sweep(self) -> int:
+        now = time.time()
+        with self._lock:
+            for key in [key for key, (_, expires_at, _) in self._cache.items() if expires_at <= now]:
+                del self._cache[key]
+        return self._db_sweep(now)
+
+
+class SQLiteTokenStore(CachedTokenStore):
+    """
+    Sessões em SQLite (chave primária = hash do token, índice na expiração), compartilhadas pelos workers da máquina.
+    """
+
+    def __init__(self, pool: SQLitePool, ttl: float, cache_ttl: float = 30, cache_size: int = 4096):
+        super().__init__(ttl, cache_ttl=cache_ttl, cache_size=cache_size)
+        self.pool = pool
+
+        with self.pool.connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    token_hash TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+
+    def _db_save(self, token_hash: str, data: str, expires_at: float) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (token_hash, data, expires_at) VALUES (?, ?, ?)",
+                (token_hash, data, expires_at),
+            )
+
+    def _db_get(self, token_hash: str, now: float) -> Optional[tuple]:
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "SELECT data, expires_at FROM sessions WHERE token_hash = ? AND expires_at > ?",
+                (token_hash, now),
+            ).fetchone()
+
+    def _db_delete(self, token_hash: str) -> None:
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,))
+
+    def _db_sweep(self, now: float) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,)).rowcount
+
+
+class PostgresTokenStore(CachedTokenStore):
+    """
+    Sessões no Postgres, compartilhadas por workers em várias máquinas.
+    """
+
+    def __init__(self, db_url: str, ttl: float, cache_ttl: float = 30, cache_size: int = 4096, table_name: str = "api_sessions"):
+        super().__init__(ttl, cache_ttl=cache_ttl, cache_size=cache_size)
+        from sqlalchemy import Column, Float, Index, MetaData, String, Table, Text, create_engine
+
+        self.engine = create_engine(db_url, pool_pre_ping=True)
+        self.table = Table(
+            table_name,
+            MetaData(),
+            Column("token_hash", String, primary_key=True),
+            Column("data", Text, nullable=False),
+            Column("expires_at", Float, nullable=False),
+            Index(f"idx_{table_name}_expires_at", "expires_at"),
+        )
+        self.table.create(self.engine, checkfirst=True)
+
+    def _db_save(self, token_hash: str, data: str, expires_at: float) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+
+        statement = insert(self.table).values(token_hash=token_hash, data=data, expires_at=expires_at)
+        statement = statement.on_conflict_do_update(
+            index_elements=["token_hash"],
+            set_={"data": statement.excluded.data, "expires_at": statement.excluded.expires_at},
+        )
+        with self.engine.begin() as conn:
+            conn.execute(statement)
+
+    def _db_get(self, token_hash: str, now: float) -> Optional[tuple]:
+        from sqlalchemy import select
+
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(self.table.c.data, self.table.c.expires_at)
+                .where(self.table.c.token_hash == token_hash, self.table.c.expires_at > now)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def _db_delete(self, token_hash: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(self.table.delete().where(self.table.c.token_hash == token_hash))
+
+    def _db_sweep(self, now: float) -> int:
+        with self.engine.begin() as conn:
+            return conn.execute(self.table.delete().where(self.table.c.expires_at <= now)).rowcount
+
+
+def build_token_store(backend: str, ttl: float, db_path: str, cache_ttl: float, cache_size: int, db_url: str = "") -> TokenStore:
+    if backend == "memory":
+        return MemoryTokenStore(ttl)
+    if backend == "sqlite":
+        return SQLiteTokenStore(SQLitePool(db_path), ttl, cache_ttl=cache_ttl, cache_size=cache_size)
+    if backend == "postgres":
+        return PostgresTokenStore(db_url, ttl, cache_ttl=cache_ttl, cache_size=cache_size)
+    raise ValueError(f"TOKEN_STORE_BACKEND inválido: {backend}")
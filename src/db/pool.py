@@ -0,0 +1,71 @@
+"""
+Pool de conexões SQLite compartilhado entre threads
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SQLitePool:
+    def __init__(self, path: str, size: int = 8, timeout: float = 10.0, cached_statements: int = 256):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # cached_statements mantém as consultas já preparadas em cada conexão
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        return self._pool.get(timeout=self.timeout)
+
+    @contextmanager
+    def connection(self):
+        """
+        Empresta uma conexão do pool; a transação é confirmada ao sair (ou desfeita em caso de erro).
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
@@ -0,0 +1,123 @@
+"""
+Acesso ao banco de usuários (cadastro, login e busca de email), usando o pool de conexões
+e um cache LRU limitado para as buscas de email por nome de usuário.
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from config.settings import USER_DB_PATH, USER_DB_POOL_SIZE, USER_EMAIL_CACHE_SIZE
+from src.db.pool import SQLitePool
+
+pool = SQLitePool(USER_DB_PATH, size=USER_DB_POOL_SIZE)
+
+_MISSING = object()
+
+
+class EmailCache:
+    """
+    Cache LRU username -> email (guarda também os usuários inexistentes, limpos a cada novo cadastro).
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrementado a cada limpeza: consultas iniciadas antes dela não gravam resultados antigos
+        self.generation = 0
+
+    def get(self, username: str):
+        with self._lock:
+            if username not in self._entries:
+                return _MISSING
+            self._entries.move_to_end(username)
+            return self._entries[username]
+
+    def put(self, username: str, email: Optional[str], generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[username] = email
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+
+email_cache = EmailCache(USER_EMAIL_CACHE_SIZE)
+
+
+def init_db() -> None:
+    with pool.connection() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS usuarios (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password TEXT NOT NULL,
+                email TEXT NOT NULL UNIQUE
+            )
+            """
+        )
+
+
+def create_user(username: str, password: str, email: str) -> bool:
+    """
+    Cadastra o usuário; retorna False se o nome de usuário ou o email já existirem.
+    """
+    try:
+        with pool.connection() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM usuarios WHERE username = ? OR email = ?", (username, email)
+            ).fetchone()
+            if exists:
+                return False
+            conn.execute(
+                "INSERT INTO usuarios (username, password, email) VALUES (?, ?, ?)",
+                (username, password, email),
+            )
+    except sqlite3.IntegrityError:
+        # Cadastro simultâneo com o mesmo nome de usuário ou email: a restrição UNIQUE decide
+        return False
+
+    # Usuários antes inexistentes podem ter ficado em cache
+    email_cache.clear()
+    return True
+
+
+def authenticate(username: str, password: str) -> Optional[Tuple]:
+    with pool.connection() as conn:
+        return conn.execute(
+            "SELECT * FROM usuarios WHERE username = ? AND password = ?",
+            (username, password),
+        ).fetchone()
+
+
+def find_email(username: str) -> Optional[str]:
+    """
+    Email do usuário (ou None), consultando o banco apenas em caso de falta no cache.
+    """
+    cached = email_cache.get(username)
+    if cached is not _MISSING:
+        return cached
+
+    generation = email_cache.generation
+    with pool.connection() as conn:
+        row = conn.execute("SELECT email FROM usuarios WHERE username = ?", (username,)).fetchone()
+
+    email = row[0] if row else None
+    email_cache.put(username, email, generation)
+    return email
+
+
+def list_users() -> List[Tuple[str, str]]:
+    """
+    (username, email) de todos os usuários, para o índice de convidados do calendário.
+    """
+    with pool.connection() as conn:
+        return conn.execute("SELECT username, email FROM usuarios").fetchall()
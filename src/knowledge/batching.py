@@ -0,0 +1,145 @@
+"""
+Agrupamento de embeddings de consultas em micro-lotes.
+
+Cada busca na base de conhecimento (e cada classificação do roteador) gera o embedding de um único
+texto. Com requisições concorrentes, o MicroBatchEmbedder junta esses textos num único forward do
+modelo (até max_batch textos ou max_wait segundos de espera) e guarda os resultados num cache LRU
+para consultas repetidas.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from agno.embedder.base import Embedder
+
+from src.metrics import metrics
+
+
+@dataclass
+class MicroBatchEmbedder(Embedder):
+    id: Optional[str] = None
+    embedder: Optional[Embedder] = None
+    max_batch: int = 32
+    max_wait: float = 0.005
+    cache_size: int = 2048
+
+    _queue: queue.Queue = field(default_factory=queue.Queue, repr=False, compare=False)
+    _cache: OrderedDict = field(default_factory=OrderedDict, repr=False, compare=False)
+    _cache_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    _worker: Optional[threading.Thread] = field(default=None, repr=False, compare=False)
+    _worker_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def _cache_get(self, text: str) -> Optional[List[float]]:
+        with self._cache_lock:
+            embedding = self._cache.get(text)
+            if embedding is not None:
+                self._cache.move_to_end(text)
+            return embedding
+
+    def _cache_put(self, text: str, embedding: List[float]) -> None:
+        with self._cache_lock:
+            self._cache[text] = embedding
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-microbatch", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[str, Future, float]]:
+        """
+        Espera o primeiro pedido e junta os que chegarem até completar o lote ou esgotar max_wait.
+        """
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            # Qualquer falha vai para os pedidos do lote: a thread segue atendendo os próximos
+            try:
+                self._embed_batch(batch)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _embed_batch(self, batch: List[Tuple[str, Future, float]]) -> None:
+        started = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            metrics.observe("embedding.queue_wait_seconds", started - enqueued_at)
+
+        # Textos repetidos no mesmo lote são calculados uma única vez
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        metrics.observe("embedding.batch_size", len(texts))
+
+        vectors = self.embedder.get_embeddings(texts)
+        if len(vectors) != len(texts):
+            raise ValueError(f"O embedder retornou {len(vectors)} embeddings para {len(texts)} textos")
+        embeddings = dict(zip(texts, vectors))
+
+        metrics.observe("embedding.batch_seconds", time.perf_counter() - started)
+        for text, embedding in embeddings.items():
+            self._cache_put(text, embedding)
+        for text, future, _ in batch:
+            future.set_result(embeddings[text])
+
+    def _submit(self, text: str) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def get_embedding(self, text: Union[str, List[str]]) -> List[float]:
+        if isinstance(text, list):
+            return self.get_embeddings(text)
+
+        cached = self._cache_get(text)
+        if cached is not None:
+            metrics.increment("embedding.cache_hit")
+            return cached
+
+        metrics.increment("embedding.cache_miss")
+        return self._submit(text).result()
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Listas grandes (ex.: exemplos do roteador) vão direto ao modelo; listas pequenas entram nos micro-lotes.
+        """
+        if len(texts) >= self.max_batch:
+            return self.embedder.get_embeddings(texts)
+
+        results: Dict[int, List[float]] = {}
+        futures = {}
+        for index, text in enumerate(texts):
+            cached = self._cache_get(text)
+            if cached is not None:
+                metrics.increment("embedding.cache_hit")
+                results[index] = cached
+            else:
+                metrics.increment("embedding.cache_miss")
+                futures[index] = self._submit(text)
+        for index, future in futures.items():
+            results[index] = future.result()
+        return [results[index] for index in range(len(texts))]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
@@ -0,0 +1,105 @@
+"""
+Divisão dos documentos em chunks orientada a seções.
+
+O texto de cada página é separado nos títulos de seção (linhas numeradas como "3.2 Férias",
+linhas curtas em maiúsculas ou terminadas em ":") e os parágrafos de cada seção são agrupados
+até chunk_size caracteres, com overlap caracteres repetidos entre chunks consecutivos. Quando
+uma seção ocupa mais de um chunk, o título é repetido no início de cada um.
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from agno.document import Document
+from agno.document.chunking.strategy import ChunkingStrategy
+
+_NUMBERED_HEADING = re.compile(r"^(?:\d+(?:\.\d+)*\.?|[IVXLC]+\.)\s+\S.{0,80}$")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+
+
+def is_heading(line: str) -> bool:
+    line = line.strip()
+    if not line or len(line) > 90:
+        return False
+    if _NUMBERED_HEADING.match(line):
+        return True
+    letters = [char for char in line if char.isalpha()]
+    if len(letters) >= 4 and all(char.isupper() for char in letters):
+        return True
+    return line.endswith(":") and len(line.split()) <= 8
+
+
+def split_sections(text: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Lista de (título, corpo) na ordem do texto; o trecho antes do primeiro título tem título None.
+    """
+    sections: List[Tuple[Optional[str], List[str]]] = [(None, [])]
+    for line in text.splitlines():
+        if is_heading(line):
+            sections.append((line.strip(), []))
+        else:
+            sections[-1][1].append(line)
+    return [(title, "\n".join(lines).strip()) for title, lines in sections if title or "\n".join(lines).strip()]
+
+
+@dataclass
+class SectionChunking(ChunkingStrategy):
+    chunk_size: int = 1500
+    overlap: int = 150
+
+    def _pieces(self, body: str, limit: int) -> List[str]:
+        """
+        Parágrafos do corpo; parágrafos maiores que o limite são divididos em frases (ou cortados).
+        """
+        pieces = []
+        for paragraph in re.split(r"\n\s*\n", body):
+            paragraph = " ".join(paragraph.split())
+            if not paragraph:
+                continue
+            if len(paragraph) <= limit:
+                pieces.append(paragraph)
+                continue
+            for sentence in _SENTENCE_END.split(paragraph):
+                while len(sentence) > limit:
+                    pieces.append(sentence[:limit])
+                    sentence = sentence[limit:]
+                if sentence:
+                    pieces.append(sentence)
+        return pieces
+
+    def _pack(self, title: Optional[str], body: str) -> List[str]:
+        prefix = f"{title}\n" if title else ""
+        limit = max(1, self.chunk_size - len(prefix))
+        chunks: List[str] = []
+        current = ""
+        for piece in self._pieces(body, limit):
+            candidate = f"{current} {piece}".strip() if current else piece
+            if len(candidate) <= limit:
+                current = candidate
+                continue
+            chunks.append(current)
+            # O final do chunk anterior é repetido no início do próximo
+            tail = current[-self.overlap :].split(" ", 1)[-1] if self.overlap else ""
+            current = f"{tail} {piece}".strip() if tail and len(tail) + len(piece) < limit else piece
+        if current:
+            chunks.append(current)
+        return [f"{prefix}{chunk}".strip() for chunk in chunks]
+
+    def chunk(self, document: Document) -> List[Document]:
+        chunks: List[Document] = []
+        for title, body in split_sections(document.content):
+            for content in self._pack(title, body):
+                if not content:
+                    continue
+                meta_data = {**document.meta_data, "chunk": len(chunks) + 1}
+                if title:
+                    meta_data["section"] = title
+                chunks.append(
+                    Document(
+                        id=f"{document.id}_{len(chunks) + 1}" if document.id else None,
+                        name=document.name,
+                        meta_data=meta_data,
+                        content=content,
+                    )
+                )
+        return chunks
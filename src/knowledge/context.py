@@ -0,0 +1,145 @@
+"""
+Montagem do contexto recuperado que vai para o prompt do helper_agent.
+
+Os chunks chegam em ordem de relevância. O ContextAssembler descarta quase-duplicatas, remove o
+trecho repetido entre chunks vizinhos (overlap do chunking) e para ao atingir o orçamento de
+tokens, cortando o último chunk no fim de uma frase. Cada chunk vai ao modelo apenas com o
+conteúdo e os metadados úteis para citação (documento, página e seção).
+"""
+import math
+import re
+from typing import Dict, List, Set, Tuple
+
+from agno.document import Document
+
+from src.metrics import metrics
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_SENTENCE_END = re.compile(r"[.!?;](?=\s|$)")
+
+# Metadados mantidos no contexto
+CONTEXT_META_KEYS = ("page", "section")
+
+
+def _encoder():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+class ContextAssembler:
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        duplicate_threshold: float = 0.8,
+        max_overlap: int = 400,
+        min_overlap: int = 40,
+        min_tail_tokens: int = 80,
+    ):
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.max_overlap = max_overlap
+        self.min_overlap = min_overlap
+        self.min_tail_tokens = min_tail_tokens
+        self._tokenizer = _encoder()
+
+    def count_tokens(self, text: str) -> int:
+        if self._tokenizer is not None:
+            return len(self._tokenizer.encode(text))
+        # Sem tiktoken: estimativa de ~4 caracteres por token
+        return math.ceil(len(text) / 4)
+
+    @staticmethod
+    def _shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+        words = [word.lower() for word in _WORD.findall(text)]
+        if len(words) < size:
+            return {tuple(words)} if words else set()
+        return {tuple(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+    def _trim_overlap(self, selected: str, content: str) -> str:
+        """
+        Remove o trecho que o chunk repete de um chunk já selecionado (vizinho anterior ou seguinte no documento).
+        """
+        for size in range(min(self.max_overlap, len(selected), len(content)), self.min_overlap - 1, -1):
+            if selected.endswith(content[:size]):
+                return content[size:].lstrip()
+            if content.endswith(selected[:size]):
+                return content[:-size].rstrip()
+        return content
+
+    @staticmethod
+    def _split_heading(doc: Document, content: str) -> Tuple[str, str]:
+        """
+        Separa o título de seção que o chunking repete no início de cada chunk da seção.
+        """
+        section = doc.meta_data.get("section")
+        if section and content.startswith(f"{section}\n"):
+            return f"{section}\n", content[len(section) + 1 :]
+        return "", content
+
+    def _truncate(self, content: str, max_tokens: int) -> str:
+        """
+        Corta o texto no orçamento, terminando na última frase completa quando possível.
+        """
+        if self._tokenizer is not None:
+            cut = self._tokenizer.decode(self._tokenizer.encode(content)[:max_tokens])
+        else:
+            cut = content[: max_tokens * 4]
+        ends = [match.end() for match in _SENTENCE_END.finditer(cut)]
+        if ends and ends[-1] > len(cut) // 2:
+            cut = cut[: ends[-1]]
+        return cut.rstrip() + " …"
+
+    def assemble(self, documents: List[Document]) -> List[Document]:
+        selected: List[Document] = []
+        selected_shingles: List[Set] = []
+        used = 0
+
+        for doc in documents:
+            shingles = self._shingles(doc.content)
+            if shingles and any(
+                len(shingles & other) / len(shingles) >= self.duplicate_threshold for other in selected_shingles
+            ):
+                continue
+
+            heading, content = self._split_heading(doc, doc.content)
+            for previous in selected:
+                if previous.meta_data.get("source") == doc.meta_data.get("source"):
+                    content = self._trim_overlap(self._split_heading(previous, previous.content)[1], content)
+            if not content.strip():
+                continue
+            content = heading + content
+
+            tokens = self.count_tokens(content)
+            remaining = self.max_tokens - used
+            if tokens > remaining:
+                if remaining < self.min_tail_tokens:
+                    break
+                content = self._truncate(content, remaining)
+                tokens = self.count_tokens(content)
+
+            selected.append(Document(id=doc.id, name=doc.name, meta_data=doc.meta_data, content=content))
+            selected_shingles.append(shingles)
+            used += tokens
+            if used >= self.max_tokens:
+                break
+
+        metrics.observe("retrieval.context_tokens", used)
+        metrics.increment("retrieval.chunks_dropped", len(documents) - len(selected))
+        return selected
+
+    def to_references(self, documents: List[Document]) -> List[Dict]:
+        """
+        Formato enviado ao modelo: conteúdo, documento e os metadados de citação.
+        """
+        references = []
+        for doc in documents:
+            reference: Dict = {"name": doc.name, "content": doc.content}
+            meta_data = {key: doc.meta_data[key] for key in CONTEXT_META_KEYS if key in doc.meta_data}
+            if meta_data:
+                reference["meta_data"] = meta_data
+            references.append(reference)
+        return references
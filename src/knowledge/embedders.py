@@ -0,0 +1,69 @@
+import importlib.util
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from agno.embedder.sentence_transformer import SentenceTransformerEmbedder
+from sentence_transformers import SentenceTransformer
+
+# Arquivos ONNX publicados nos repositórios sentence-transformers (a variante quint8_avx2 roda em qualquer CPU x86 recente)
+ONNX_FILES = {
+    "onnx": "onnx/model.onnx",
+    "onnx-int8": "onnx/model_quint8_avx2.onnx",
+}
+
+
+@dataclass
+class SharedSentenceTransformerEmbedder(SentenceTransformerEmbedder):
+    """
+    Embedder que mantém o modelo carregado em memória.
+    O SentenceTransformerEmbedder do agno recarrega o modelo a cada chamada de get_embedding.
+
+    backend escolhe a inferência em CPU: "torch" (padrão), "torch-int8" (camadas lineares quantizadas
+    dinamicamente), "onnx" ou "onnx-int8" (ONNX Runtime; onnx_file escolhe o arquivo dentro do repositório do modelo).
+    """
+
+    batch_size: int = 32
+    backend: str = "torch"
+    onnx_file: Optional[str] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def get_model(self) -> SentenceTransformer:
+        if self.sentence_transformer_client is None:
+            with self._lock:
+                if self.sentence_transformer_client is None:
+                    self.sentence_transformer_client = self._load_model()
+        return self.sentence_transformer_client
+
+    def _load_model(self) -> SentenceTransformer:
+        if self.backend in ONNX_FILES:
+            missing = [name for name in ("optimum", "onnxruntime") if importlib.util.find_spec(name) is None]
+            if missing:
+                raise ImportError(
+                    f"EMBEDDING_BACKEND={self.backend} requer {' e '.join(missing)}: pip install -r requirements-onnx.txt"
+                )
+            file_name = self.onnx_file or ONNX_FILES[self.backend]
+            return SentenceTransformer(self.id, backend="onnx", model_kwargs={"file_name": file_name})
+
+        model = SentenceTransformer(model_name_or_path=self.id)
+        if self.backend == "torch-int8":
+            import torch
+
+            torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        elif self.backend != "torch":
+            raise ValueError(f"EMBEDDING_BACKEND inválido: {self.backend}")
+        return model
+
+    def get_embedding(self, text: Union[str, List[str]]) -> List[float]:
+        return self.get_model().encode(text).tolist()
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Gera embeddings de vários textos em lotes (bem mais rápido que um texto por vez).
+        """
+        if not texts:
+            return []
+        return self.get_model().encode(texts, batch_size=self.batch_size).tolist()
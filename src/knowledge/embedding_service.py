@@ -0,0 +1,46 @@
+"""
+Serviço de embeddings compartilhado pelos workers da API (um por máquina).
+
+Carrega o modelo sentence-transformers uma única vez e expõe POST /embed. Executado por
+run_embedding_service.py ou iniciado pelo run_api.py em modo de produção.
+"""
+from typing import List
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from config.settings import EMBEDDING_MICROBATCH
+from src.knowledge.knowledge_base import embedder_factory, micro_batched
+from src.metrics import metrics
+
+app = FastAPI()
+
+embedder = embedder_factory()
+# Consultas concorrentes dos workers são agrupadas num único forward do modelo
+batcher = micro_batched(embedder) if EMBEDDING_MICROBATCH else embedder
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+
+@app.on_event("startup")
+def load_model():
+    embedder.get_model()
+
+
+@app.get("/health")
+def health():
+    return {"model": embedder.id, "backend": embedder.backend, "dimensions": embedder.dimensions}
+
+
+# Rota síncrona: roda no threadpool e o torch libera o GIL durante o encode
+@app.post("/embed")
+def embed(request: EmbedRequest):
+    return {"embeddings": batcher.get_embeddings(request.texts)}
+
+
+# Tamanho dos lotes e espera na fila dos micro-lotes
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
@@ -0,0 +1,193 @@
+"""
+Gerenciamento do índice ANN (HNSW ou IVFFlat) da tabela do pgvector.
+
+O índice é criado explicitamente com os parâmetros de config/settings.py e só é recriado quando
+esses parâmetros mudam (ou, no IVFFlat automático, quando o número de linhas muda bastante). Os
+parâmetros de busca (hnsw.ef_search / ivfflat.probes) são aplicados pelo PgVector a cada consulta.
+"""
+import math
+import time
+from typing import Dict, List, Optional, Union
+
+from agno.vectordb.pgvector import HNSW, Distance, Ivfflat
+from sqlalchemy import text
+
+from config.settings import (
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH,
+    HNSW_M,
+    IVFFLAT_LISTS,
+    IVFFLAT_PROBES,
+    VECTOR_INDEX,
+    VECTOR_INDEX_BUILD_MEMORY,
+)
+
+VectorIndex = Union[HNSW, Ivfflat]
+
+OPERATOR_CLASSES = {
+    Distance.cosine: "vector_cosine_ops",
+    Distance.l2: "vector_l2_ops",
+    Distance.max_inner_product: "vector_ip_ops",
+}
+OPERATORS = {
+    Distance.cosine: "<=>",
+    Distance.l2: "<->",
+    Distance.max_inner_product: "<#>",
+}
+
+
+def build_vector_index(kind: str = VECTOR_INDEX) -> Optional[VectorIndex]:
+    """
+    Configuração do índice a partir das settings (None = sem índice, busca exata).
+    """
+    if kind == "hnsw":
+        return HNSW(m=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION, ef_search=HNSW_EF_SEARCH)
+    if kind == "ivfflat":
+        return Ivfflat(lists=IVFFLAT_LISTS or 100, probes=IVFFLAT_PROBES, dynamic_lists=not IVFFLAT_LISTS)
+    if kind == "none":
+        return None
+    raise ValueError(f"VECTOR_INDEX inválido: {kind}")
+
+
+def ivfflat_lists(rows: int) -> int:
+    # Recomendação do pgvector: linhas/1000 até 1M de linhas, raiz quadrada das linhas acima disso
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def index_method(index: VectorIndex) -> str:
+    return "hnsw" if isinstance(index, HNSW) else "ivfflat"
+
+
+def index_options(index: VectorIndex, rows: int) -> Dict[str, int]:
+    if isinstance(index, HNSW):
+        return {"m": index.m, "ef_construction": index.ef_construction}
+    return {"lists": ivfflat_lists(rows) if index.dynamic_lists else index.lists}
+
+
+def index_name(table_name: str, index: VectorIndex) -> str:
+    return f"{table_name}_embedding_{index_method(index)}"
+
+
+def create_index_sql(schema: str, table_name: str, index: VectorIndex, rows: int, distance: Distance = Distance.cosine) -> str:
+    options = ", ".join(f"{key} = {value}" for key, value in index_options(index, rows).items())
+    return (
+        f'CREATE INDEX "{index_name(table_name, index)}" ON "{schema}"."{table_name}" '
+        f"USING {index_method(index)} (embedding {OPERATOR_CLASSES[distance]}) WITH ({options})"
+    )
+
+
+def search_settings_sql(index: Optional[VectorIndex]) -> List[str]:
+    """
+    Comandos SET LOCAL dos parâmetros de busca do índice (dentro de uma transação).
+    """
+    if isinstance(index, HNSW):
+        return [f"SET LOCAL hnsw.ef_search = {index.ef_search}"]
+    if isinstance(index, Ivfflat):
+        return [f"SET LOCAL ivfflat.probes = {index.probes}"]
+    # Sem índice: força a varredura exata mesmo que exista algum índice na tabela
+    return ["SET LOCAL enable_indexscan = off"]
+
+
+def list_ann_indexes(engine, schema: str, table_name: str) -> Dict[str, Dict]:
+    """
+    Índices HNSW/IVFFlat existentes na tabela: {nome: {"method": ..., "options": {...}}}.
+    """
+    query = text(
+        """
+        SELECT c.relname AS name, am.amname AS method, c.reloptions AS options
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        JOIN pg_am am ON am.oid = c.relam
+        WHERE n.nspname = :schema AND t.relname = :table AND am.amname IN ('hnsw', 'ivfflat')
+        """
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(query, {"schema": schema, "table": table_name}).fetchall()
+
+    indexes = {}
+    for row in rows:
+        options = dict(option.split("=", 1) for option in (row.options or []))
+        indexes[row.name] = {"method": row.method, "options": {key: int(value) for key, value in options.items()}}
+    return indexes
+
+
+def _up_to_date(current: Dict, index: VectorIndex, rows: int) -> bool:
+    if current["method"] != index_method(index):
+        return False
+    desired = index_options(index, rows)
+    if isinstance(index, Ivfflat) and index.dynamic_lists:
+        # Listas automáticas: só reconstrói quando o ideal dobra ou cai pela metade
+        lists = current["options"].get("lists", 100)
+        return desired["lists"] / 2 <= lists <= desired["lists"] * 2
+    return all(current["options"].get(key) == value for key, value in desired.items())
+
+
+def ensure_index(
+    engine,
+    schema: str,
+    table_name: str,
+    index: Optional[VectorIndex],
+    distance: Distance = Distance.cosine,
+    force: bool = False,
+) -> Dict:
+    """
+    Deixa a tabela com exatamente o índice ANN configurado.
+
+    Índices ANN com outro nome ou parâmetros (inclusive os criados pelo agno) são removidos. O IVFFlat
+    só é criado com a tabela populada, pois as listas são calculadas a partir dos dados.
+
+    Returns:
+        dict: {"index": nome ou None, "action": "kept" | "created" | "dropped" | "deferred", "seconds": ...}
+    """
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        rows = conn.execute(text(f'SELECT count(*) FROM "{schema}"."{table_name}"')).scalar()
+
+    existing = list_ann_indexes(engine, schema, table_name)
+    name = index_name(table_name, index) if index is not None else None
+    current = existing.get(name)
+    if current is not None and not force and len(existing) == 1 and _up_to_date(current, index, rows):
+        return {"index": name, "action": "kept", "seconds": time.perf_counter() - started}
+
+    # A construção bloqueia apenas escritas: a API continua lendo a tabela durante a ingestão
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for existing_name in existing:
+            conn.execute(text(f'DROP INDEX IF EXISTS "{schema}"."{existing_name}"'))
+
+        if index is None:
+            return {"index": None, "action": "dropped" if existing else "kept", "seconds": time.perf_counter() - started}
+        if isinstance(index, Ivfflat) and rows == 0:
+            return {"index": name, "action": "deferred", "seconds": time.perf_counter() - started}
+
+        conn.execute(text(f"SET maintenance_work_mem = '{VECTOR_INDEX_BUILD_MEMORY}'"))
+        conn.execute(text(create_index_sql(schema, table_name, index, rows, distance)))
+
+    return {"index": name, "action": "created", "seconds": time.perf_counter() - started}
+
+
+def ensure_vector_db_index(vector_db, index: Optional[VectorIndex], force: bool = False) -> Dict:
+    return ensure_index(vector_db.db_engine, vector_db.schema, vector_db.table_name, index, vector_db.distance, force=force)
+
+
+def ensure_text_index(vector_db, language: str = "portuguese") -> str:
+    """
+    Índice GIN da busca textual da recuperação híbrida (mesma expressão usada nas consultas).
+
+    language deve ser a mesma configuração de texto do HybridRetriever (RETRIEVAL_TEXT_LANGUAGE): o
+    Postgres só usa o índice quando to_tsvector recebe a mesma configuração. O padrão é "portuguese",
+    o idioma da base distribuída; com "english" as stopwords em português viram lexemas e, como os
+    termos da consulta são combinados com OR, quase todo chunk casa na busca textual.
+    """
+    name = f"{vector_db.table_name}_content_fts_{language}"
+    with vector_db.db_engine.begin() as conn:
+        conn.execute(
+            text(
+                f'CREATE INDEX IF NOT EXISTS "{name}" ON "{vector_db.schema}"."{vector_db.table_name}" '
+                f"USING gin (to_tsvector('{language}'::regconfig, content))"
+            )
+        )
+    return name
@@ -0,0 +1,204 @@
+"""
+Primitivas da ingestão incremental da base de conhecimento.
+
+Cada documento de origem é identificado pelo hash do arquivo e cada chunk pelo hash do
+seu conteúdo. O manifesto (tabela no próprio Postgres) guarda o que já foi indexado, de
+forma que só chunks novos ou alterados são embedados e chunks obsoletos são removidos.
+"""
+import datetime
+import hashlib
+from hashlib import md5
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, delete, select
+from sqlalchemy.dialects import postgresql
+
+from agno.document import Document
+
+from config.settings import KNOWLEDGE_MANIFEST_TABLE
+
+
+def list_sources(path) -> List[Path]:
+    """
+    Lista os PDFs de origem a partir de um arquivo ou diretório.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return sorted(p for p in path.glob("**/*.pdf") if p.is_file())
+    if path.is_file() and path.suffix == ".pdf":
+        return [path]
+    return []
+
+
+def source_key(path, root) -> str:
+    """
+    Chave de uma origem no manifesto: caminho relativo à raiz do corpus (absoluto se estiver fora dela).
+    """
+    path = Path(path).resolve()
+    try:
+        key = path.relative_to(Path(root).resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+    return "" if key == "." else key
+
+
+def in_scope(source: str, scope: str) -> bool:
+    """
+    Indica se a origem está sob o caminho varrido (a chave "" é a própria raiz do corpus).
+    """
+    return not scope or source == scope or source.startswith(scope.rstrip("/") + "/")
+
+
+def file_fingerprint(path: Path) -> str:
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def document_fingerprint(path: Path, config_hash: str = "") -> str:
+    """
+    Hash do arquivo combinado com a configuração do reader (sem configuração, o próprio hash do arquivo).
+    """
+    digest = file_fingerprint(path)
+    if not config_hash:
+        return digest
+    return hashlib.sha256(f"{digest}\x00{config_hash}".encode("utf-8")).hexdigest()
+
+
+def chunk_fingerprint(source: str, content: str) -> str:
+    """
+    Id determinístico de um chunk: mesma origem e mesmo conteúdo geram sempre o mesmo id.
+    """
+    return hashlib.sha256(f"{source}\x00{content}".encode("utf-8")).hexdigest()
+
+
+def read_chunks(path: Path, reader, source: Optional[str] = None) -> List[Document]:
+    """
+    Lê e divide um PDF em chunks com ids determinísticos (chunks repetidos são descartados).
+    """
+    source = source or str(path)
+    chunks: Dict[str, Document] = {}
+    for doc in reader.read(pdf=path):
+        if not doc.content or not doc.content.strip():
+            continue
+        doc.id = chunk_fingerprint(source, doc.content)
+        doc.meta_data = {**doc.meta_data, "source": source}
+        chunks.setdefault(doc.id, doc)
+    return list(chunks.values())
+
+
+def manifest_table(vector_db) -> Table:
+    return Table(
+        KNOWLEDGE_MANIFEST_TABLE,
+        MetaData(schema=vector_db.schema),
+        Column("source", String, primary_key=True),
+        Column("vector_table", String, primary_key=True),
+        Column("content_hash", String, nullable=False),
+        Column("chunk_ids", postgresql.JSONB, nullable=False),
+        Column("updated_at", DateTime(timezone=True)),
+        extend_existing=True,
+    )
+
+
+def load_manifest(vector_db) -> Dict[str, Dict]:
+    """
+    Retorna o manifesto da tabela vetorial: {source: {"content_hash": ..., "chunk_ids": [...]}}.
+    """
+    table = manifest_table(vector_db)
+    table.create(vector_db.db_engine, checkfirst=True)
+    with vector_db.Session() as sess:
+        rows = sess.execute(
+            select(table.c.source, table.c.content_hash, table.c.chunk_ids)
+            .where(table.c.vector_table == vector_db.table_name)
+        ).fetchall()
+    return {row.source: {"content_hash": row.content_hash, "chunk_ids": row.chunk_ids} for row in rows}
+
+
+def corpus_version(vector_db) -> str:
+    """
+    Identificador da versão indexada do corpus: muda sempre que algum documento é (re)ingerido ou removido.
+    """
+    manifest = load_manifest(vector_db)
+    digest = hashlib.sha256()
+    for source in sorted(manifest):
+        digest.update(f"{source}:{manifest[source]['content_hash']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def save_manifest_entry(vector_db, source: str, content_hash: str, chunk_ids: List[str]) -> None:
+    table = manifest_table(vector_db)
+    stmt = postgresql.insert(table).values(
+        source=source,
+        vector_table=vector_db.table_name,
+        content_hash=content_hash,
+        chunk_ids=chunk_ids,
+        updated_at=datetime.datetime.now(datetime.timezone.utc),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "vector_table"],
+        set_={
+            "content_hash": stmt.excluded.content_hash,
+            "chunk_ids": stmt.excluded.chunk_ids,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    with vector_db.Session() as sess, sess.begin():
+        sess.execute(stmt)
+
+
+def delete_manifest_entry(vector_db, source: str) -> None:
+    table = manifest_table(vector_db)
+    with vector_db.Session() as sess, sess.begin():
+        sess.execute(
+            delete(table).where(table.c.source == source, table.c.vector_table == vector_db.table_name)
+        )
+
+
+def clear_manifest(vector_db) -> None:
+    table = manifest_table(vector_db)
+    table.create(vector_db.db_engine, checkfirst=True)
+    with vector_db.Session() as sess, sess.begin():
+        sess.execute(delete(table).where(table.c.vector_table == vector_db.table_name))
+
+
+def upsert_chunks(vector_db, documents: List[Document], batch_size: int = 100) -> None:
+    """
+    Grava chunks já embedados preservando o id determinístico (o upsert do PgVector usa o md5 do conteúdo como id).
+    """
+    columns = set(vector_db.table.c.keys())
+    for i in range(0, len(documents), batch_size):
+        rows = []
+        for doc in documents[i : i + batch_size]:
+            content = doc.content.replace("\x00", "\ufffd")
+            row = {
+                "id": doc.id,
+                "name": doc.name,
+                "meta_data": doc.meta_data,
+                "filters": {},
+                "content": content,
+                "embedding": doc.embedding,
+                "usage": doc.usage,
+                "content_hash": md5(content.encode()).hexdigest(),
+            }
+            rows.append({key: value for key, value in row.items() if key in columns})
+
+        stmt = postgresql.insert(vector_db.table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={key: stmt.excluded[key] for key in rows[0] if key != "id"},
+        )
+        with vector_db.Session() as sess, sess.begin():
+            sess.execute(stmt)
+
+
+def delete_chunks(vector_db, chunk_ids: List[str]) -> None:
+    if not chunk_ids:
+        return
+    with vector_db.Session() as sess, sess.begin():
+        sess.execute(delete(vector_db.table).where(vector_db.table.c.id.in_(list(chunk_ids))))
@@ -0,0 +1,112 @@
+"""
+Construção da base de conhecimento (PDFs indexados no pgvector)
+"""
+from agno.knowledge.pdf import PDFKnowledgeBase, PDFReader
+from agno.vectordb.pgvector import PgVector
+
+from config.settings import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    CHUNK_STRATEGY,
+    EMBEDDING_BACKEND,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MAX_BATCH,
+    EMBEDDING_MAX_WAIT_MS,
+    EMBEDDING_MODEL_ID,
+    EMBEDDING_ONNX_FILE,
+    EMBEDDING_QUERY_CACHE_SIZE,
+    EMBEDDING_SERVICE_URL,
+    KNOWLEDGE_PATH,
+    KNOWLEDGE_TABLE,
+    PGVECTOR_DB_URL,
+)
+from src.knowledge.index import build_vector_index
+
+
+# Fábrica serializável: usada também pelos processos do pipeline de ingestão.
+# O import é feito aqui para que processos que usam o serviço remoto não carreguem torch.
+def embedder_factory():
+    from src.knowledge.embedders import SharedSentenceTransformerEmbedder
+
+    return SharedSentenceTransformerEmbedder(
+        id=EMBEDDING_MODEL_ID,
+        dimensions=EMBEDDING_DIMENSIONS,
+        backend=EMBEDDING_BACKEND,
+        onnx_file=EMBEDDING_ONNX_FILE or None,
+    )
+
+
+def build_query_embedder():
+    """
+    Embedder usado pela API: o serviço compartilhado se EMBEDDING_SERVICE_URL estiver definido, senão o modelo local.
+    """
+    if EMBEDDING_SERVICE_URL:
+        from src.knowledge.remote_embedder import RemoteEmbedder
+
+        return RemoteEmbedder(id=EMBEDDING_MODEL_ID, dimensions=EMBEDDING_DIMENSIONS, url=EMBEDDING_SERVICE_URL)
+    return embedder_factory()
+
+
+def micro_batched(embedder):
+    """
+    Envolve o embedder para agrupar consultas concorrentes em micro-lotes (com cache LRU das consultas).
+    """
+    from src.knowledge.batching import MicroBatchEmbedder
+
+    return MicroBatchEmbedder(
+        id=embedder.id,
+        dimensions=embedder.dimensions,
+        embedder=embedder,
+        max_batch=EMBEDDING_MAX_BATCH,
+        max_wait=EMBEDDING_MAX_WAIT_MS / 1000,
+        cache_size=EMBEDDING_QUERY_CACHE_SIZE,
+    )
+
+
+def build_chunking_strategy():
+    if CHUNK_STRATEGY == "section":
+        from src.knowledge.chunking import SectionChunking
+
+        return SectionChunking(chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+    if CHUNK_STRATEGY == "recursive":
+        from agno.document.chunking.recursive import RecursiveChunking
+
+        return RecursiveChunking(chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+    if CHUNK_STRATEGY == "fixed":
+        from agno.document.chunking.fixed import FixedSizeChunking
+
+        return FixedSizeChunking(chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+    raise ValueError(f"CHUNK_STRATEGY inválido: {CHUNK_STRATEGY}")
+
+
+def chunking_config() -> str:
+    """
+    Identifica a configuração de chunking: entra no fingerprint dos documentos para que uma mudança reingira tudo.
+    """
+    return f"{CHUNK_STRATEGY}:{CHUNK_SIZE}:{CHUNK_OVERLAP}"
+
+
+def build_reader() -> PDFReader:
+    return PDFReader(chunk=True, chunking_strategy=build_chunking_strategy())
+
+
+def build_vector_db(embedder=None) -> PgVector:
+    options = {}
+    # O PgVector aplica hnsw.ef_search / ivfflat.probes do índice configurado a cada busca
+    index = build_vector_index()
+    if index is not None:
+        options["vector_index"] = index
+    return PgVector(
+        table_name=KNOWLEDGE_TABLE,
+        db_url=PGVECTOR_DB_URL,
+        embedder=embedder or embedder_factory(),
+        **options,
+    )
+
+
+def build_knowledge_base(embedder=None) -> PDFKnowledgeBase:
+    return PDFKnowledgeBase(
+        path=KNOWLEDGE_PATH,
+        vector_db=build_vector_db(embedder),
+        reader=build_reader(),
+    )
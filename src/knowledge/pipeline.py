@@ -0,0 +1,177 @@
+"""
+Pipeline de ingestão offline da base de conhecimento.
+
+Executado fora do processo da API (ver run_ingest.py): lê e divide os PDFs e gera os
+embeddings em paralelo num pool de processos, gravando no pgvector em lotes.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from agno.document import Document
+
+from config.settings import KNOWLEDGE_ROOT
+from src.knowledge.ingestion import (
+    clear_manifest,
+    delete_chunks,
+    delete_manifest_entry,
+    document_fingerprint,
+    in_scope,
+    list_sources,
+    load_manifest,
+    read_chunks,
+    save_manifest_entry,
+    source_key,
+    upsert_chunks,
+)
+
+# Estado de cada processo do pool (o modelo é carregado uma única vez por processo)
+_worker_reader = None
+_worker_embedder = None
+
+
+def _init_worker(reader, embedder_factory, torch_threads: int) -> None:
+    global _worker_reader, _worker_embedder
+
+    # Evita que cada processo tente usar todos os núcleos
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    _worker_reader = reader
+    _worker_embedder = embedder_factory()
+
+
+def _read_source(path: Path, source: str) -> Dict:
+    chunks = read_chunks(path, _worker_reader, source)
+    pages = {doc.meta_data.get("page") for doc in chunks}
+    return {"source": source, "chunks": chunks, "pages": len(pages)}
+
+
+def _embed_batch(texts: List[str]) -> List[List[float]]:
+    return _worker_embedder.get_embeddings(texts)
+
+
+def ingest_corpus(
+    vector_db,
+    reader,
+    embedder_factory,
+    path,
+    workers: Optional[int] = None,
+    batch_size: int = 256,
+    embed_batch_size: int = 64,
+    full: bool = False,
+    config_hash: str = "",
+    root=None,
+) -> Dict[str, float]:
+    """
+    Ingere todos os PDFs de um diretório (ou um único PDF) de forma incremental.
+
+    Args:
+        vector_db: PgVector de destino.
+        reader: Reader usado para ler e dividir os PDFs.
+        embedder_factory: Função (serializável) que cria o embedder em cada processo.
+        path: Arquivo ou diretório de PDFs.
+        workers (int): Número de processos do pool.
+        batch_size (int): Tamanho dos lotes de escrita no pgvector.
+        embed_batch_size (int): Número de chunks por tarefa de embedding.
+        full (bool): Descarta o índice atual e reingere tudo.
+        config_hash (str): Configuração do reader (ex.: chunking); documentos indexados com outra são reingeridos.
+        root: Raiz do corpus (padrão: KNOWLEDGE_ROOT); as origens do manifesto são relativas a ela e
+            só as que estão sob path e não existem mais são removidas.
+
+    Returns:
+        dict: Contadores e vazão (páginas/s, chunks/s, embeddings/s).
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    if full and vector_db.table_exists():
+        vector_db.drop()
+
+    if not vector_db.table_exists():
+        vector_db.create()
+        clear_manifest(vector_db)
+
+    manifest = load_manifest(vector_db)
+    if not manifest and vector_db.get_count() > 0:
+        vector_db.delete()
+
+    root = root or KNOWLEDGE_ROOT
+    sources = list_sources(path)
+    keys = {p: source_key(p, root) for p in sources}
+    hashes = {keys[p]: document_fingerprint(p, config_hash) for p in sources}
+    changed = [p for p in sources if manifest.get(keys[p], {}).get("content_hash") != hashes[keys[p]]]
+
+    stats = {
+        "documents": len(sources),
+        "changed_documents": len(changed),
+        "pages": 0,
+        "chunks": 0,
+        "embeddings": 0,
+        "deleted": 0,
+    }
+
+    if changed:
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(reader, embedder_factory, torch_threads),
+        ) as pool:
+            # Etapa 1: leitura e divisão dos documentos alterados
+            read_results = list(pool.map(_read_source, changed, [keys[p] for p in changed]))
+
+            pending: List[Document] = []
+            for result in read_results:
+                known_ids = set(manifest.get(result["source"], {}).get("chunk_ids", []))
+                stats["pages"] += result["pages"]
+                stats["chunks"] += len(result["chunks"])
+                pending.extend(doc for doc in result["chunks"] if doc.id not in known_ids)
+
+            # Etapa 2: embeddings em paralelo, gravando cada lote assim que fica pronto
+            futures = {}
+            for i in range(0, len(pending), embed_batch_size):
+                batch = pending[i : i + embed_batch_size]
+                futures[pool.submit(_embed_batch, [doc.content for doc in batch])] = batch
+
+            to_write: List[Document] = []
+            for future in as_completed(futures):
+                batch = futures[future]
+                for doc, embedding in zip(batch, future.result()):
+                    doc.embedding = embedding
+                to_write.extend(batch)
+                stats["embeddings"] += len(batch)
+                if len(to_write) >= batch_size:
+                    upsert_chunks(vector_db, to_write, batch_size=batch_size)
+                    to_write = []
+            upsert_chunks(vector_db, to_write, batch_size=batch_size)
+
+        # Etapa 3: remoção de chunks obsoletos e atualização do manifesto
+        for result in read_results:
+            source = result["source"]
+            chunk_ids = [doc.id for doc in result["chunks"]]
+            stale_ids = set(manifest.get(source, {}).get("chunk_ids", [])) - set(chunk_ids)
+            delete_chunks(vector_db, list(stale_ids))
+            save_manifest_entry(vector_db, source, hashes[source], chunk_ids)
+            stats["deleted"] += len(stale_ids)
+
+    # Só origens sob o caminho varrido: ingerir um arquivo ou subdiretório não apaga o resto do corpus
+    scope = source_key(path, root)
+    for source, entry in manifest.items():
+        if source not in hashes and in_scope(source, scope):
+            delete_chunks(vector_db, entry["chunk_ids"])
+            delete_manifest_entry(vector_db, source)
+            stats["deleted"] += len(entry["chunk_ids"])
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    stats["seconds"] = elapsed
+    stats["pages_per_second"] = stats["pages"] / elapsed
+    stats["chunks_per_second"] = stats["chunks"] / elapsed
+    stats["embeddings_per_second"] = stats["embeddings"] / elapsed
+    return stats
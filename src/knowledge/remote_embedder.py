@@ -0,0 +1,46 @@
+"""
+Embedder que delega ao serviço de embeddings compartilhado (ver src/knowledge/embedding_service.py).
+
+Com vários workers da API na mesma máquina, o modelo sentence-transformers fica carregado apenas
+no processo do serviço; os workers não importam torch nem carregam os pesos do modelo.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import httpx
+from agno.embedder.base import Embedder
+
+
+@dataclass
+class RemoteEmbedder(Embedder):
+    id: Optional[str] = None
+    url: str = "http://127.0.0.1:8001"
+    timeout: float = 30.0
+    _client: Optional[httpx.Client] = field(default=None, repr=False, compare=False)
+
+    @property
+    def client(self) -> httpx.Client:
+        # httpx.Client é thread-safe e mantém as conexões abertas
+        if self._client is None:
+            self._client = httpx.Client(base_url=self.url, timeout=self.timeout)
+        return self._client
+
+    def health(self) -> Dict:
+        response = self.client.get("/health")
+        response.raise_for_status()
+        return response.json()
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        response = self.client.post("/embed", json={"texts": texts})
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+    def get_embedding(self, text: Union[str, List[str]]) -> List[float]:
+        if isinstance(text, list):
+            return self.get_embeddings(text)
+        return self.get_embeddings([text])[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
@@ -0,0 +1,166 @@
+"""
+Recuperação híbrida da base de conhecimento para o helper_agent.
+
+Perguntas sobre políticas costumam depender de termos exatos (nomes de políticas, números) que a
+busca vetorial sozinha perde. O HybridRetriever combina a busca textual do Postgres (full-text sobre
+o conteúdo dos chunks) com a busca do pgvector, funde as duas listas por Reciprocal Rank Fusion e,
+opcionalmente, reordena os melhores candidatos com um cross-encoder pequeno em CPU.
+"""
+import asyncio
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from agno.document import Document
+from sqlalchemy import text
+
+from src.knowledge.context import ContextAssembler
+from src.metrics import metrics
+
+_TSQUERY_TOKEN = re.compile(r"'(?:[^']|'')*'")
+
+
+class CrossEncoderReranker:
+    """
+    Reordena (consulta, chunk) com um cross-encoder do sentence-transformers; o modelo é carregado uma única vez.
+    """
+
+    def __init__(self, model_id: str, batch_size: int = 16):
+        self.model_id = model_id
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    def get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    self._model = CrossEncoder(self.model_id, device="cpu")
+        return self._model
+
+    def rerank(self, query: str, documents: List[Document]) -> List[Document]:
+        if len(documents) < 2:
+            return documents
+        scores = self.get_model().predict([(query, doc.content) for doc in documents], batch_size=self.batch_size)
+        ranked = sorted(zip(documents, scores), key=lambda item: float(item[1]), reverse=True)
+        for doc, score in ranked:
+            doc.meta_data = {**doc.meta_data, "rerank_score": round(float(score), 4)}
+        return [doc for doc, _ in ranked]
+
+
+class HybridRetriever:
+    def __init__(
+        self,
+        vector_db,
+        mode: str = "hybrid",
+        num_documents: int = 5,
+        candidates: int = 20,
+        rrf_k: int = 60,
+        language: str = "portuguese",
+        reranker: Optional[CrossEncoderReranker] = None,
+        assembler: Optional[ContextAssembler] = None,
+    ):
+        self.vector_db = vector_db
+        self.mode = mode
+        self.num_documents = num_documents
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        if not re.fullmatch(r"[a-z_]+", language):
+            raise ValueError(f"RETRIEVAL_TEXT_LANGUAGE inválido: {language}")
+        self.language = language
+        self.reranker = reranker
+        self.assembler = assembler
+
+    def _key(self, doc: Document) -> str:
+        return doc.id or doc.content
+
+    def lexical_search(self, query: str, limit: int) -> List[Document]:
+        """
+        Busca textual do Postgres; os termos da consulta são combinados com OU e ordenados por ts_rank_cd.
+        """
+        # A configuração vai literal na consulta para que o planner use o índice GIN (ver ensure_text_index)
+        tsvector = f"to_tsvector('{self.language}'::regconfig, content)"
+        with self.vector_db.Session() as sess:
+            # plainto_tsquery normaliza os termos (stemming, stopwords); trocar & por | evita exigir todos eles
+            terms = sess.execute(
+                text(f"SELECT plainto_tsquery('{self.language}'::regconfig, :query)::text"), {"query": query}
+            ).scalar()
+            if not terms:
+                return []
+
+            tsquery = " | ".join(_TSQUERY_TOKEN.findall(terms))
+            rows = sess.execute(
+                text(
+                    f"""
+                    SELECT id, name, meta_data, content,
+                           ts_rank_cd({tsvector}, to_tsquery('{self.language}'::regconfig, :tsquery)) AS rank
+                    FROM "{self.vector_db.schema}"."{self.vector_db.table_name}"
+                    WHERE {tsvector} @@ to_tsquery('{self.language}'::regconfig, :tsquery)
+                    ORDER BY rank DESC
+                    LIMIT :limit
+                    """
+                ),
+                {"tsquery": tsquery, "limit": limit},
+            ).fetchall()
+
+        return [Document(id=row.id, name=row.name, meta_data=row.meta_data or {}, content=row.content) for row in rows]
+
+    def vector_search(self, query: str, limit: int) -> List[Document]:
+        return self.vector_db.vector_search(query=query, limit=limit)
+
+    def fuse(self, rankings: List[List[Document]]) -> List[Document]:
+        """
+        Reciprocal Rank Fusion: cada lista contribui 1 / (rrf_k + posição) para a pontuação do chunk.
+        """
+        scores: Dict[str, float] = {}
+        documents: Dict[str, Document] = {}
+        for ranking in rankings:
+            for position, doc in enumerate(ranking, start=1):
+                key = self._key(doc)
+                scores[key] = scores.get(key, 0.0) + 1.0 / (self.rrf_k + position)
+                documents.setdefault(key, doc)
+
+        ordered = sorted(scores, key=scores.get, reverse=True)
+        for key in ordered:
+            documents[key].meta_data = {**documents[key].meta_data, "fusion_score": round(scores[key], 5)}
+        return [documents[key] for key in ordered]
+
+    def search(self, query: str, num_documents: Optional[int] = None) -> List[Document]:
+        num_documents = num_documents or self.num_documents
+        limit = max(self.candidates, num_documents)
+        started = time.perf_counter()
+
+        if self.mode == "hybrid":
+            vector_results = self.vector_search(query, limit)
+            lexical_results = self.lexical_search(query, limit)
+            metrics.observe("retrieval.lexical_hits", len(lexical_results))
+            results = self.fuse([vector_results, lexical_results])
+        else:
+            results = self.vector_search(query, limit if self.reranker is not None else num_documents)
+
+        if self.reranker is not None:
+            with metrics.timer("retrieval.rerank_seconds"):
+                results = self.reranker.rerank(query, results[:limit])
+
+        metrics.observe("retrieval.seconds", time.perf_counter() - started)
+        return results[:num_documents]
+
+    def retrieve(self, query: str, num_documents: Optional[int] = None) -> List[Dict]:
+        """
+        Documentos no formato de referências do agno; com o assembler, o contexto é deduplicado
+        e limitado ao orçamento de tokens.
+        """
+        documents = self.search(query, num_documents)
+        if self.assembler is None:
+            return [doc.to_dict() for doc in documents]
+        return self.assembler.to_references(self.assembler.assemble(documents))
+
+    async def __call__(self, query: str, num_documents: Optional[int] = None, **kwargs) -> List[Dict]:
+        """
+        Interface de retriever do Agent do agno (ferramenta search_knowledge_base no arun, que aguarda o resultado).
+        A busca (embedding da consulta, consultas ao Postgres e reordenação) roda numa thread, fora do event loop.
+        """
+        return await asyncio.to_thread(self.retrieve, query, num_documents)
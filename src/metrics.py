@@ -0,0 +1,76 @@
+"""
+Métricas em memória do processo (contadores e histogramas com percentis)
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict
+
+
+class Metrics:
+    def __init__(self, window: int = 2048):
+        self._window = window
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Registra um valor no histograma (mantém apenas as últimas observações da janela).
+        """
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = deque(maxlen=self._window)
+            self._histograms[name].append(value)
+
+    @contextmanager
+    def timer(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def counter(self, name: str) -> float:
+        return self._counters.get(name, 0)
+
+    def ratio(self, numerator: str, denominator_names) -> float:
+        total = sum(self.counter(name) for name in denominator_names)
+        return self.counter(numerator) / total if total else 0.0
+
+    @staticmethod
+    def _percentile(values, percent: float) -> float:
+        index = min(len(values) - 1, max(0, round(percent / 100 * (len(values) - 1))))
+        return values[index]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {name: sorted(values) for name, values in self._histograms.items()}
+
+        summary = {}
+        for name, values in histograms.items():
+            if not values:
+                continue
+            summary[name] = {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": self._percentile(values, 50),
+                "p95": self._percentile(values, 95),
+                "p99": self._percentile(values, 99),
+                "max": values[-1],
+            }
+        return {"counters": counters, "histograms": summary}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics = Metrics()
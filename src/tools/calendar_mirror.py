@@ -0,0 +1,523 @@
+"""
+Espelho local dos eventos do Google Calendar de cada usuário.
+
+get_calendar_events e a verificação de conflitos do create_calendar_event consultavam a API a cada
+chamada. Aqui os eventos de cada usuário ficam numa tabela SQLite (compartilhada pelos workers da
+máquina), indexada pelo início do evento, e as leituras viram consultas de intervalo locais. O espelho
+é mantido com a sincronização incremental da API (syncToken): a primeira sincronização baixa os
+eventos a partir de past_days dias atrás e as seguintes trazem apenas o que mudou desde a anterior.
+Quando a API invalida o token (410 Gone) o espelho do usuário é refeito do zero. O título (em
+minúsculas) e os participantes de cada evento também são indexados, para que edit_calendar_event e
+delete_calendar_event encontrem o evento alvo numa única consulta local (find).
+
+A sincronização incremental acontece na leitura, quando o espelho tem mais de max_staleness segundos.
+Com webhook_url configurada, um canal de notificações (events.watch) marca o espelho como desatualizado
+assim que o calendário muda, e o intervalo entre sincronizações pode ser maior (webhook_staleness).
+"""
+import datetime as dt
+import json
+import secrets
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import (
+    CALENDAR_MIRROR_DB_PATH,
+    CALENDAR_MIRROR_ENABLED,
+    CALENDAR_MIRROR_MAX_STALENESS,
+    CALENDAR_MIRROR_PAST_DAYS,
+    CALENDAR_WEBHOOK_STALENESS,
+    CALENDAR_WEBHOOK_TTL,
+    CALENDAR_WEBHOOK_URL,
+)
+from src.db.pool import SQLitePool
+from src.metrics import metrics
+
+# Fuso usado para datas sem fuso e eventos de dia inteiro (o mesmo de _with_timezone)
+CALENDAR_TIMEZONE = dt.timezone(dt.timedelta(hours=-3))
+
+
+def to_timestamp(value: str) -> float:
+    """
+    Data RFC3339 (ou ISO sem fuso, tratada como horário de São Paulo) em segundos desde a época.
+    """
+    parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=CALENDAR_TIMEZONE)
+    return parsed.timestamp()
+
+
+def to_rfc3339(timestamp: float) -> str:
+    return dt.datetime.fromtimestamp(timestamp, tz=dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def event_bounds(event: Dict) -> Tuple[float, float]:
+    """
+    Início e fim do evento; eventos de dia inteiro (start.date) ocupam os dias inteiros no fuso do calendário.
+    """
+    bounds = []
+    for key in ("start", "end"):
+        value = event.get(key, {})
+        bounds.append(to_timestamp(value.get("dateTime") or value["date"]))
+    return bounds[0], bounds[1]
+
+
+def event_emails(event: Dict) -> List[str]:
+    emails = {attendee.get("email", "").lower() for attendee in event.get("attendees", [])}
+    emails.add(event.get("organizer", {}).get("email", "").lower())
+    emails.discard("")
+    return sorted(emails)
+
+
+def _status(error) -> int:
+    return int(getattr(getattr(error, "resp", None), "status", 0) or 0)
+
+
+class CalendarMirror:
+    def __init__(
+        self,
+        pool: SQLitePool,
+        max_staleness: float = 30,
+        past_days: int = 30,
+        page_size: int = 250,
+        webhook_url: str = "",
+        webhook_staleness: float = 600,
+        channel_ttl: int = 604800,
+    ):
+        self.pool = pool
+        self.max_staleness = max_staleness
+        self.past_days = past_days
+        self.page_size = page_size
+        self.webhook_url = webhook_url
+        self.webhook_staleness = webhook_staleness
+        self.channel_ttl = channel_ttl
+
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        # Falhas ao criar o canal de notificações: nova tentativa só depois de uma hora
+        self._watch_failed: Dict[str, float] = {}
+        self._schema_ready = False
+        # Chamados com (dono, id do evento) para cada exclusão vista numa sincronização
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    def _ensure_schema(self) -> None:
+        if self._schema_ready:
+            return
+        with self.pool.connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS calendar_events (
+                    owner TEXT NOT NULL,
+                    event_id TEXT NOT NULL,
+                    start_ts REAL NOT NULL,
+                    end_ts REAL NOT NULL,
+                    summary TEXT NOT NULL DEFAULT '',
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (owner, event_id)
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(calendar_events)")}
+            if "summary" not in columns:
+                # Espelho criado antes do índice de busca: a coluna é adicionada e tudo é sincronizado de novo
+                conn.execute("ALTER TABLE calendar_events ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+                conn.execute("DROP TABLE IF EXISTS calendar_sync")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_calendar_events_start ON calendar_events (owner, start_ts)")
+            # Participantes (e organizador) de cada evento, para a busca por email
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS calendar_attendees (
+                    owner TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    event_id TEXT NOT NULL,
+                    PRIMARY KEY (owner, email, event_id)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_calendar_attendees_event ON calendar_attendees (owner, event_id)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS calendar_sync (
+                    owner TEXT PRIMARY KEY,
+                    sync_token TEXT,
+                    window_start REAL NOT NULL,
+                    synced_at REAL NOT NULL,
+                    dirty INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS calendar_channels (
+                    channel_id TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    token TEXT NOT NULL,
+                    resource_id TEXT,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+        self._schema_ready = True
+
+    def _owner_lock(self, owner: str) -> threading.Lock:
+        with self._lock:
+            if owner not in self._locks:
+                self._locks[owner] = threading.Lock()
+            return self._locks[owner]
+
+    def _state(self, owner: str) -> Optional[Tuple]:
+        """
+        (sync_token, window_start, synced_at, dirty, expiração do canal de notificações mais longo)
+        """
+        with self.pool.connection() as conn:
+            return conn.execute(
+                """
+                SELECT s.sync_token, s.window_start, s.synced_at, s.dirty,
+                       (SELECT MAX(expires_at) FROM calendar_channels c WHERE c.owner = s.owner)
+                FROM calendar_sync s WHERE s.owner = ?
+                """,
+                (owner,),
+            ).fetchone()
+
+    def _is_fresh(self, state: Optional[Tuple], now: float) -> bool:
+        if state is None or state[0] is None or state[3]:
+            return False
+        watched = state[4] is not None and state[4] > now
+        return now - state[2] < (self.webhook_staleness if watched else self.max_staleness)
+
+    def _fetch(self, service, **params) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Todas as páginas de events.list; retorna os eventos e o nextSyncToken da última página.
+        """
+        items: List[Dict] = []
+        page_token = None
+        while True:
+            result = (
+                service.events()
+                .list(
+                    calendarId="primary",
+                    singleEvents=True,
+                    showDeleted=True,
+                    maxResults=self.page_size,
+                    pageToken=page_token,
+                    **params,
+                )
+                .execute()
+            )
+            items.extend(result.get("items", []))
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return items, result.get("nextSyncToken")
+
+    @staticmethod
+    def _delete(conn, owner: str, event_id: str) -> None:
+        conn.execute("DELETE FROM calendar_events WHERE owner = ? AND event_id = ?", (owner, event_id))
+        conn.execute("DELETE FROM calendar_attendees WHERE owner = ? AND event_id = ?", (owner, event_id))
+
+    @classmethod
+    def _write(cls, conn, owner: str, events: List[Dict]) -> List[str]:
+        """
+        Grava os eventos (os cancelados são removidos); retorna os ids removidos.
+        """
+        removed = []
+        for event in events:
+            cls._delete(conn, owner, event["id"])
+            if event.get("status") == "cancelled":
+                removed.append(event["id"])
+                continue
+            start_ts, end_ts = event_bounds(event)
+            conn.execute(
+                "INSERT INTO calendar_events (owner, event_id, start_ts, end_ts, summary, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (owner, event["id"], start_ts, end_ts, event.get("summary", "").lower(), json.dumps(event, ensure_ascii=False)),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO calendar_attendees (owner, email, event_id) VALUES (?, ?, ?)",
+                [(owner, email, event["id"]) for email in event_emails(event)],
+            )
+        return removed
+
+    def add_listener(self, listener: Callable[[str, str], None]) -> None:
+        self._listeners.append(listener)
+
+    def _notify_removed(self, owner: str, event_ids) -> None:
+        for event_id in event_ids:
+            for listener in self._listeners:
+                listener(owner, event_id)
+
+    def _full_sync(self, owner: str, service) -> None:
+        window_start = time.time() - self.past_days * 86400
+        with metrics.timer("calendar_mirror.full_sync_seconds"):
+            events, sync_token = self._fetch(service, timeMin=to_rfc3339(window_start))
+
+        with self.pool.connection() as conn:
+            previous = {row[0] for row in conn.execute("SELECT event_id FROM calendar_events WHERE owner = ?", (owner,))}
+            conn.execute("DELETE FROM calendar_events WHERE owner = ?", (owner,))
+            conn.execute("DELETE FROM calendar_attendees WHERE owner = ?", (owner,))
+            self._write(conn, owner, events)
+            conn.execute(
+                "INSERT OR REPLACE INTO calendar_sync (owner, sync_token, window_start, synced_at, dirty) VALUES (?, ?, ?, ?, 0)",
+                (owner, sync_token, window_start, time.time()),
+            )
+        self._notify_removed(owner, previous - {event["id"] for event in events if event.get("status") != "cancelled"})
+        metrics.increment("calendar_mirror.full_sync")
+
+    def _incremental_sync(self, owner: str, service, sync_token: str) -> None:
+        with metrics.timer("calendar_mirror.sync_seconds"):
+            events, next_token = self._fetch(service, syncToken=sync_token)
+
+        with self.pool.connection() as conn:
+            removed = self._write(conn, owner, events)
+            conn.execute(
+                "UPDATE calendar_sync SET sync_token = ?, synced_at = ? WHERE owner = ?",
+                (next_token or sync_token, time.time(), owner),
+            )
+        self._notify_removed(owner, removed)
+        metrics.increment("calendar_mirror.changes", len(events))
+
+    def sync(self, owner: str, service, full: bool = False) -> None:
+        """
+        Traz o espelho do usuário para o estado atual do calendário (incremental sempre que possível).
+        """
+        self._ensure_schema()
+        with self._owner_lock(owner):
+            state = self._state(owner)
+            # Notificações recebidas durante a sincronização voltam a marcar o espelho
+            with self.pool.connection() as conn:
+                conn.execute("UPDATE calendar_sync SET dirty = 0 WHERE owner = ?", (owner,))
+            try:
+                if full or state is None or state[0] is None:
+                    self._full_sync(owner, service)
+                else:
+                    try:
+                        self._incremental_sync(owner, service, state[0])
+                    except Exception as e:
+                        if _status(e) != 410:
+                            raise
+                        # Token expirado ou invalidado pela API: sincronização completa
+                        self._full_sync(owner, service)
+            except Exception:
+                self.invalidate(owner)
+                raise
+
+            self._ensure_channel(owner, service)
+
+    def _fresh_state(self, owner: str, service_factory: Callable) -> Optional[Tuple]:
+        """
+        Estado do espelho do usuário, sincronizando antes se estiver desatualizado.
+        """
+        self._ensure_schema()
+        state = self._state(owner)
+        if self._is_fresh(state, time.time()):
+            metrics.increment("calendar_mirror.fresh")
+            return state
+        self.sync(owner, service_factory())
+        metrics.increment("calendar_mirror.stale")
+        return self._state(owner)
+
+    def events(self, owner: str, service_factory: Callable, time_min: str, time_max: str) -> Optional[List[Dict]]:
+        """
+        Eventos que se sobrepõem a [time_min, time_max), ordenados pelo início. Sincroniza antes se o
+        espelho estiver desatualizado; retorna None quando a janela começa antes do trecho espelhado.
+        """
+        min_ts, max_ts = to_timestamp(time_min), to_timestamp(time_max)
+        state = self._fresh_state(owner, service_factory)
+        if state is None or min_ts < state[1]:
+            metrics.increment("calendar_mirror.out_of_window")
+            return None
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT data FROM calendar_events
+                WHERE owner = ? AND start_ts < ? AND end_ts > ?
+                ORDER BY start_ts, event_id
+                """,
+                (owner, max_ts, min_ts),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def find(
+        self,
+        owner: str,
+        service_factory: Callable,
+        summary: Optional[str] = None,
+        attendee: Optional[str] = None,
+        time_min: Optional[str] = None,
+        time_max: Optional[str] = None,
+        limit: int = 50,
+    ) -> Optional[List[Dict]]:
+        """
+        Eventos do espelho cujo título contém summary, com attendee entre os participantes e que se sobrepõem
+        à janela (critérios ausentes não filtram), ordenados pelo início. None quando a janela começa antes
+        do trecho espelhado.
+        """
+        state = self._fresh_state(owner, service_factory)
+        min_ts = to_timestamp(time_min) if time_min else None
+        if state is None or (min_ts is not None and min_ts < state[1]):
+            metrics.increment("calendar_mirror.out_of_window")
+            return None
+
+        conditions, params = ["e.owner = ?"], [owner]
+        if attendee:
+            conditions.append(
+                "e.event_id IN (SELECT event_id FROM calendar_attendees WHERE owner = ? AND email = ?)"
+            )
+            params += [owner, attendee.lower()]
+        if summary:
+            conditions.append("instr(e.summary, ?) > 0")
+            params.append(summary.lower())
+        if time_max:
+            conditions.append("e.start_ts < ?")
+            params.append(to_timestamp(time_max))
+        if min_ts is not None:
+            conditions.append("e.end_ts > ?")
+            params.append(min_ts)
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT e.data FROM calendar_events e WHERE {' AND '.join(conditions)} "
+                "ORDER BY e.start_ts, e.event_id LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get(self, owner: str, service_factory: Callable, event_id: str) -> Optional[Dict]:
+        """
+        Evento pelo id (sincronizando antes se o espelho estiver desatualizado); None se não estiver no espelho.
+        """
+        self._fresh_state(owner, service_factory)
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM calendar_events WHERE owner = ? AND event_id = ?", (owner, event_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def apply(self, owner: str, event: Dict) -> None:
+        """
+        Grava no espelho um evento criado ou editado pelas ferramentas (visível antes da próxima sincronização).
+        """
+        self._ensure_schema()
+        with self.pool.connection() as conn:
+            self._write(conn, owner, [event])
+
+    def remove(self, owner: str, event_id: str) -> None:
+        self._ensure_schema()
+        with self.pool.connection() as conn:
+            self._delete(conn, owner, event_id)
+
+    def invalidate(self, owner: str) -> None:
+        """
+        Força uma sincronização na próxima leitura.
+        """
+        self._ensure_schema()
+        with self.pool.connection() as conn:
+            conn.execute("UPDATE calendar_sync SET dirty = 1 WHERE owner = ?", (owner,))
+
+    def forget(self, owner: str) -> None:
+        """
+        Descarta o espelho e os canais do usuário (ex.: autenticação do calendário resetada).
+        """
+        self._ensure_schema()
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM calendar_events WHERE owner = ?", (owner,))
+            conn.execute("DELETE FROM calendar_attendees WHERE owner = ?", (owner,))
+            conn.execute("DELETE FROM calendar_sync WHERE owner = ?", (owner,))
+            conn.execute("DELETE FROM calendar_channels WHERE owner = ?", (owner,))
+
+    def _ensure_channel(self, owner: str, service) -> None:
+        """
+        Cria (ou renova, perto de expirar) o canal de notificações do calendário do usuário.
+        """
+        if not self.webhook_url:
+            return
+        now = time.time()
+        if now - self._watch_failed.get(owner, 0.0) < 3600:
+            return
+
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM calendar_channels WHERE expires_at <= ?", (now,))
+            expires_at = conn.execute(
+                "SELECT MAX(expires_at) FROM calendar_channels WHERE owner = ?", (owner,)
+            ).fetchone()[0]
+        if expires_at is not None and expires_at - now > 3600:
+            return
+
+        channel_id, token = uuid.uuid4().hex, secrets.token_hex(16)
+        try:
+            response = (
+                service.events()
+                .watch(
+                    calendarId="primary",
+                    body={
+                        "id": channel_id,
+                        "type": "web_hook",
+                        "address": self.webhook_url,
+                        "token": token,
+                        "params": {"ttl": str(self.channel_ttl)},
+                    },
+                )
+                .execute()
+            )
+        except Exception as e:
+            self._watch_failed[owner] = now
+            print(f"Erro ao criar o canal de notificações do calendário ({owner}): {e}")
+            return
+
+        expiration = float(response.get("expiration") or (now + self.channel_ttl) * 1000) / 1000
+        with self.pool.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO calendar_channels (channel_id, owner, token, resource_id, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (channel_id, owner, token, response.get("resourceId"), expiration),
+            )
+
+    def notify(self, channel_id: str, token: str, resource_state: str = "exists") -> bool:
+        """
+        Notificação do Google (POST no webhook): marca o espelho do dono do canal como desatualizado.
+        Retorna False para canais desconhecidos ou com token errado.
+        """
+        self._ensure_schema()
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT owner, token FROM calendar_channels WHERE channel_id = ? AND expires_at > ?",
+                (channel_id, time.time()),
+            ).fetchone()
+        if row is None or not secrets.compare_digest(row[1], token or ""):
+            return False
+        # "sync" é a mensagem inicial de confirmação do canal; não indica mudança
+        if resource_state != "sync":
+            self.invalidate(row[0])
+            metrics.increment("calendar_mirror.notifications")
+        return True
+
+
+def build_calendar_mirror(
+    enabled: bool,
+    db_path: str,
+    max_staleness: float,
+    past_days: int,
+    webhook_url: str = "",
+    webhook_staleness: float = 600,
+    channel_ttl: int = 604800,
+) -> Optional[CalendarMirror]:
+    if not enabled:
+        return None
+    return CalendarMirror(
+        SQLitePool(db_path),
+        max_staleness=max_staleness,
+        past_days=past_days,
+        webhook_url=webhook_url,
+        webhook_staleness=webhook_staleness,
+        channel_ttl=channel_ttl,
+    )
+
+
+calendar_mirror = build_calendar_mirror(
+    CALENDAR_MIRROR_ENABLED,
+    CALENDAR_MIRROR_DB_PATH,
+    max_staleness=CALENDAR_MIRROR_MAX_STALENESS,
+    past_days=CALENDAR_MIRROR_PAST_DAYS,
+    webhook_url=CALENDAR_WEBHOOK_URL,
+    webhook_staleness=CALENDAR_WEBHOOK_STALENESS,
+    channel_ttl=CALENDAR_WEBHOOK_TTL,
+)
@@ -0,0 +1,210 @@
+"""
+Clientes do Google Calendar reaproveitados entre chamadas de ferramentas.
+
+Antes cada ferramenta lia o token do disco e chamava build("calendar", "v3"), reprocessando o
+documento de descoberta a cada chamada. Aqui as credenciais ficam em cache por usuário (e são
+renovadas em segundo plano antes de expirar), o documento de descoberta é carregado uma única vez
+e cada thread mantém seu próprio serviço com conexão HTTP persistente (httplib2 não é thread-safe).
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import timezone
+from typing import Dict, Optional, Tuple
+
+import httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+# Google Calendar API scopes para diferentes permissões
+CALENDAR_SCOPES = {
+    "readonly": ["https://www.googleapis.com/auth/calendar.readonly"],
+    "read_update": ["https://www.googleapis.com/auth/calendar.events"],
+    "full_access": ["https://www.googleapis.com/auth/calendar"]
+}
+
+DEFAULT_TOKEN_PATH = "auth/token.json"
+
+# Usuário da requisição atual: (email, nível de permissão). Definido pelo bot antes de chamar os agentes;
+# as ferramentas rodam em threads (asyncio.to_thread), que herdam o contexto da requisição.
+current_calendar_user: ContextVar[Optional[Tuple[str, str]]] = ContextVar("current_calendar_user", default=None)
+
+
+def set_calendar_user(email: Optional[str], permission_level: str = "full_access") -> None:
+    current_calendar_user.set((email, permission_level) if email else None)
+
+
+def user_token_path(email: str, permission_level: str) -> str:
+    return f"auth/tokens/{email}_{permission_level}_token.json"
+
+
+class CalendarServicePool:
+    def __init__(self, refresh_margin: float = 300, refresh_interval: float = 60, services_per_thread: int = 32, http_timeout: float = 30):
+        self.refresh_margin = refresh_margin
+        self.refresh_interval = refresh_interval
+        self.services_per_thread = services_per_thread
+        self.http_timeout = http_timeout
+
+        # token_path -> (credenciais, mtime do arquivo quando foram carregadas)
+        self._credentials: Dict[str, Tuple[Credentials, float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._discovery_doc = None
+        self._refresher: Optional[threading.Thread] = None
+
+    def _key_lock(self, token_path: str) -> threading.Lock:
+        with self._lock:
+            if token_path not in self._locks:
+                self._locks[token_path] = threading.Lock()
+            return self._locks[token_path]
+
+    @staticmethod
+    def _resolve() -> Tuple[str, list]:
+        """
+        Token do usuário da requisição atual (com os escopos da sua permissão); sem ele, o token padrão.
+        """
+        user = current_calendar_user.get()
+        if user is not None:
+            email, permission_level = user
+            token_path = user_token_path(email, permission_level)
+            if os.path.exists(token_path):
+                return token_path, CALENDAR_SCOPES.get(permission_level, CALENDAR_SCOPES["full_access"])
+        return DEFAULT_TOKEN_PATH, CALENDAR_SCOPES["full_access"]
+
+    def owner(self) -> str:
+        """
+        Dono do calendário usado pelo usuário atual (chave do espelho local): o email ou "default".
+        """
+        token_path, _ = self._resolve()
+        if token_path == DEFAULT_TOKEN_PATH:
+            return "default"
+        return current_calendar_user.get()[0]
+
+    @staticmethod
+    def _mtime(token_path: str) -> float:
+        try:
+            return os.path.getmtime(token_path)
+        except OSError:
+            return 0.0
+
+    @staticmethod
+    def _save(token_path: str, creds: Credentials) -> None:
+        with open(token_path, "w") as token:
+            token.write(creds.to_json())
+
+    def _needs_refresh(self, creds: Credentials) -> bool:
+        if not creds.valid:
+            return True
+        # expiry do google-auth é um datetime UTC sem fuso
+        return creds.expiry is not None and (creds.expiry.replace(tzinfo=timezone.utc).timestamp() - time.time()) < self.refresh_margin
+
+    def _load(self, token_path: str, scopes: list) -> Credentials:
+        creds = None
+        if os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, scopes)
+
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file("config/credentials.json", scopes)
+                creds = flow.run_local_server(port=0)
+            self._save(token_path, creds)
+
+        return creds
+
+    def credentials(self) -> Credentials:
+        token_path, scopes = self._resolve()
+        self._ensure_refresher()
+
+        cached = self._credentials.get(token_path)
+        # O arquivo é relido apenas se foi alterado (ex.: novo login com outra permissão)
+        if cached is not None and cached[1] == self._mtime(token_path) and cached[0].valid:
+            return cached[0]
+
+        with self._key_lock(token_path):
+            cached = self._credentials.get(token_path)
+            if cached is not None and cached[1] == self._mtime(token_path) and cached[0].valid:
+                return cached[0]
+
+            creds = self._load(token_path, scopes)
+            self._credentials[token_path] = (creds, self._mtime(token_path))
+            return creds
+
+    def _discovery(self):
+        if self._discovery_doc is None:
+            self._discovery_doc = json.loads(get_static_doc("calendar", "v3"))
+        return self._discovery_doc
+
+    def service(self):
+        """
+        Serviço do Calendar para o usuário atual, reaproveitado dentro da mesma thread.
+        """
+        creds = self.credentials()
+
+        services = getattr(self._local, "services", None)
+        if services is None:
+            services = self._local.services = OrderedDict()
+
+        key = id(creds)
+        cached = services.get(key)
+        if cached is not None and cached[0] is creds:
+            services.move_to_end(key)
+            return cached[1]
+
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=self.http_timeout))
+        service = build_from_document(self._discovery(), http=http)
+        services[key] = (creds, service)
+        while len(services) > self.services_per_thread:
+            services.popitem(last=False)
+        return service
+
+    def invalidate(self, email: Optional[str] = None) -> None:
+        """
+        Descarta as credenciais em cache (de um usuário ou todas), ex.: após resetar a autenticação.
+        """
+        with self._lock:
+            for token_path in list(self._credentials):
+                if email is None or os.path.basename(token_path).startswith(f"{email}_"):
+                    del self._credentials[token_path]
+
+    def refresh_expiring(self) -> None:
+        """
+        Renova as credenciais em cache que expiram em menos de refresh_margin segundos.
+        """
+        for token_path, (creds, _) in list(self._credentials.items()):
+            if not creds.refresh_token or not self._needs_refresh(creds):
+                continue
+            with self._key_lock(token_path):
+                try:
+                    creds.refresh(Request())
+                    self._save(token_path, creds)
+                    self._credentials[token_path] = (creds, self._mtime(token_path))
+                except Exception as e:
+                    print(f"Erro ao renovar as credenciais do calendário ({token_path}): {e}")
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is not None:
+                return
+
+            def _loop():
+                while True:
+                    time.sleep(self.refresh_interval)
+                    self.refresh_expiring()
+
+            self._refresher = threading.Thread(target=_loop, name="calendar-credentials-refresh", daemon=True)
+            self._refresher.start()
+
+
+calendar_services = CalendarServicePool()
@@ -1,35 +1,235 @@
 import datetime as dt
-import os.path
-import sqlite3
+import re
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-# Google Calendar API scopes - usando full access por padrão para as tools
-SCOPES = ["https://www.googleapis.com/auth/calendar"]
+from config.settings import CALENDAR_SLOT_STEP, CALENDAR_WORKING_DAYS, CALENDAR_WORKING_HOURS
+from src.db.users import find_email
+from src.metrics import metrics
+from src.tools.calendar_mirror import CALENDAR_TIMEZONE, calendar_mirror, event_emails
+from src.tools.calendar_service import calendar_services
+from src.tools.event_handles import current_calendar_session, event_handles
+from src.tools.free_slots import free_slots, parse_working_days, parse_working_hours
+
+WORKING_HOURS = parse_working_hours(CALENDAR_WORKING_HOURS)
+WORKING_DAYS = parse_working_days(CALENDAR_WORKING_DAYS)
 
 def get_calendar_credentials():
     """
-    Obtem as credenciais do calendário
+    Obtem as credenciais do calendário (do usuário atual, em cache)
     """
-    creds = None
-    if os.path.exists("auth/token.json"):
-        creds = Credentials.from_authorized_user_file("auth/token.json", SCOPES)
+    return calendar_services.credentials()
 
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file("config/credentials.json", SCOPES)
-            creds = flow.run_local_server(port=0)
+def _with_timezone(value: str) -> str:
+    """
+    Adiciona o fuso de São Paulo a datas sem fuso (formato RFC3339 exigido pela API).
+    """
+    if value.endswith("Z") or re.search(r"[+-]\d{2}:\d{2}$", value):
+        return value
+    return value + "-03:00"
+
+
+def list_events(service, time_min: str, time_max: str, page_size: int = 250):
+    """
+    Todos os eventos da janela de tempo numa única consulta paginada (ordenados pelo início).
+    """
+    events = []
+    page_token = None
+    while True:
+        event_result = (
+            service.events()
+            .list(
+                calendarId="primary",
+                timeMin=time_min,
+                timeMax=time_max,
+                maxResults=page_size,
+                singleEvents=True,
+                orderBy="startTime",
+                pageToken=page_token,
+            )
+            .execute()
+        )
+        events.extend(event_result.get("items", []))
+        page_token = event_result.get("nextPageToken")
+        if not page_token:
+            return events
+
+
+def window_events(time_min: str, time_max: str):
+    """
+    Eventos da janela: do espelho local quando ativo (sincronizado se estiver desatualizado), senão da API.
+    """
+    if calendar_mirror is not None:
+        try:
+            events = calendar_mirror.events(calendar_services.owner(), calendar_services.service, time_min, time_max)
+            if events is not None:
+                return events
+        except Exception as e:
+            print(f"Erro ao consultar o espelho do calendário, usando a API: {e}")
+    return list_events(calendar_services.service(), time_min, time_max)
+
+
+def _mirror_apply(event) -> None:
+    """
+    Grava no espelho o evento criado ou editado, para que as próximas leituras já o vejam.
+    """
+    if calendar_mirror is not None:
+        try:
+            calendar_mirror.apply(calendar_services.owner(), event)
+        except Exception as e:
+            print(f"Erro ao atualizar o espelho do calendário: {e}")
+
+
+def _event_removed(event_id: str) -> None:
+    """
+    Evento excluído (pelas ferramentas ou, segundo a API, por outra pessoa): sai do espelho e dos handles.
+    """
+    event_handles.forget_event(calendar_services.owner(), event_id)
+    if calendar_mirror is not None:
+        try:
+            calendar_mirror.remove(calendar_services.owner(), event_id)
+        except Exception as e:
+            print(f"Erro ao atualizar o espelho do calendário: {e}")
+
+
+def _remember(event, make_last: bool = False):
+    """
+    Handle do evento na conversa atual, para pedidos de acompanhamento ("mude essa reunião").
+    Só eventos criados ou editados passam a ser o "last"; os apenas listados recebem um handle E<n>.
+    """
+    return event_handles.remember(current_calendar_session.get(), calendar_services.owner(), event.get("id"), make_last=make_last)
+
+
+def _event_by_handle(event_id: str):
+    """
+    Evento referenciado por handle ("E2", "last") ou id já visto na conversa: (evento, None) ou (None, mensagem de erro).
+    """
+    owner = calendar_services.owner()
+    entry = event_handles.resolve(current_calendar_session.get(), owner, event_id)
+    if entry is None:
+        return None, f"❌ Referência de evento '{event_id}' desconhecida ou expirada. Busque o evento pelo título, data ou participante."
+
+    event = None
+    if calendar_mirror is not None:
+        try:
+            event = calendar_mirror.get(owner, calendar_services.service, entry.event_id)
+        except Exception as e:
+            print(f"Erro ao consultar o espelho do calendário, usando a API: {e}")
+    if event is None:
+        try:
+            event = calendar_services.service().events().get(calendarId="primary", eventId=entry.event_id).execute()
+        except HttpError as error:
+            if error.resp.status not in (404, 410):
+                raise
+            event = {"status": "cancelled"}
+    if event.get("status") == "cancelled":
+        _event_removed(entry.event_id)
+        return None, "❌ Evento não encontrado: O evento pode ter sido excluído."
+    return event, None
+
+
+def search_events(service, time_min=None, time_max=None, summary=None, attendee=None, limit: int = 50, page_size: int = 250):
+    """
+    Busca paginada na API com filtro q no servidor (título ou participante). O filtro exato é refeito
+    localmente, pois q também casa com descrição, local e outros campos do evento.
+    """
+    events = []
+    page_token = None
+    while True:
+        event_result = (
+            service.events()
+            .list(
+                calendarId="primary",
+                timeMin=time_min,
+                timeMax=time_max,
+                q=summary or attendee,
+                maxResults=page_size,
+                singleEvents=True,
+                orderBy="startTime",
+                pageToken=page_token,
+            )
+            .execute()
+        )
+        for event in event_result.get("items", []):
+            if summary and summary.lower() not in event.get("summary", "").lower():
+                continue
+            if attendee and attendee.lower() not in event_emails(event):
+                continue
+            events.append(event)
+            if len(events) >= limit:
+                return events
+        page_token = event_result.get("nextPageToken")
+        if not page_token:
+            return events
+
+
+def find_events(summary=None, attendee=None, time_min=None, time_max=None, limit: int = 50):
+    """
+    Eventos que atendem aos critérios: consulta indexada no espelho local quando ativo; sem ele (ou para
+    janelas anteriores ao trecho espelhado), busca paginada na API.
+    """
+    if calendar_mirror is not None:
+        try:
+            events = calendar_mirror.find(
+                calendar_services.owner(), calendar_services.service, summary, attendee, time_min, time_max, limit
+            )
+            # Sem início da janela, eventos anteriores ao trecho espelhado ainda podem existir na API
+            if events or (events is not None and time_min is not None):
+                return events
+        except Exception as e:
+            print(f"Erro ao consultar o espelho do calendário, usando a API: {e}")
+    return search_events(calendar_services.service(), time_min, time_max, summary, attendee, limit)
+
+
+def _find_target_event(summary=None, start_date=None, end_date=None, attendees=None, limit: int = 50):
+    """
+    Evento a editar ou excluir: (evento, None) quando exatamente um atende aos critérios, senão (None, mensagem de erro).
+    """
+    with metrics.timer("calendar.lookup_seconds"):
+        events = find_events(
+            summary=summary,
+            attendee=attendees,
+            time_min=_with_timezone(start_date) if start_date else None,
+            time_max=_with_timezone(end_date) if end_date else None,
+            limit=limit,
+        )
+
+    if not events:
+        if summary and attendees:
+            return None, "❌ Nenhum evento encontrado com os critérios especificados."
+        if summary:
+            return None, f"❌ Nenhum evento encontrado com o título '{summary}'."
+        if attendees:
+            return None, f"❌ Nenhum evento encontrado com o participante '{attendees}'."
+        return None, "❌ Nenhum evento encontrado no período especificado."
+
+    if len(events) > 1:
+        # Os candidatos vão na resposta para que o agente refine a busca sem listar os eventos de novo
+        candidates = "\n".join(
+            f"- {_remember(event) or event['id']}: {event.get('summary', 'Sem título')} "
+            f"({event['start'].get('dateTime') or event['start'].get('date')})"
+            for event in events[:5]
+        )
+        count = f"{limit} ou mais" if len(events) >= limit else str(len(events))
+        return None, f"❌ Múltiplos eventos encontrados ({count}). Seja mais específico nos critérios de busca.\n{candidates}"
+
+    return events[0], None
+
+
+def _event_matches_attendees(event, attendees) -> bool:
+    """
+    Equivalente local da busca q=<email> da API: participantes, organizador e campos de texto do evento.
+    """
+    emails = {attend.get("email", "").lower() for attend in event.get("attendees", [])}
+    emails.add(event.get("organizer", {}).get("email", "").lower())
+    text = " ".join(event.get(field, "") for field in ("summary", "description", "location")).lower()
+
+    for attendee in attendees:
+        attendee = attendee.lower()
+        if attendee in emails or attendee in text:
+            return True
+    return False
 
-        with open("auth/token.json", "w") as token:
-            token.write(creds.to_json())
-    
-    return creds
 
 def get_calendar_events(numEvents=5, start_date=None, end_date=None, attendees=[]):
     """
@@ -39,18 +239,15 @@ def get_calendar_events(numEvents=5, start_date=None, end_date=None, attendees=[
         numEvents (int): Maximum number of events to search for.
         start_date (str): Start date of the search.
         end_date (str): End date of the search.
-        attendees (list): List of participant emails.
+        attendees (list): List of participant emails. If empty, all events in the period are returned.
 
     Returns:
-        list: List of events found.
+        list: List of events found. Each event_id can be passed to edit_calendar_event or delete_calendar_event.
     """    
 
     print("Function called: get_calendar_events")
 
     try:
-        creds = get_calendar_credentials()
-        service = build("calendar", "v3", credentials=creds)
-
         if start_date is None:
             start_date = dt.datetime.now().isoformat()
 
@@ -58,41 +255,33 @@ def get_calendar_events(numEvents=5, start_date=None, end_date=None, attendees=[
             end_date = dt.datetime.fromisoformat(start_date) + dt.timedelta(days=30)
             end_date = end_date.isoformat()
 
+        # Uma única consulta pela janela de tempo (local, com o espelho), filtrada por participante
+        # (cada evento aparece uma vez, mesmo que envolva vários dos participantes)
+        events = window_events(_with_timezone(start_date), _with_timezone(end_date))
+        if attendees:
+            events = [event for event in events if _event_matches_attendees(event, attendees)]
+
         event_list = []
 
-        for attendee in attendees:
-            event_result = (
-                service.events()
-                .list(
-                    calendarId="primary",
-                    timeMin=start_date + "-03:00",
-                    timeMax=end_date + "-03:00",
-                    maxResults=numEvents,
-                    singleEvents=True,
-                    orderBy="startTime",
-                    q=attendee,
-                )
-                .execute()
-            )
-            events = event_result.get("items", [])
-            for event in events:
-                attendees = []
-                if not event["attendees"]:
-                    attendees.append("Only the user is invited to this event.")
-                else:
-                    for attend in event["attendees"]:
-                        attendees.append(attend['email'])
-
-                formatted_event = {
-                    "summary": event.get("summary", "Sem título"),
-                    "description": event.get("description", "Sem descrição"),
-                    "location": event.get("location", "Não informado"),
-                    "start": event["start"],
-                    "end": event["end"],
-                    "attendees": attendees,
-                }
-
-                event_list.append(formatted_event)
+        for event in events[:numEvents]:
+            attendees_emails = []
+            if not event.get("attendees"):
+                attendees_emails.append("Only the user is invited to this event.")
+            else:
+                for attend in event["attendees"]:
+                    attendees_emails.append(attend['email'])
+
+            formatted_event = {
+                "event_id": _remember(event) or event["id"],
+                "summary": event.get("summary", "Sem título"),
+                "description": event.get("description", "Sem descrição"),
+                "location": event.get("location", "Não informado"),
+                "start": event["start"],
+                "end": event["end"],
+                "attendees": attendees_emails,
+            }
+
+            event_list.append(formatted_event)
 
         return event_list
 
@@ -145,7 +334,7 @@ def create_calendar_event(
     # Check for conflicts
     conflito = get_calendar_events(start_date=start, end_date=end, attendees=attendees)
     if conflito and len(conflito) > 0:
-        return "Conflito de horário detectado! Já existe um evento no horário solicitado."
+        return "Conflito de horário detectado! Já existe um evento no horário solicitado. Use find_free_slots para encontrar horários livres."
 
     # Format attendees
     convidados = []
@@ -153,8 +342,7 @@ def create_calendar_event(
         convidados.append({"email": attendee})
 
     try:
-        creds = get_calendar_credentials()
-        service = build("calendar", "v3", credentials=creds)
+        service = calendar_services.service()
 
         event = {
             "summary": summary,
@@ -172,8 +360,12 @@ def create_calendar_event(
         }
 
         event = service.events().insert(calendarId="primary", body=event).execute()
+        _mirror_apply(event)
 
         res = "✅ Evento criado com sucesso!"
+        handle = _remember(event, make_last=True)
+        if handle:
+            res += f" (event_id: {handle})"
         return res
 
     # Handle errors
@@ -181,6 +373,92 @@ def create_calendar_event(
         msg = str(error)
         return f"❌ Erro ao criar evento: {msg}"
 
+def _parse_local(value: str) -> dt.datetime:
+    return dt.datetime.fromisoformat(_with_timezone(value).replace("Z", "+00:00")).astimezone(CALENDAR_TIMEZONE)
+
+
+def find_free_slots(
+    attendees=[],
+    duration_minutes: int = 60,
+    start_date: str = None,
+    end_date: str = None,
+    num_slots: int = 3,
+):
+    """
+    Find the earliest times when the user and all attendees are free, within working hours.
+    Use it to suggest or pick a new time when create_calendar_event reports a conflict.
+
+    Args:
+        attendees (list): List of participant emails (the user's calendar is always included).
+        duration_minutes (int): Meeting duration in minutes.
+        start_date (str): Start of the search window. Defaults to now.
+        end_date (str): End of the search window. Defaults to 7 days after start_date.
+        num_slots (int): Number of free slots to return.
+
+    Returns:
+        dict: Free slots (start and end in RFC3339), earliest first, and the calendars that could not be checked.
+    """
+
+    print("Function called: find_free_slots")
+
+    window_start = _parse_local(start_date) if start_date else dt.datetime.now(CALENDAR_TIMEZONE)
+    window_end = _parse_local(end_date) if end_date else window_start + dt.timedelta(days=7)
+    if window_end <= window_start:
+        return "❌ Erro: O fim do período deve ser posterior ao início."
+
+    # Um único freebusy para todos os participantes (o calendário do usuário entra como "primary")
+    calendar_ids = ["primary"] + [email for email in dict.fromkeys(attendees) if email and email != "primary"]
+
+    try:
+        service = calendar_services.service()
+        with metrics.timer("calendar.freebusy_seconds"):
+            result = (
+                service.freebusy()
+                .query(
+                    body={
+                        "timeMin": window_start.isoformat(),
+                        "timeMax": window_end.isoformat(),
+                        "timeZone": "America/Sao_Paulo",
+                        "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+                    }
+                )
+                .execute()
+            )
+    except HttpError as error:
+        return f"❌ Erro ao consultar a disponibilidade: {error}"
+
+    busy = []
+    not_checked = []
+    for calendar_id, calendar in result.get("calendars", {}).items():
+        if calendar.get("errors"):
+            not_checked.append(calendar_id)
+        for interval in calendar.get("busy", []):
+            busy.append((_parse_local(interval["start"]), _parse_local(interval["end"])))
+
+    slots = free_slots(
+        busy,
+        window_start,
+        window_end,
+        dt.timedelta(minutes=duration_minutes),
+        WORKING_HOURS,
+        WORKING_DAYS,
+        limit=num_slots,
+        step=dt.timedelta(minutes=CALENDAR_SLOT_STEP),
+    )
+
+    response = {
+        "free_slots": [
+            {"start": start.strftime("%Y-%m-%dT%H:%M:%S"), "end": end.strftime("%Y-%m-%dT%H:%M:%S")}
+            for start, end in slots
+        ]
+    }
+    if not slots:
+        response["message"] = "Nenhum horário livre em comum no período. Tente um período maior."
+    if not_checked:
+        response["not_checked"] = not_checked
+    return response
+
+
 def current_time_tool():
     """
     Get current time in RFC3339 format
@@ -252,25 +530,19 @@ def get_user_email(username: str):
 
     username = username.lower()
 
-    conn = sqlite3.connect("database/usuarios.sqlite")
-    c = conn.cursor()
-    c.execute(
-        "SELECT email FROM usuarios WHERE username = ?",
-        (username,),
-    )
-    email = c.fetchone()
+    email = find_email(username)
     if email:
         print(f"Email found: {email}")
-        return email[0]
+        return email
     else:
-        conn.close()
         return "Usuário não encontrado!"
 
 def delete_calendar_event(
     summary: str = None,
     start_date: str = None,
     end_date: str = None,
-    attendees: str = None
+    attendees: str = None,
+    event_id: str = None
 ):
     """
     Delete an event from the user's calendar.
@@ -280,6 +552,8 @@ def delete_calendar_event(
         start_date (str): Start date to filter events.
         end_date (str): End date to filter events.
         attendees (str): Attendee email to search for.
+        event_id (str): event_id of an event shown, created or edited earlier in this conversation
+            (e.g. "E2", or "last" for the most recent one). When given, the search criteria are not needed.
 
     Returns:
         str: Success or error message.
@@ -288,63 +562,27 @@ def delete_calendar_event(
     print("Function called: delete_calendar_event")
 
     # Validate that at least one search criteria is provided
-    if not summary and not start_date and not end_date and not attendees:
+    if not event_id and not summary and not start_date and not end_date and not attendees:
         return "❌ Erro: É necessário fornecer pelo menos um critério de busca (título, data ou participantes)."
 
-    try:
-        # Get credentials and build service
-        creds = get_calendar_credentials()
-        service = build("calendar", "v3", credentials=creds)
-
-        # Search for events in Google Calendar
-        event_result = service.events().list(
-            calendarId="primary",
-            timeMin=start_date,
-            timeMax=end_date,
-            maxResults=10,
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
-
-        events = event_result.get("items", [])
+    target_event = None
 
-        if not events:
-            return "❌ Nenhum evento encontrado no período especificado."
-
-        # Filter events based on criteria
-        target_event = None
-
-        # Search by title (summary)
-        if summary:
-            events = [event for event in events if summary.lower() in event.get("summary", "").lower()]
-            if not events:
-                print(f"❌ Nenhum evento encontrado com o título '{summary}'.")
-                return f"❌ Nenhum evento encontrado com o título '{summary}'."
+    try:
+        # Get the (cached) calendar service
+        service = calendar_services.service()
 
-        # Filter by attendee if provided
-        if attendees:
-            filtered_events = []
-            for event in events:
-                event_attendees = event.get("attendees", [])
-                event_emails = [attendee.get("email", "") for attendee in event_attendees]
-                if attendees in event_emails:
-                    filtered_events.append(event)
-            events = filtered_events
-            
-            if not events:
-                return f"❌ Nenhum evento encontrado com o participante '{attendees}'."
-
-        if len(events) > 1:
-            return f"❌ Múltiplos eventos encontrados ({len(events)}). Seja mais específico nos critérios de busca."
-
-        if len(events) == 0:
-            return "❌ Nenhum evento encontrado com os critérios especificados."
-
-        # Get the event to delete
-        target_event = events[0]
+        # Event referenced earlier in the conversation, or indexed lookup (local mirror, or paginated server-side search)
+        if event_id:
+            target_event, error = _event_by_handle(event_id)
+        else:
+            target_event, error = _find_target_event(summary, start_date, end_date, attendees)
+        if error:
+            print(error)
+            return error
 
         # Delete the event
         service.events().delete(calendarId="primary", eventId=target_event["id"]).execute()
+        _event_removed(target_event["id"])
 
         return f"✅ Evento '{target_event.get('summary', 'Sem título')}' excluído com sucesso!"
 
@@ -354,8 +592,11 @@ def delete_calendar_event(
         
         # Check for permission errors
         if error_code == '403' or 'forbidden' in msg.lower():
-            return f"❌ Erro de permissão: Você não tem autorização para excluir o evento '{target_event.get('summary', 'Sem título')}'. Apenas o organizador pode excluir este evento."
-        elif error_code == '404' or 'not found' in msg.lower():
+            title = target_event.get('summary', 'Sem título') if target_event else ''
+            return f"❌ Erro de permissão: Você não tem autorização para excluir o evento '{title}'. Apenas o organizador pode excluir este evento."
+        elif error_code in ('404', '410') or 'not found' in msg.lower() or 'deleted' in msg.lower():
+            if target_event:
+                _event_removed(target_event["id"])
             return f"❌ Evento não encontrado: O evento pode ter sido excluído por outra pessoa ou não existe mais."
         else:
             return f"❌ Erro ao excluir evento: {msg}"
@@ -370,7 +611,8 @@ def edit_calendar_event(
     new_description: str = None,
     new_start: str = None,
     new_end: str = None,
-    new_attendees: str = None
+    new_attendees: str = None,
+    event_id: str = None
 ):
     """
     Edit an existing event in the user's calendar.
@@ -381,6 +623,8 @@ def edit_calendar_event(
         start_date (str): Start date to filter events.
         end_date (str): End date to filter events.
         attendees (str): Attendee email to search for.
+        event_id (str): event_id of an event shown, created or edited earlier in this conversation
+            (e.g. "E2", or "last" for the most recent one). When given, the search criteria are not needed.
         
         # New values
         new_summary (str): New event title.
@@ -397,107 +641,84 @@ def edit_calendar_event(
     print("Function called: edit_calendar_event")
 
     # Validate that at least one search criteria is provided
-    if not summary and not start_date and not end_date and not attendees:
+    if not event_id and not summary and not start_date and not end_date and not attendees:
         return "❌ Erro: É necessário fornecer pelo menos um critério de busca (título, data ou participantes)."
 
-    try:
-        # Get credentials and build service
-        creds = get_calendar_credentials()
-        service = build("calendar", "v3", credentials=creds)
+    target_event = None
 
-        # Set search parameters
-        if start_date is None:
-            search_start = dt.datetime.now().isoformat()
-        else:
-            search_start = start_date
+    try:
+        # Get the (cached) calendar service
+        service = calendar_services.service()
 
-        if end_date is None:
-            search_end = dt.datetime.fromisoformat(search_start) + dt.timedelta(days=30)
-            search_end = search_end.isoformat()
+        if event_id:
+            # Event referenced earlier in the conversation: no search needed
+            target_event, error = _event_by_handle(event_id)
         else:
-            search_end = end_date
-
-        # Search for events in Google Calendar
-        event_result = service.events().list(
-            calendarId="primary",
-            timeMin=search_start,
-            timeMax=search_end,
-            maxResults=10,
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
-
-        events = event_result.get("items", [])
-
-        if not events:
-            return "❌ Nenhum evento encontrado no período especificado."
-
-        # Filter by summary if provided
-        if summary:
-            events = [event for event in events if summary.lower() in event.get("summary", "").lower()]
-            if not events:
-                return f"❌ Nenhum evento encontrado com o título '{summary}'."
-
-        # Filter by attendee if provided
-        if attendees:
-            filtered_events = []
-            for event in events:
-                event_attendees = event.get("attendees", [])
-                event_emails = [attendee.get("email", "") for attendee in event_attendees]
-                if attendees in event_emails:
-                    filtered_events.append(event)
-            events = filtered_events
-            
-            if not events:
-                return f"❌ Nenhum evento encontrado com o participante '{attendees}'."
-
-        if len(events) > 1:
-            return f"❌ Múltiplos eventos encontrados ({len(events)}). Seja mais específico nos critérios de busca."
-
-        if len(events) == 0:
-            return "❌ Nenhum evento encontrado com os critérios especificados."
-
-        # Get the event to edit
-        target_event = events[0]
-
-        # Update only the fields that were provided
+            # Set search parameters
+            if start_date is None:
+                search_start = dt.datetime.now().isoformat()
+            else:
+                search_start = start_date
+
+            if end_date is None:
+                search_end = dt.datetime.fromisoformat(search_start) + dt.timedelta(days=30)
+                search_end = search_end.isoformat()
+            else:
+                search_end = end_date
+
+            # Indexed lookup (local mirror, or paginated server-side search)
+            target_event, error = _find_target_event(summary, search_start, search_end, attendees)
+        if error:
+            return error
+
+        # Only the fields that were provided are sent: the event read from the local mirror may be stale,
+        # and a full update would overwrite changes made meanwhile by other clients
+        changes = {}
         if new_summary:
-            target_event["summary"] = new_summary
+            changes["summary"] = new_summary
         
         if new_location:
-            target_event["location"] = new_location
+            changes["location"] = new_location
         
         if new_description:
-            target_event["description"] = new_description
+            changes["description"] = new_description
         
         if new_start:
-            target_event["start"] = {
+            changes["start"] = {
                 "dateTime": new_start,
                 "timeZone": "America/Sao_Paulo"
             }
         
         if new_end:
-            target_event["end"] = {
+            changes["end"] = {
                 "dateTime": new_end,
                 "timeZone": "America/Sao_Paulo"
             }
         
         if new_attendees:
-            target_event["attendees"] = [{"email": new_attendees}]
+            changes["attendees"] = [{"email": new_attendees}]
+
+        if not changes:
+            return "❌ Erro: Nenhuma alteração informada para o evento."
 
         # Update the event
-        updated_event = service.events().update(
+        updated_event = service.events().patch(
             calendarId="primary",
             eventId=target_event["id"],
-            body=target_event
+            body=changes
         ).execute()
+        _mirror_apply(updated_event)
 
-        return f"✅ Evento '{target_event.get('summary', 'Sem título')}' editado com sucesso!"
+        handle = _remember(updated_event, make_last=True)
+        suffix = f" (event_id: {handle})" if handle else ""
+        return f"✅ Evento '{updated_event.get('summary', 'Sem título')}' editado com sucesso!{suffix}"
 
     except HttpError as error:
         if error.resp.status == 403:
             return f"❌ Erro de permissão: Você não tem autorização para editar este evento."
-        elif error.resp.status == 410:
+        elif error.resp.status in (404, 410):
+            if target_event:
+                _event_removed(target_event["id"])
             return f"❌ Evento não encontrado: O evento pode ter sido excluído."
         else:
             msg = str(error)
@@ -0,0 +1,149 @@
+"""
+Referências curtas aos eventos que as ferramentas de calendário mostraram ou alteraram na conversa.
+
+Um pedido de acompanhamento ("mude essa reunião para as 16h") fazia o calendar_agent listar e filtrar
+os eventos de novo, embora o turno anterior tivesse acabado de criar ou mostrar o evento. Agora cada
+evento devolvido ou alterado pelas ferramentas recebe um handle por conversa ("E1", "E2", ...; "last"
+é o último evento criado ou editado, nunca um apenas listado), e edit_calendar_event /
+delete_calendar_event aceitam o handle em event_id, sem nenhuma busca. Os handles expiram após ttl
+segundos sem uso e são descartados quando o evento é excluído pelas ferramentas, pela API (404/410)
+ou por uma sincronização do espelho local. Os handles ficam na memória do processo: uma sessão
+atendida por outro worker volta à busca por critérios.
+"""
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from config.settings import EVENT_HANDLE_MAX_SESSIONS, EVENT_HANDLE_TTL
+from src.metrics import metrics
+from src.tools.calendar_mirror import calendar_mirror
+
+LAST_HANDLE = "last"
+
+# Conversa atual (definida pelo bot antes de chamar o calendar_agent): usuário + id da conversa
+current_calendar_session: ContextVar[Optional[str]] = ContextVar("current_calendar_session", default=None)
+
+
+def set_calendar_session(session_id: Optional[str]) -> None:
+    current_calendar_session.set(session_id)
+
+
+@dataclass
+class EventHandle:
+    handle: str
+    owner: str
+    event_id: str
+    expires_at: float
+
+
+class _Session:
+    def __init__(self):
+        self.handles: "OrderedDict[str, EventHandle]" = OrderedDict()
+        self.by_event: Dict[str, str] = {}
+        self.counter = 0
+        # Último evento criado ou editado
+        self.last: Optional[str] = None
+
+
+class EventHandleCache:
+    def __init__(self, ttl: float = 1800, max_sessions: int = 10000, max_handles: int = 50):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_handles = max_handles
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _session(self, session_id: str) -> _Session:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+        return session
+
+    @staticmethod
+    def _drop(session: _Session, handle: str) -> None:
+        entry = session.handles.pop(handle, None)
+        if entry is not None and session.by_event.get(entry.event_id) == handle:
+            del session.by_event[entry.event_id]
+        if session.last == handle:
+            session.last = None
+
+    def remember(self, session_id: Optional[str], owner: str, event_id: str, make_last: bool = False) -> Optional[str]:
+        """
+        Handle do evento nesta sessão (o mesmo se o evento já tiver um); com make_last passa a ser o "last".
+        """
+        if not session_id or not event_id:
+            return None
+        with self._lock:
+            session = self._session(session_id)
+            handle = session.by_event.get(event_id)
+            if handle is None:
+                session.counter += 1
+                handle = f"E{session.counter}"
+                session.by_event[event_id] = handle
+            session.handles[handle] = EventHandle(handle, owner, event_id, time.monotonic() + self.ttl)
+            session.handles.move_to_end(handle)
+            if make_last:
+                session.last = handle
+            while len(session.handles) > self.max_handles:
+                # O "last" não é descartado por uma listagem longa
+                oldest = next(handle for handle in session.handles if handle != session.last)
+                self._drop(session, oldest)
+            return handle
+
+    def resolve(self, session_id: Optional[str], owner: str, reference: str) -> Optional[EventHandle]:
+        """
+        Handle ("E3", "last") ou id de evento já visto na sessão; None se desconhecido, expirado ou de outro calendário.
+        """
+        if not session_id or not reference:
+            return None
+        reference = reference.strip()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                metrics.increment("event_handles.miss")
+                return None
+
+            if reference.lower() == LAST_HANDLE:
+                handle = session.last
+            else:
+                handle = reference.upper() if reference.upper() in session.handles else session.by_event.get(reference)
+            entry = session.handles.get(handle) if handle else None
+
+            if entry is None or entry.expires_at <= time.monotonic() or entry.owner != owner:
+                if entry is not None:
+                    self._drop(session, handle)
+                metrics.increment("event_handles.miss")
+                return None
+
+            entry.expires_at = time.monotonic() + self.ttl
+            metrics.increment("event_handles.hit")
+            return entry
+
+    def forget_event(self, owner: str, event_id: str) -> None:
+        """
+        Descarta os handles do evento em todas as sessões (evento excluído ou inexistente).
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                handle = session.by_event.get(event_id)
+                if handle is not None and session.handles[handle].owner == owner:
+                    self._drop(session, handle)
+
+    def forget_owner(self, owner: str) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                for handle in [handle for handle, entry in session.handles.items() if entry.owner == owner]:
+                    self._drop(session, handle)
+
+
+event_handles = EventHandleCache(ttl=EVENT_HANDLE_TTL, max_sessions=EVENT_HANDLE_MAX_SESSIONS)
+
+# Exclusões vistas pelo espelho (sincronizações) também invalidam os handles
+if calendar_mirror is not None:
+    calendar_mirror.add_listener(event_handles.forget_event)
@@ -0,0 +1,121 @@
+"""
+Horários livres em comum entre os participantes de uma reunião.
+
+Os intervalos ocupados de todos os participantes (uma única consulta freebusy) são ordenados e
+fundidos numa só lista; os horários livres são as lacunas entre eles, recortadas ao expediente de
+cada dia útil, de onde saem os primeiros horários com a duração pedida.
+"""
+import datetime as dt
+from typing import Iterable, List, Sequence, Tuple
+
+Interval = Tuple[dt.datetime, dt.datetime]
+
+
+def parse_working_hours(value: str) -> Tuple[dt.time, dt.time]:
+    """
+    "09:00-18:00" -> (09:00, 18:00)
+    """
+    start, end = (dt.time.fromisoformat(part.strip()) for part in value.split("-", 1))
+    if end <= start:
+        raise ValueError(f"CALENDAR_WORKING_HOURS inválido: {value}")
+    return start, end
+
+
+def parse_working_days(value: str) -> Tuple[int, ...]:
+    """
+    "1-5" ou "1,2,3,4,5" -> dias da semana ISO (1 = segunda)
+    """
+    days = set()
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = (int(item) for item in part.split("-", 1))
+            days.update(range(first, last + 1))
+        elif part:
+            days.add(int(part))
+    if not days or not days <= set(range(1, 8)):
+        raise ValueError(f"CALENDAR_WORKING_DAYS inválido: {value}")
+    return tuple(sorted(days))
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Ordena pelo início e funde os intervalos que se sobrepõem ou se encostam.
+    """
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def working_windows(
+    window_start: dt.datetime,
+    window_end: dt.datetime,
+    working_hours: Tuple[dt.time, dt.time],
+    working_days: Sequence[int],
+) -> List[Interval]:
+    """
+    Expediente de cada dia útil dentro da janela, no fuso de window_start.
+    """
+    windows: List[Interval] = []
+    day = window_start.date()
+    while day <= window_end.date():
+        if day.isoweekday() in working_days:
+            start = dt.datetime.combine(day, working_hours[0], tzinfo=window_start.tzinfo)
+            end = dt.datetime.combine(day, working_hours[1], tzinfo=window_start.tzinfo)
+            start, end = max(start, window_start), min(end, window_end)
+            if start < end:
+                windows.append((start, end))
+        day += dt.timedelta(days=1)
+    return windows
+
+
+def _round_up(moment: dt.datetime, step: dt.timedelta) -> dt.datetime:
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    steps = -(-(moment - midnight) // step)
+    return midnight + steps * step
+
+
+def free_slots(
+    busy: Iterable[Interval],
+    window_start: dt.datetime,
+    window_end: dt.datetime,
+    duration: dt.timedelta,
+    working_hours: Tuple[dt.time, dt.time],
+    working_days: Sequence[int],
+    limit: int = 3,
+    step: dt.timedelta = dt.timedelta(minutes=15),
+) -> List[Interval]:
+    """
+    Os primeiros `limit` horários (sem sobreposição) com a duração pedida, livres para todos, dentro do expediente.
+    Os inícios são arredondados para múltiplos de step.
+    """
+    merged = merge_intervals(busy)
+    slots: List[Interval] = []
+    position = 0
+
+    for day_start, day_end in working_windows(window_start, window_end, working_hours, working_days):
+        cursor = _round_up(day_start, step)
+        # Os intervalos fundidos estão ordenados: cada dia continua de onde o anterior parou
+        while position < len(merged) and merged[position][1] <= cursor:
+            position += 1
+        index = position
+
+        while cursor + duration <= day_end:
+            if index < len(merged) and merged[index][0] < cursor + duration:
+                # Conflito: pula para o fim do intervalo ocupado
+                cursor = _round_up(max(cursor, merged[index][1]), step)
+                index += 1
+                continue
+            slots.append((cursor, cursor + duration))
+            if len(slots) >= limit:
+                return slots
+            cursor = _round_up(cursor + duration, step)
+
+    return slots
@@ -0,0 +1,202 @@
+"""
+Busca na web do helper_agent com cache compartilhado.
+
+O TavilyTools fazia uma busca ao vivo a cada chamada do modelo, mesmo quando vários usuários
+perguntavam a mesma coisa em poucos minutos. Aqui os resultados ficam em cache por consulta
+normalizada (TTL e limite de entradas com descarte LRU) e buscas idênticas simultâneas são
+coalescidas numa única chamada ao backend (single-flight). SEARCH_BACKEND=stub troca a Tavily por
+um backend local determinístico, para rodar sem rede nem chave de API.
+"""
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+from agno.tools import Toolkit
+
+from src.metrics import metrics
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_query(query: str) -> str:
+    return _TRAILING_PUNCTUATION.sub("", " ".join(query.lower().split()))
+
+
+class TavilySearchBackend:
+    """
+    Tavily via o TavilyTools do agno (mesma formatação dos resultados de antes).
+    """
+
+    def __init__(self):
+        self._tools = None
+        self._lock = threading.Lock()
+
+    def _get_tools(self):
+        if self._tools is None:
+            with self._lock:
+                if self._tools is None:
+                    from agno.tools.tavily import TavilyTools
+
+                    self._tools = TavilyTools()
+        return self._tools
+
+    def search(self, query: str, max_results: int) -> str:
+        return self._get_tools().web_search_using_tavily(query, max_results=max_results)
+
+
+class StubSearchBackend:
+    """
+    Backend local para testes offline: resultados determinísticos por consulta, com contagem de chamadas.
+    """
+
+    def __init__(self, results: Optional[Dict[str, str]] = None, latency: float = 0.0):
+        self.results = {normalize_query(query): result for query, result in (results or {}).items()}
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, max_results: int) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        key = normalize_query(query)
+        if key in self.results:
+            return self.results[key]
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:8]
+        return "\n".join(
+            f"# Result {i + 1} for '{query}'\nURL: https://example.com/{digest}/{i + 1}\nStub content {i + 1} for {query}."
+            for i in range(max_results)
+        )
+
+
+class CachedWebSearch:
+    """
+    Cache TTL + LRU na frente do backend, compartilhado pelas requisições do processo.
+    """
+
+    def __init__(self, backend, ttl: float = 600, max_entries: int = 1000):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # chave -> (resultado, expira em)
+        self._entries: "OrderedDict[Tuple[str, int], tuple]" = OrderedDict()
+        # Buscas em andamento: chamadas idênticas esperam o mesmo resultado
+        self._inflight: Dict[Tuple[str, int], Future] = {}
+        self._lock = threading.Lock()
+
+    def _get_cached(self, key: Tuple[str, int]) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def search(self, query: str, max_results: int = 5) -> str:
+        key = (normalize_query(query), max_results)
+
+        with self._lock:
+            cached = self._get_cached(key)
+            if cached is not None:
+                metrics.increment("web_search.cache_hit")
+                return cached
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            metrics.increment("web_search.coalesced")
+            return future.result()
+
+        metrics.increment("web_search.cache_miss")
+        try:
+            with metrics.timer("web_search.seconds"):
+                result = self.backend.search(query, max_results)
+        except Exception as e:
+            # Erros não entram no cache; quem estava esperando recebe o mesmo erro
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._entries[key] = (result, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CachedSearchTools(Toolkit):
+    """
+    Ferramenta de busca do helper_agent; cada agente tem seu Toolkit, mas todos usam o mesmo cache.
+    """
+
+    def __init__(self, cache: CachedWebSearch, max_results: int = 5):
+        super().__init__(name="web_search_tools")
+        self.cache = cache
+        self.max_results = max_results
+        self.register(self.web_search)
+
+    def web_search(self, query: str, max_results: int = 5) -> str:
+        """Use this function to search the web for a given query.
+        This function provides realtime online information about the query.
+
+        Args:
+            query (str): Query to search for.
+            max_results (int): Maximum number of results to return. Defaults to 5.
+
+        Returns:
+            str: Search results related to the query.
+        """
+        return self.cache.search(query, min(max_results or self.max_results, self.max_results))
+
+
+class GatedSearchTools(CachedSearchTools):
+    """
+    Busca das execuções especulativas: a consulta só chega ao cache/backend depois que o palpite é confirmado (gate).
+    """
+
+    def __init__(self, cache: CachedWebSearch, gate: asyncio.Event, max_results: int = 5):
+        self.gate = gate
+        super().__init__(cache, max_results=max_results)
+
+    async def web_search(self, query: str, max_results: int = 5) -> str:
+        """Use this function to search the web for a given query.
+        This function provides realtime online information about the query.
+
+        Args:
+            query (str): Query to search for.
+            max_results (int): Maximum number of results to return. Defaults to 5.
+
+        Returns:
+            str: Search results related to the query.
+        """
+        await self.gate.wait()
+        return await asyncio.to_thread(super().web_search, query, max_results)
+
+
+def build_web_search(backend: str, ttl: float, max_entries: int) -> CachedWebSearch:
+    if backend == "tavily":
+        return CachedWebSearch(TavilySearchBackend(), ttl=ttl, max_entries=max_entries)
+    if backend == "stub":
+        return CachedWebSearch(StubSearchBackend(), ttl=ttl, max_entries=max_entries)
+    raise ValueError(f"SEARCH_BACKEND inválido: {backend}")
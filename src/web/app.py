@@ -1,3 +1,6 @@
+import json
+import uuid
+
 import requests
 import streamlit as st
 
@@ -19,6 +22,9 @@ if "calendar_permissions" not in st.session_state:
     st.session_state.calendar_permissions = ""
 if "redirect_to_login" not in st.session_state:
     st.session_state.redirect_to_login = False
+# Each browser session is one conversation (follow-ups such as "move that meeting" refer to it)
+if "conversation_id" not in st.session_state:
+    st.session_state.conversation_id = uuid.uuid4().hex
 
 # Defining permission options
 PERMISSION_OPTIONS = {
@@ -173,22 +179,54 @@ else:
 
     message = st.text_input("You:")
     if st.button("Send") and message:
-        # Get chatbot response
+        # Get chatbot response (streamed token by token)
         headers = {"token": st.session_state.token}
         try:
             response = requests.post(
-                f"{API_URL}/chat",
-                json={"message": message, "username": st.session_state.username},
+                f"{API_URL}/chat/stream",
+                json={
+                    "message": message,
+                    "username": st.session_state.username,
+                    "conversation_id": st.session_state.conversation_id,
+                },
                 headers=headers,
+                stream=True,
             )
             
             if response.status_code == 200:
-                res = response.json()["response"]
-                st.text_area("Chatbot:", value=res, height=200)
+                outcome = {"final": None, "error": False}
+
+                def tokens():
+                    yield "**Chatbot:** "
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line:
+                            continue
+                        event = json.loads(line)
+                        if event["type"] == "token":
+                            yield event["content"]
+                        elif event["type"] in ("replace", "done"):
+                            outcome["final"] = event["content"]
+                        elif event["type"] == "error":
+                            outcome["error"] = True
+                            break
+
+                # st.write_stream cannot take back text it already rendered, so it runs inside a placeholder:
+                # a "replace" event (answer changed by the reviewer) or a cached answer sent only in "done"
+                # swaps the streamed text for the final answer
+                placeholder = st.empty()
+                with placeholder.container():
+                    st.write_stream(tokens())
+                if outcome["error"]:
+                    st.error("Error generating the response. Please try again.")
+                elif outcome["final"] is not None:
+                    placeholder.markdown(f"**Chatbot:** {outcome['final']}")
             elif response.status_code == 401:
                 st.warning(response.json()["detail"])
                 st.session_state.redirect_to_login = True
                 st.rerun()
+            elif response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "a few")
+                st.warning(f"The server is busy. Please try again in {retry_after} seconds.")
             else:
                 st.error("Error communicating with server. Please try again.")
                 
@@ -196,6 +234,10 @@ else:
             st.error(f"Error during communication: {str(e)}")
     
     if st.button("Logout"):
+        try:
+            requests.post(f"{API_URL}/logout", headers={"token": st.session_state.token})
+        except Exception:
+            pass
         st.session_state.logged_in = False
         st.session_state.username = ""
         st.session_state.token = ""
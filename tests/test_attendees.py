@@ -0,0 +1,80 @@
+"""
+Resolução local dos convidados (AttendeeResolver) contra um diretório de usuários em memória.
+"""
+import pytest
+
+from src.agents.attendees import AttendeeResolver, UserDirectory
+
+USERS = [
+    ("ana", "ana@example.com"),
+    ("maria", "maria.souza@example.com"),
+    ("joao", "joao@example.com"),
+    ("mark", "mark@example.com"),
+    ("pedro_silva", "pedro.silva@example.com"),
+    ("pedro_costa", "pedro.costa@example.com"),
+]
+
+
+@pytest.fixture
+def resolver():
+    return AttendeeResolver(UserDirectory(lambda: USERS), fuzzy_cutoff=0.85)
+
+
+def test_capitalized_names_after_connectors(resolver):
+    resolution = resolver.resolve("Schedule a meeting with João and Maria tomorrow at 3 PM", "ana")
+    assert resolution.confident
+    assert resolution.emails == ["ana@example.com", "joao@example.com", "maria.souza@example.com"]
+
+
+def test_lowercase_name_after_connector_is_resolved(resolver):
+    resolution = resolver.resolve("marque uma reunião com maria amanhã às 15h", "ana")
+    assert resolution.confident
+    assert "maria.souza@example.com" in resolution.emails
+
+
+def test_lowercase_name_after_article(resolver):
+    resolution = resolver.resolve("agende uma reunião com a maria e o joao", "ana")
+    assert resolution.confident
+    assert resolution.emails == ["ana@example.com", "maria.souza@example.com", "joao@example.com"]
+
+
+def test_unknown_lowercase_name_after_connector_is_not_confident(resolver):
+    resolution = resolver.resolve("marque uma reunião com carla amanhã às 15h", "ana")
+    assert not resolution.confident
+    assert resolution.unresolved == ["carla"]
+
+
+def test_sentence_initial_word_matching_a_user_is_not_invited(resolver):
+    resolution = resolver.resolve("Mark a meeting with Joao tomorrow", "ana")
+    assert "mark@example.com" not in resolution.emails
+    # A maiúscula pode ser só o começo da frase: a decisão fica com o agente
+    assert not resolution.confident
+    assert resolution.ambiguous == {"Mark": ["mark@example.com"]}
+
+
+def test_sentence_initial_word_not_matching_a_user_is_ignored(resolver):
+    resolution = resolver.resolve("Schedule a meeting with Joao tomorrow", "ana")
+    assert resolution.confident
+    assert resolution.emails == ["ana@example.com", "joao@example.com"]
+
+
+def test_capitalized_word_outside_connectors_needs_exact_full_name(resolver):
+    # "Pedro" sozinho é só parte do nome de dois usuários: não vira convidado nem bloqueia a resolução
+    resolution = resolver.resolve("Move the Pedro review to Friday with Joao", "ana")
+    assert resolution.confident
+    assert resolution.emails == ["ana@example.com", "joao@example.com"]
+
+    resolution = resolver.resolve("Move the review to Friday, Pedro Silva too", "ana")
+    assert resolution.emails == ["ana@example.com", "pedro.silva@example.com"]
+
+
+def test_ambiguous_name_after_connector(resolver):
+    resolution = resolver.resolve("Book a call with Pedro on Monday", "ana")
+    assert not resolution.confident
+    assert resolution.ambiguous == {"Pedro": ["pedro.costa@example.com", "pedro.silva@example.com"]}
+
+
+def test_emails_in_the_message_and_own_user(resolver):
+    resolution = resolver.resolve("invite carlos@partner.com to the planning with me", "ana")
+    assert resolution.confident
+    assert resolution.emails == ["ana@example.com", "carlos@partner.com"]
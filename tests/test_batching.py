@@ -0,0 +1,42 @@
+"""
+Micro-lotes de embeddings: falhas do embedder chegam aos pedidos sem derrubar a thread dos lotes.
+"""
+from dataclasses import dataclass
+from typing import List
+
+import pytest
+from agno.embedder.base import Embedder
+
+from src.knowledge.batching import MicroBatchEmbedder
+
+
+@dataclass
+class ShortEmbedder(Embedder):
+    """
+    Devolve um embedding a menos que o número de textos nas primeiras `failures` chamadas.
+    """
+
+    failures: int = 1
+    calls: int = 0
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        vectors = [[float(len(text))] for text in texts]
+        return vectors[:-1] if self.calls <= self.failures else vectors
+
+
+def test_short_batch_fails_its_requests_and_the_worker_keeps_running():
+    embedder = MicroBatchEmbedder(embedder=ShortEmbedder(), max_wait=0)
+
+    with pytest.raises(ValueError):
+        embedder._submit("primeira").result(timeout=5)
+    assert embedder._submit("segunda").result(timeout=5) == [7.0]
+    assert embedder._worker.is_alive()
+
+
+def test_failed_batch_is_not_cached():
+    embedder = MicroBatchEmbedder(embedder=ShortEmbedder(), max_wait=0)
+
+    with pytest.raises(ValueError):
+        embedder._submit("texto").result(timeout=5)
+    assert embedder.get_embedding("texto") == [5.0]
@@ -0,0 +1,207 @@
+"""
+Espelho local do calendário contra a Calendar API falsa (benchmarks/fake_calendar_api.py), sem rede nem credenciais.
+"""
+import datetime as dt
+import random
+
+import pytest
+
+from benchmarks.fake_calendar_api import TIMEZONE, FakeCalendar, build_service, serve
+from src.db.pool import SQLitePool
+from src.metrics import metrics
+from src.tools import calendar_tools
+from src.tools.calendar_mirror import CalendarMirror
+from src.tools.calendar_tools import list_events
+from src.tools.event_handles import current_calendar_session
+
+OWNER = "owner@example.com"
+DAYS = 30
+
+
+def windows(count: int, seed: int = 7):
+    """
+    Janelas de um dia inteiro, de algumas horas e de 30 minutos (como na verificação de conflitos).
+    """
+    rng = random.Random(seed)
+    today = dt.datetime.now(TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+    result = []
+    for _ in range(count):
+        start = today + dt.timedelta(days=rng.randrange(DAYS), hours=rng.choice([0, 9, 14]), minutes=rng.choice([0, 30]))
+        length = rng.choice([dt.timedelta(days=1), dt.timedelta(hours=2), dt.timedelta(minutes=30)])
+        result.append((start.isoformat(), (start + length).isoformat()))
+    return result
+
+
+def event_keys(events):
+    # A ordem entre eventos que começam no mesmo horário não é definida pela API
+    return sorted((event["id"], event.get("summary"), event["start"].get("dateTime")) for event in events)
+
+
+def active_ids(calendar):
+    return sorted(key for key, event in calendar.events.items() if event["status"] != "cancelled")
+
+
+@pytest.fixture
+def calendar_api():
+    calendar = FakeCalendar()
+    calendar.seed(300, days=DAYS)
+    server, api_endpoint = serve(calendar)
+    yield calendar, build_service(api_endpoint)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = CalendarMirror(SQLitePool(str(tmp_path / "mirror.sqlite")), max_staleness=3600)
+    mirror.removed = []
+    mirror.add_listener(lambda owner, event_id: mirror.removed.append(event_id))
+    return mirror
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def assert_matches_api(calendar_api, mirror):
+    _, service = calendar_api
+    for time_min, time_max in windows(40):
+        expected = list_events(service, time_min, time_max)
+        assert event_keys(mirror.events(OWNER, lambda: service, time_min, time_max)) == event_keys(expected)
+
+
+def test_full_sync_matches_the_api(calendar_api, mirror):
+    calendar, service = calendar_api
+
+    mirror.sync(OWNER, service)
+
+    assert metrics.counter("calendar_mirror.full_sync") == 1
+    requests = calendar.requests
+    assert_matches_api(calendar_api, mirror)
+    # Leituras com o espelho atualizado não vão à API (só as consultas de referência do teste)
+    assert calendar.requests - requests == len(windows(40))
+
+
+def test_incremental_sync_applies_outside_changes(calendar_api, mirror):
+    calendar, service = calendar_api
+    rng = random.Random(1)
+    mirror.sync(OWNER, service)
+
+    deleted = rng.sample(active_ids(calendar), 10)
+    for event_id in deleted:
+        calendar.delete(event_id)
+    before = set(active_ids(calendar))
+    calendar.seed(10, days=DAYS, seed=2)
+    inserted = set(active_ids(calendar)) - before
+    updated = rng.sample(sorted(before), 10)
+    for event_id in updated:
+        event = calendar.get(event_id)
+        calendar.update(event_id, dict(event, summary=f"{event['summary']} (editado)"))
+
+    requests = calendar.requests
+    mirror.sync(OWNER, service)
+
+    assert calendar.requests - requests == 1
+    assert metrics.counter("calendar_mirror.full_sync") == 1
+    assert sorted(mirror.removed) == sorted(deleted)
+    assert all(mirror.get(OWNER, lambda: service, event_id) for event_id in inserted)
+    assert all(mirror.get(OWNER, lambda: service, event_id)["summary"].endswith("(editado)") for event_id in updated)
+    assert_matches_api(calendar_api, mirror)
+
+
+def test_stale_mirror_syncs_before_reading(calendar_api, mirror):
+    calendar, service = calendar_api
+    mirror.sync(OWNER, service)
+    gone = active_ids(calendar)[0]
+    calendar.delete(gone)
+
+    mirror.max_staleness = 0
+    assert_matches_api(calendar_api, mirror)
+    assert mirror.removed == [gone]
+
+
+def test_invalidated_sync_token_triggers_a_full_resync(calendar_api, mirror):
+    calendar, service = calendar_api
+    mirror.sync(OWNER, service)
+    calendar.expire_sync_tokens()
+    gone = active_ids(calendar)[0]
+    calendar.delete(gone)
+
+    mirror.sync(OWNER, service)
+
+    assert metrics.counter("calendar_mirror.full_sync") == 2
+    assert mirror.removed == [gone]
+    assert_matches_api(calendar_api, mirror)
+
+
+class FakeServicePool:
+    def __init__(self, service):
+        self._service = service
+
+    def owner(self) -> str:
+        return OWNER
+
+    def service(self):
+        return self._service
+
+
+@pytest.fixture
+def tools(calendar_api, mirror, monkeypatch):
+    calendar, service = calendar_api
+    mirror.sync(OWNER, service)
+    monkeypatch.setattr(calendar_tools, "calendar_services", FakeServicePool(service))
+    monkeypatch.setattr(calendar_tools, "calendar_mirror", mirror)
+    token = current_calendar_session.set("owner:test")
+    yield calendar, service
+    current_calendar_session.reset(token)
+
+
+def test_tool_writes_reach_the_mirror_without_a_sync(tools, mirror):
+    calendar, service = tools
+    start = (dt.datetime.now(TIMEZONE) + dt.timedelta(days=3)).replace(hour=6, minute=0, second=0, microsecond=0)
+    end = start + dt.timedelta(hours=1)
+
+    assert "criado" in calendar_tools.create_calendar_event(
+        "Kickoff", start=start.isoformat(), end=end.isoformat(), attendees=["ana@example.com"]
+    )
+    created = next(event for event in calendar.events.values() if event.get("summary") == "Kickoff")
+    assert mirror.get(OWNER, lambda: service, created["id"])["summary"] == "Kickoff"
+
+    assert "editado" in calendar_tools.edit_calendar_event(event_id="last", new_summary="Kickoff (v2)")
+    assert mirror.get(OWNER, lambda: service, created["id"])["summary"] == "Kickoff (v2)"
+
+    assert "excluído" in calendar_tools.delete_calendar_event(event_id="last")
+    assert mirror.get(OWNER, lambda: service, created["id"]) is None
+    assert calendar.get(created["id"]) is None
+    # Nenhuma das escritas precisou de uma sincronização
+    assert metrics.counter("calendar_mirror.full_sync") == 1
+    assert metrics.counter("calendar_mirror.stale") == 0
+
+
+def test_edit_keeps_changes_made_by_other_clients(tools, mirror):
+    calendar, service = tools
+    start = (dt.datetime.now(TIMEZONE) + dt.timedelta(days=2)).replace(hour=7, minute=0, second=0, microsecond=0)
+    event = calendar.insert(
+        {
+            "summary": "Budget review",
+            "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": (start + dt.timedelta(hours=1)).isoformat()},
+            "attendees": [{"email": "ana@example.com"}],
+        }
+    )
+    mirror.sync(OWNER, service)
+    # Outro cliente muda o evento depois da sincronização: a cópia do espelho fica desatualizada
+    calendar.update(
+        event["id"],
+        dict(event, description="Pauta nova", attendees=event["attendees"] + [{"email": "bia@example.com"}]),
+    )
+
+    assert "editado" in calendar_tools.edit_calendar_event(summary="Budget review", new_location="Sala 2")
+
+    current = calendar.get(event["id"])
+    assert current["location"] == "Sala 2"
+    assert current["description"] == "Pauta nova"
+    assert {"email": "bia@example.com"} in current["attendees"]
@@ -0,0 +1,141 @@
+"""
+Cache da busca na web contra o backend local (StubSearchBackend), sem rede nem chave da Tavily.
+"""
+import threading
+
+import pytest
+
+from src.metrics import metrics
+from src.tools import web_search
+from src.tools.web_search import CachedWebSearch, StubSearchBackend
+
+
+class FailingBackend(StubSearchBackend):
+    """
+    Falha nas primeiras `failures` chamadas e depois responde como o stub.
+    """
+
+    def __init__(self, failures: int = 1, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def search(self, query: str, max_results: int) -> str:
+        result = super().search(query, max_results)
+        if self.calls <= self.failures:
+            raise RuntimeError("backend indisponível")
+        return result
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_normalized_queries_share_one_entry():
+    backend = StubSearchBackend({"remote work policy": "policy results"})
+    cache = CachedWebSearch(backend)
+
+    assert cache.search("Remote work policy?") == "policy results"
+    assert cache.search("  remote   WORK policy ") == "policy results"
+    assert backend.calls == 1
+    assert metrics.counter("web_search.cache_miss") == 1
+    assert metrics.counter("web_search.cache_hit") == 1
+
+
+def test_max_results_is_part_of_the_key():
+    backend = StubSearchBackend()
+    cache = CachedWebSearch(backend)
+
+    cache.search("python asyncio", max_results=3)
+    cache.search("python asyncio", max_results=5)
+    assert backend.calls == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(web_search.time, "monotonic", lambda: now[0])
+    backend = StubSearchBackend()
+    cache = CachedWebSearch(backend, ttl=60)
+
+    cache.search("ai news")
+    now[0] += 59
+    cache.search("ai news")
+    assert backend.calls == 1
+
+    now[0] += 2
+    cache.search("ai news")
+    assert backend.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted_at_capacity():
+    backend = StubSearchBackend()
+    cache = CachedWebSearch(backend, max_entries=2)
+
+    cache.search("first")
+    cache.search("second")
+    cache.search("first")  # "second" passa a ser o menos usado
+    cache.search("third")
+    assert backend.calls == 3
+
+    cache.search("first")
+    assert backend.calls == 3
+    cache.search("second")
+    assert backend.calls == 4
+
+
+def test_concurrent_identical_queries_call_the_backend_once():
+    backend = StubSearchBackend(latency=0.2)
+    cache = CachedWebSearch(backend)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def search():
+        barrier.wait()
+        results.append(cache.search("latest AI news"))
+
+    threads = [threading.Thread(target=search) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.calls == 1
+    assert len(set(results)) == 1 and len(results) == 8
+    assert metrics.counter("web_search.cache_miss") == 1
+    assert metrics.counter("web_search.coalesced") == 7
+
+
+def test_errors_are_not_cached():
+    backend = FailingBackend(failures=1)
+    cache = CachedWebSearch(backend)
+
+    with pytest.raises(RuntimeError):
+        cache.search("flaky query")
+    assert cache.search("flaky query").startswith("# Result 1")
+    assert backend.calls == 2
+    assert metrics.counter("web_search.cache_miss") == 2
+
+
+def test_waiters_receive_the_leader_error():
+    backend = FailingBackend(failures=1, latency=0.2)
+    cache = CachedWebSearch(backend)
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def search():
+        barrier.wait()
+        try:
+            cache.search("flaky query")
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.calls == 1
+    assert len(errors) == 4